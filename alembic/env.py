@@ -5,12 +5,9 @@ from sqlalchemy import pool
 
 from alembic import context
 
-from app.db_models import Base
-from dotenv import load_dotenv
+from app.db_models import Base  # Importing `app` loads the .env file
 import os
 
-load_dotenv()
-
 DATABASE_URL = os.getenv("DATABASE_URL")
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,33 @@
+"""add candidate filter indexes
+
+Revision ID: 5b2d9c41e7a3
+Revises: 06e3b0c70c98
+Create Date: 2026-10-18 10:12:31.402118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b2d9c41e7a3'
+down_revision: Union[str, None] = '06e3b0c70c98'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Indexes backing the hard filters pushed down by app.repository.CandidateRepository
+    op.create_index('ix_candidates_location_lower', 'candidates', [sa.text('lower(location)')])
+    op.create_index('ix_candidates_is_staffed', 'candidates', ['is_staffed'])
+    op.create_index('ix_candidates_staffing_end_date', 'candidates', ['staffing_end_date'])
+    op.create_index('ix_candidates_years_experience', 'candidates', ['years_experience'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_candidates_years_experience', table_name='candidates')
+    op.drop_index('ix_candidates_staffing_end_date', table_name='candidates')
+    op.drop_index('ix_candidates_is_staffed', table_name='candidates')
+    op.drop_index('ix_candidates_location_lower', table_name='candidates')
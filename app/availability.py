@@ -0,0 +1,113 @@
+import threading
+from bisect import bisect_left, bisect_right, insort
+from datetime import date
+from typing import Any, Dict, List, Mapping, Optional, Set, Tuple
+
+from app.candidate_store import CandidateSnapshot, candidate_hash, candidate_store
+
+# Sorts after every candidate id, so bisect_right((day, _LAST_ID)) includes that whole day
+_LAST_ID = float("inf")
+
+
+class AvailabilityIndex:
+    """Answers "who is free by date X" without scanning the roster.
+
+    Unstaffed candidates are kept in a set; staffed ones in a list of
+    `(staffing_end_date ordinal, id)` pairs sorted by end date, so the
+    candidates free by a date are a bisected prefix of that list. Staffed
+    candidates without an end date are never available. Like
+    `retrieval.CandidateIndex`, `sync()` only touches rows whose hash changed;
+    when most of the roster changed (e.g. the first sync) it rebuilds the list
+    and sorts it once instead.
+    """
+
+    def __init__(self):
+        self.version: Optional[str] = None
+        self._loaded_at = 0.0
+        self._lock = threading.RLock()
+        self._free: Set[int] = set()
+        self._busy: List[Tuple[int, int]] = []
+        # Candidate id -> its key in `_busy` (None when unstaffed or busy indefinitely)
+        self._keys: Dict[int, Optional[Tuple[int, int]]] = {}
+        self._hashes: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def upsert(self, candidate: Mapping[str, Any]) -> bool:
+        """Indexes a candidate's availability; returns False if it was already indexed unchanged."""
+        row_hash = candidate_hash(candidate)
+        with self._lock:
+            if self._hashes.get(candidate["id"]) == row_hash:
+                return False
+            self.remove(candidate["id"])
+            key = self._add(candidate, row_hash)
+            if key is not None:
+                insort(self._busy, key)
+            return True
+
+    def _add(self, candidate: Mapping[str, Any], row_hash: str) -> Optional[Tuple[int, int]]:
+        """Records a candidate that isn't indexed; returns its `_busy` key for the caller to place."""
+        candidate_id = candidate["id"]
+        key = None
+        end_date = candidate.get("staffing_end_date")
+        if not candidate.get("is_staffed"):
+            self._free.add(candidate_id)
+        elif isinstance(end_date, date):
+            key = (end_date.toordinal(), candidate_id)
+        self._keys[candidate_id] = key
+        self._hashes[candidate_id] = row_hash
+        return key
+
+    def remove(self, candidate_id: int) -> None:
+        with self._lock:
+            if candidate_id not in self._keys:
+                return
+            key = self._keys.pop(candidate_id)
+            del self._hashes[candidate_id]
+            self._free.discard(candidate_id)
+            if key is not None:
+                del self._busy[bisect_left(self._busy, key)]
+
+    def sync(self, snapshot: CandidateSnapshot) -> int:
+        """Brings the index in line with a snapshot; returns the number of changed candidates."""
+        with self._lock:
+            if self.version == snapshot.version or snapshot.loaded_at < self._loaded_at:
+                return 0  # Already current, or an older snapshot held by a slow request
+            hashes = [candidate_hash(candidate) for candidate in snapshot.candidates]
+            changed = [
+                (candidate, row_hash) for candidate, row_hash in zip(snapshot.candidates, hashes)
+                if self._hashes.get(candidate["id"]) != row_hash
+            ]
+            removed = [i for i in self._keys if i not in snapshot.by_id]
+            if 2 * (len(changed) + len(removed)) > len(snapshot):
+                # Inserting one by one would be quadratic: rebuild and sort once
+                self._free, self._keys, self._hashes = set(), {}, {}
+                self._busy = [key for key in (self._add(c, h) for c, h in zip(snapshot.candidates, hashes)) if key]
+                self._busy.sort()
+            else:
+                for candidate, row_hash in changed:
+                    self.remove(candidate["id"])
+                    key = self._add(candidate, row_hash)
+                    if key is not None:
+                        insort(self._busy, key)
+                for candidate_id in removed:
+                    self.remove(candidate_id)
+            self.version = snapshot.version
+            self._loaded_at = snapshot.loaded_at
+            return len(changed) + len(removed)
+
+    def available_by(self, day: date) -> List[int]:
+        """Ids of candidates who are unstaffed, then of those whose staffing ends on or before `day`.
+
+        The staffed ones come straight from the bisected prefix, by end date;
+        nothing is re-sorted.
+        """
+        with self._lock:
+            end = bisect_right(self._busy, (day.toordinal(), _LAST_ID))
+            return [*self._free, *(candidate_id for _, candidate_id in self._busy[:end])]
+
+
+# Shared index kept in step with the candidate store
+availability_index = AvailabilityIndex()
+candidate_store.subscribe(lambda previous, current: availability_index.sync(current))
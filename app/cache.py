@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Mapping, Optional
+
+from app.candidate_store import candidate_store
+
+MATCH_CACHE_SIZE = int(os.getenv("MATCH_CACHE_SIZE", "1024"))
+MATCH_CACHE_TTL = float(os.getenv("MATCH_CACHE_TTL", "3600"))
+
+# Optional SQLite file for a second cache tier that survives restarts
+MATCH_CACHE_DB = os.getenv("MATCH_CACHE_DB")
+
+# Job fields holding comma-separated lists, compared as unordered sets
+LIST_FIELDS = {"required_skills", "industry"}
+
+WHITESPACE = re.compile(r"\s+")
+
+
+def _normalize_text(value: str) -> str:
+    return WHITESPACE.sub(" ", value).strip().lower()
+
+
+def fingerprint_job(job: Any) -> str:
+    """Returns a canonical hash of a job, independent of whitespace, case and field order."""
+    fields = job if isinstance(job, Mapping) else job.model_dump()
+    canonical: Dict[str, Any] = {}
+    for name, value in fields.items():
+        if isinstance(value, str):
+            value = _normalize_text(value)
+            if name in LIST_FIELDS:
+                value = ",".join(sorted(item.strip() for item in value.split(",") if item.strip()))
+        canonical[name] = value
+    payload = json.dumps(canonical, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+def cache_key(job: Any, version: str, **options: Any) -> str:
+    """Combines the job fingerprint, the candidate data version and request options."""
+    suffix = ",".join(f"{name}={options[name]}" for name in sorted(options))
+    return f"{fingerprint_job(job)}:{version}:{suffix}"
+
+
+class ResultCache:
+    """LRU + TTL cache of match results with an optional SQLite tier.
+
+    Entries are keyed by `cache_key()`, so a new candidate version never hits
+    stale results; `invalidate()` additionally drops them to free space.
+    """
+
+    def __init__(self, max_entries: int = MATCH_CACHE_SIZE, ttl: float = MATCH_CACHE_TTL, db_path: Optional[str] = MATCH_CACHE_DB):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._db: Optional[sqlite3.Connection] = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS match_cache ("
+                "key TEXT PRIMARY KEY, version TEXT NOT NULL, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, expires_at FROM match_cache WHERE key = ? AND expires_at > ?", (key, now)
+                ).fetchone()
+                if row is not None:
+                    value = json.loads(row[0])
+                    self._remember(key, value, row[1])
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return value
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: Any) -> None:
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, value, expires_at)
+            if self._db is not None:
+                version = key.split(":")[1]
+                self._db.execute(
+                    "INSERT OR REPLACE INTO match_cache (key, version, value, expires_at) VALUES (?, ?, ?, ?)",
+                    (key, version, json.dumps(value), expires_at),
+                )
+                self._db.commit()
+
+    def _remember(self, key: str, value: Any, expires_at: float) -> None:
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, current_version: Optional[str] = None) -> None:
+        """Drops entries for every candidate version other than `current_version`."""
+        with self._lock:
+            self._entries = OrderedDict(
+                (key, entry) for key, entry in self._entries.items()
+                if current_version is not None and key.split(":")[1] == current_version
+            )
+            if self._db is not None:
+                self._db.execute(
+                    "DELETE FROM match_cache WHERE version != ? OR expires_at <= ?",
+                    (current_version or "", time.time()),
+                )
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# Shared result cache, dropped whenever the candidate roster changes
+result_cache = ResultCache()
+candidate_store.subscribe(lambda previous, current: result_cache.invalidate(current.version))
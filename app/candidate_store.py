@@ -0,0 +1,280 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Default location of the candidate roster, overridable for deployments and benchmarks
+CANDIDATES_FILE = os.getenv(
+    "CANDIDATES_FILE", os.path.join(os.path.dirname(__file__), "data/candidates.json")
+)
+
+# Where the roster lives: "json" (CANDIDATES_FILE) or "database" (the candidates table)
+CANDIDATE_BACKEND = os.getenv("CANDIDATE_BACKEND", "json")
+
+# Serve the roster from shared memory-mapped columnar snapshots (see app/columnar.py)
+CANDIDATE_COLUMNAR = os.getenv("CANDIDATE_COLUMNAR", "0") == "1"
+
+# How often (seconds) the store checks its source for changes
+RELOAD_CHECK_INTERVAL = float(os.getenv("CANDIDATE_RELOAD_INTERVAL", "2.0"))
+
+CANDIDATE_FIELDS = (
+    "first_name",
+    "last_name",
+    "title",
+    "skills",
+    "is_staffed",
+    "staffing_end_date",
+    "years_experience",
+    "industry_experience",
+    "location",
+)
+
+DATE_FORMATS = ("%m-%d-%Y", "%Y-%m-%d")
+
+
+def parse_staffing_date(value) -> Optional[date]:
+    """Parses a staffing end date in either MM-DD-YYYY (candidates.json) or ISO format."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognized staffing_end_date: {value!r}")
+
+
+def normalize_candidate(raw: Mapping[str, Any], default_id: int) -> Mapping[str, Any]:
+    """Returns a read-only candidate record with an id and a parsed staffing date."""
+    record = {name: raw.get(name) for name in CANDIDATE_FIELDS}
+    record["id"] = int(raw.get("id") or default_id)
+    record["staffing_end_date"] = parse_staffing_date(record["staffing_end_date"])
+    return MappingProxyType(record)
+
+
+def candidate_hash(candidate: Mapping[str, Any]) -> str:
+    """Returns a stable content hash of a candidate row, used to detect edits."""
+    values = [str(candidate.get(name)) for name in CANDIDATE_FIELDS]
+    return hashlib.sha1("\x1f".join(values).encode()).hexdigest()[:16]
+
+
+@dataclass(frozen=True)
+class CandidateSnapshot:
+    """An immutable view of the roster at one data version."""
+
+    version: str
+    candidates: Tuple[Mapping[str, Any], ...]
+    loaded_at: float = field(default_factory=time.time)
+    by_id: Mapping[int, Mapping[str, Any]] = field(default_factory=dict, repr=False)
+
+    def __len__(self) -> int:
+        return len(self.candidates)
+
+    def __iter__(self) -> Iterator[Mapping[str, Any]]:
+        return iter(self.candidates)
+
+
+class JsonFileSource:
+    """Reads the roster from a JSON file; changes are detected by mtime and size."""
+
+    def __init__(self, path: str):
+        self.path = path
+        # (signature, content hash) of the last contents hashed
+        self._hashed: Optional[Tuple[Any, str]] = None
+
+    def signature(self):
+        stat = os.stat(self.path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def version(self) -> str:
+        """Content hash of the file (the version `load` reports); only re-read when the signature changes."""
+        signature = self.signature()
+        if self._hashed is None or self._hashed[0] != signature:
+            digest = hashlib.sha1()
+            with open(self.path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+            self._hashed = (signature, digest.hexdigest()[:12])
+        return self._hashed[1]
+
+    def load(self) -> Tuple[str, List[Dict[str, Any]]]:
+        signature = self.signature()
+        with open(self.path, "rb") as f:
+            payload = f.read()
+        version = hashlib.sha1(payload).hexdigest()[:12]
+        self._hashed = (signature, version)
+        return version, json.loads(payload)
+
+
+class DatabaseSource:
+    """Reads the roster from the `candidates` table.
+
+    The signature only notices inserts and deletes; code paths that update rows
+    in place should call `CandidateStore.reload()` afterwards.
+    """
+
+    def __init__(self, session_factory=None):
+        self._session_factory = session_factory
+
+    def _session(self):
+        if self._session_factory is None:
+            from app.db_models import SessionLocal
+
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    def signature(self):
+        from sqlalchemy import func, select
+
+        from app.db_models import Candidate
+
+        with self._session() as session:
+            return tuple(session.execute(select(func.count(Candidate.id), func.max(Candidate.id))).one())
+
+    def load(self) -> Tuple[str, List[Dict[str, Any]]]:
+        from sqlalchemy import select
+
+        from app.db_models import Candidate
+
+        digest = hashlib.sha1()
+        records = []
+        with self._session() as session:
+            for row in session.execute(select(Candidate).order_by(Candidate.id)).scalars():
+                record = {"id": row.id, **{name: getattr(row, name) for name in CANDIDATE_FIELDS}}
+                digest.update(repr(sorted(record.items())).encode())
+                records.append(record)
+        return digest.hexdigest()[:12], records
+
+
+Listener = Callable[[Optional[CandidateSnapshot], CandidateSnapshot], None]
+
+
+class CandidateStore:
+    """Process-wide candidate roster that loads once and reloads atomically on change.
+
+    `snapshot()` returns the current immutable snapshot without copying it.
+    Checking the source for changes and rebuilding the snapshot (and, through
+    the listeners, the indexes) happens on a background thread, which swaps a
+    single reference when it's done, so requests never wait for a reload and
+    in-flight ones keep the snapshot they started with. Only the very first
+    load blocks; the app's warm-up does it off the event loop at startup.
+    """
+
+    def __init__(self, source, check_interval: float = RELOAD_CHECK_INTERVAL):
+        self._source = source
+        self._check_interval = check_interval
+        self._lock = threading.Lock()
+        self._snapshot: Optional[CandidateSnapshot] = None
+        self._signature = None
+        self._checked_at = 0.0
+        self._refreshing = False
+        self._refreshing_lock = threading.Lock()
+        self._listeners: List[Listener] = []
+
+    @property
+    def version(self) -> str:
+        return self.snapshot().version
+
+    def snapshot(self) -> CandidateSnapshot:
+        """Returns the current snapshot; if it's due for a check, one starts in the background."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            return self.refresh()
+        if time.monotonic() - self._checked_at >= self._check_interval:
+            self._refresh_in_background()
+        return snapshot
+
+    def refresh(self) -> CandidateSnapshot:
+        """Checks the source now and reloads it if it changed; blocks until done."""
+        self._refresh()
+        return self._snapshot
+
+    def reload(self) -> CandidateSnapshot:
+        """Forces a reload from the source, e.g. after an in-place database update."""
+        with self._lock:
+            self._load(self._source.signature())
+        return self._snapshot
+
+    def subscribe(self, listener: Listener) -> None:
+        """Registers `listener(previous, current)`, called after every version change."""
+        self._listeners.append(listener)
+
+    def _refresh_in_background(self) -> None:
+        with self._refreshing_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self._refresh()
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, name="candidate-refresh", daemon=True).start()
+
+    def _refresh(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if self._snapshot is not None and now - self._checked_at < self._check_interval:
+                return  # Another thread refreshed while we waited for the lock
+            self._checked_at = now
+            try:
+                signature = self._source.signature()
+                if self._snapshot is None or signature != self._signature:
+                    self._load(signature)
+            except Exception:
+                if self._snapshot is None:
+                    raise
+                # Keep serving the last good snapshot, e.g. while the file is mid-write
+                logger.exception("Candidate reload failed; keeping version %s", self._snapshot.version)
+
+    def _load(self, signature) -> None:
+        version, records = self._source.load()
+        self._signature = signature
+        previous = self._snapshot
+        if previous is not None and previous.version == version:
+            return
+
+        if getattr(self._source, "normalized", False):
+            candidates = tuple(records)
+        else:
+            candidates = tuple(normalize_candidate(raw, i + 1) for i, raw in enumerate(records))
+        snapshot = CandidateSnapshot(
+            version=version,
+            candidates=candidates,
+            by_id=MappingProxyType({c["id"]: c for c in candidates}),
+        )
+        self._snapshot = snapshot
+        logger.info("Loaded %d candidates (version %s)", len(candidates), version)
+
+        for listener in self._listeners:
+            try:
+                listener(previous, snapshot)
+            except Exception:
+                logger.exception("Candidate store listener %r failed", listener)
+
+
+def _default_source():
+    source = DatabaseSource() if CANDIDATE_BACKEND == "database" else JsonFileSource(CANDIDATES_FILE)
+    if CANDIDATE_COLUMNAR:
+        from app.columnar import ColumnarSource
+
+        source = ColumnarSource(source)
+    return source
+
+
+# Shared store used by the API; loaded lazily or at application startup
+candidate_store = CandidateStore(_default_source())
@@ -0,0 +1,134 @@
+"""Two-tier cascade ranking: fast scores for everyone, the LLM for the top band.
+
+Tier 1 (`fast_scoring`) ranks every eligible candidate on skills, title,
+industry, experience and location. Tier 2 sends only the head of that
+ranking to the LLM: a band of CASCADE_BAND_SIZE candidates, plus borderline
+ones ranked below it whose fast score is within CASCADE_MARGIN points of the
+top-k cut-off. The band is cut short as soon as the next candidate would
+exceed the request's token or latency budget, so a tight budget means fewer
+LLM-scored candidates and a zero budget means fast scores only.
+"""
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Container, List, Mapping, Optional, Sequence, Tuple
+
+from app.prompts import completion_budget, count_tokens, max_candidates_per_prompt, render_candidate_row, render_header
+from app.scoring import MAX_CONCURRENT_CHUNKS
+
+# Candidates ranked by the fast tier per request (the band and borderline cases come from these)
+CASCADE_POOL_SIZE = int(os.getenv("CASCADE_POOL_SIZE", "200"))
+
+# Candidates re-ranked by the LLM when the budget allows
+CASCADE_BAND_SIZE = int(os.getenv("CASCADE_BAND_SIZE", "10"))
+
+# Candidates below the band still go to the LLM if their fast score is within
+# this many points (0-10 scale) of the top-k cut-off
+CASCADE_MARGIN = float(os.getenv("CASCADE_MARGIN", "0.5"))
+
+# Initial estimate of LLM seconds per completion token, refined from observed calls
+CASCADE_SECONDS_PER_TOKEN = float(os.getenv("CASCADE_SECONDS_PER_TOKEN", "0.02"))
+
+
+@dataclass
+class Budget:
+    """Per-request limits on the LLM tier."""
+
+    # Prompt + completion tokens
+    max_tokens: Optional[int] = None
+    # `time.monotonic()` by which the LLM tier must be done
+    deadline: Optional[float] = None
+
+    def remaining(self) -> Optional[float]:
+        return None if self.deadline is None else self.deadline - time.monotonic()
+
+
+class LatencyModel:
+    """Predicts LLM call time from the completion size (EWMA of seconds per completion token)."""
+
+    def __init__(self, seconds_per_token: float = CASCADE_SECONDS_PER_TOKEN, alpha: float = 0.2):
+        self.seconds_per_token = seconds_per_token
+        self.alpha = alpha
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, completion_tokens: int) -> None:
+        if completion_tokens <= 0:
+            return
+        with self._lock:
+            self.seconds_per_token += self.alpha * (seconds / completion_tokens - self.seconds_per_token)
+
+    def predict(self, completion_tokens: int) -> float:
+        return self.seconds_per_token * completion_tokens
+
+
+# Shared model, fed by every cascade LLM call of this worker
+latency_model = LatencyModel()
+
+
+class _Cost:
+    """Running token and latency estimate of scoring the selected candidates with the LLM.
+
+    Mirrors how `scoring.score_candidates` runs them: chunks of up to
+    `max_candidates_per_prompt()` candidates, `concurrency` chunks at a time.
+    """
+
+    def __init__(self, job: Mapping[str, Any], model: LatencyModel, concurrency: int = MAX_CONCURRENT_CHUNKS):
+        self.header_tokens = count_tokens(render_header(job))
+        self.model = model
+        self.concurrency = concurrency
+        self.chunk_size = max_candidates_per_prompt()
+        self.count = 0
+        self.row_tokens = 0
+
+    def estimate(self, count: int, row_tokens: int) -> Tuple[int, float]:
+        if not count:
+            return 0, 0.0
+        chunks = math.ceil(count / self.chunk_size)
+        full, last = divmod(count, self.chunk_size)
+        completion = full * completion_budget(self.chunk_size) + (completion_budget(last) if last else 0)
+        tokens = row_tokens + chunks * self.header_tokens + completion
+        seconds = math.ceil(chunks / self.concurrency) * self.model.predict(completion_budget(min(count, self.chunk_size)))
+        return tokens, seconds
+
+    def add_if_affordable(self, candidate: Mapping[str, Any], budget: Budget) -> bool:
+        row_tokens = self.row_tokens + count_tokens(render_candidate_row(1, candidate)) + 1
+        tokens, seconds = self.estimate(self.count + 1, row_tokens)
+        if budget.max_tokens is not None and tokens > budget.max_tokens:
+            return False
+        remaining = budget.remaining()
+        if remaining is not None and seconds > remaining:
+            return False
+        self.count, self.row_tokens = self.count + 1, row_tokens
+        return True
+
+
+def plan_band(
+    job: Mapping[str, Any],
+    ranked: Sequence[Tuple[Mapping[str, Any], float]],
+    top_k: int = 3,
+    band_size: int = CASCADE_BAND_SIZE,
+    budget: Budget = Budget(),
+    memoized: Container[int] = (),
+    model: LatencyModel = latency_model,
+) -> List[Mapping[str, Any]]:
+    """Picks the candidates to score with the LLM from the fast tier's ranking (best first).
+
+    Takes the first `band_size` candidates, then keeps going while the fast
+    score is within CASCADE_MARGIN of the top-k cut-off, stopping early when
+    the next candidate would break the budget. Candidates in `memoized`
+    already have an LLM score and cost nothing.
+    """
+    if not ranked:
+        return []
+    cutoff = ranked[min(top_k, len(ranked)) - 1][1] - CASCADE_MARGIN
+    cost = _Cost(job, model)
+    band = []
+    for position, (candidate, score) in enumerate(ranked):
+        if position >= band_size and score < cutoff:
+            break
+        if candidate["id"] not in memoized and not cost.add_if_affordable(candidate, budget):
+            break
+        band.append(candidate)
+    return band
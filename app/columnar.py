@@ -0,0 +1,226 @@
+"""Compact columnar roster snapshots, memory-mapped read-only by every worker.
+
+A snapshot is written once per data version to `COLUMNAR_DIR/<version>/` as
+`.npy` arrays:
+
+- `strings` / `string_offsets`: one interned UTF-8 string table; text columns
+  hold indexes into it (-1 for missing values)
+- `id`, `years_experience` (-1 = missing), `is_staffed` (-1 = missing),
+  `staffing_end_date` (date ordinal, 0 = missing)
+
+Workers open the arrays with `mmap_mode="r"`, so every process shares the
+same page-cache pages, and candidates are exposed as lightweight
+`CandidateRow` views that decode fields on access.
+"""
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from collections import abc
+from datetime import date
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.candidate_store import CANDIDATE_FIELDS, normalize_candidate
+from app.utils import STATE_DIR
+
+logger = logging.getLogger(__name__)
+
+COLUMNAR_DIR = os.getenv("COLUMNAR_DIR", os.path.join(STATE_DIR, "columnar"))
+
+# Snapshot versions kept on disk; older ones are removed after a new version is written
+KEEP_VERSIONS = 3
+
+# Seconds after its last use (write or open) before an old version may be removed
+PRUNE_GRACE_SECONDS = 600
+
+TEXT_COLUMNS = ("first_name", "last_name", "title", "skills", "industry_experience", "location")
+FORMAT_VERSION = 1
+
+
+class _StringTable:
+    """Interns strings while a snapshot is being written."""
+
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.values: List[bytes] = []
+
+    def add(self, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        value = str(value)
+        position = self.index.get(value)
+        if position is None:
+            position = self.index[value] = len(self.values)
+            self.values.append(value.encode())
+        return position
+
+
+def write_columnar(version: str, records: Sequence[Mapping[str, Any]], root: str = COLUMNAR_DIR) -> str:
+    """Writes the snapshot of `version` unless it already exists; returns its directory.
+
+    Files are written to a temporary directory that is renamed into place, so
+    concurrent workers never open a partial snapshot.
+    """
+    target = os.path.join(root, version)
+    if os.path.exists(os.path.join(target, "meta.json")):
+        return target
+
+    candidates = [normalize_candidate(raw, i + 1) for i, raw in enumerate(records)]
+    strings = _StringTable()
+    count = len(candidates)
+    columns: Dict[str, np.ndarray] = {
+        name: np.fromiter((strings.add(c[name]) for c in candidates), dtype=np.int32, count=count)
+        for name in TEXT_COLUMNS
+    }
+    columns["id"] = np.fromiter((c["id"] for c in candidates), dtype=np.int64, count=count)
+    columns["years_experience"] = np.fromiter(
+        (-1 if c["years_experience"] is None else int(c["years_experience"]) for c in candidates), dtype=np.int32, count=count
+    )
+    columns["is_staffed"] = np.fromiter(
+        (-1 if c["is_staffed"] is None else int(bool(c["is_staffed"])) for c in candidates), dtype=np.int8, count=count
+    )
+    columns["staffing_end_date"] = np.fromiter(
+        (c["staffing_end_date"].toordinal() if c["staffing_end_date"] else 0 for c in candidates), dtype=np.int32, count=count
+    )
+
+    columns["string_offsets"] = np.zeros(len(strings.values) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in strings.values], out=columns["string_offsets"][1:])
+    columns["strings"] = np.frombuffer(b"".join(strings.values), dtype=np.uint8)
+
+    os.makedirs(root, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=f".{version}-", dir=root)
+    try:
+        for name, array in columns.items():
+            np.save(os.path.join(staging, f"{name}.npy"), array)
+        with open(os.path.join(staging, "meta.json"), "w") as f:
+            json.dump({"format": FORMAT_VERSION, "version": version, "count": count, "strings": len(strings.values)}, f)
+        os.rename(staging, target)
+    except OSError:
+        shutil.rmtree(staging, ignore_errors=True)
+        if not os.path.exists(os.path.join(target, "meta.json")):
+            raise  # Not just another worker winning the race
+    else:
+        logger.info("Wrote columnar snapshot %s (%d candidates, %d strings)", version, count, len(strings.values))
+        _prune(root, keep=version)
+    return target
+
+
+def _prune(root: str, keep: str) -> None:
+    versions = [entry for entry in os.scandir(root) if entry.is_dir() and not entry.name.startswith(".")]
+    versions.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    unused_since = time.time() - PRUNE_GRACE_SECONDS
+    for entry in versions[KEEP_VERSIONS:]:
+        # Opening a roster refreshes its mtime, so a version another worker has
+        # just picked is kept; workers still mapping an older one keep their
+        # pages until they reload
+        if entry.name != keep and entry.stat().st_mtime < unused_since:
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+
+class ColumnarRoster:
+    """Read-only, memory-mapped view of one columnar snapshot."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.utime(directory)  # Marks the version as in use (see _prune)
+        with open(os.path.join(directory, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.version = self.meta["version"]
+        # Plain ndarray views of the maps: same shared pages, cheaper element access than np.memmap
+        self._arrays = {
+            entry.name[:-4]: np.asarray(np.load(entry.path, mmap_mode="r"))
+            for entry in os.scandir(directory)
+            if entry.name.endswith(".npy")
+        }
+        # Decoded strings are cached per process, bounded, for hot values (locations, titles...)
+        self.string = lru_cache(maxsize=65536)(self._decode)
+
+    def __len__(self) -> int:
+        return self.meta["count"]
+
+    def column(self, name: str) -> np.ndarray:
+        return self._arrays[name]
+
+    def _decode(self, position: int) -> Optional[str]:
+        if position < 0:
+            return None
+        offsets = self._arrays["string_offsets"]
+        return self._arrays["strings"][offsets[position]:offsets[position + 1]].tobytes().decode()
+
+    def value(self, row: int, name: str) -> Any:
+        if name in TEXT_COLUMNS:
+            return self.string(int(self._arrays[name][row]))
+        raw = int(self._arrays[name][row])
+        if name == "id":
+            return raw
+        if name == "staffing_end_date":
+            return date.fromordinal(raw) if raw else None
+        if name == "is_staffed":
+            return None if raw < 0 else bool(raw)
+        return None if raw < 0 else raw
+
+    def rows(self) -> Tuple["CandidateRow", ...]:
+        return tuple(CandidateRow(self, row) for row in range(len(self)))
+
+
+_KEYS = ("id", *CANDIDATE_FIELDS)
+
+
+class CandidateRow(abc.Mapping):
+    """A candidate record backed by a `ColumnarRoster` row (same keys as `normalize_candidate`)."""
+
+    __slots__ = ("_roster", "_row")
+
+    def __init__(self, roster: ColumnarRoster, row: int):
+        self._roster = roster
+        self._row = row
+
+    def __getitem__(self, name: str) -> Any:
+        if name not in _KEYS:
+            raise KeyError(name)
+        return self._roster.value(self._row, name)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_KEYS)
+
+    def __len__(self) -> int:
+        return len(_KEYS)
+
+    def __repr__(self) -> str:
+        return f"CandidateRow({dict(self)!r})"
+
+
+class ColumnarSource:
+    """Wraps a roster source so each worker maps the shared columnar snapshot instead of parsing it.
+
+    When the source can name its version cheaply (`version()`) and that
+    snapshot was already written by another worker, the source isn't parsed
+    at all.
+    """
+
+    # Records are returned as ready-made candidate rows (see CandidateStore._load)
+    normalized = True
+
+    def __init__(self, source, root: str = COLUMNAR_DIR):
+        self._source = source
+        self.root = root
+
+    def signature(self):
+        return self._source.signature()
+
+    def load(self) -> Tuple[str, Tuple[CandidateRow, ...]]:
+        version = self._source.version() if hasattr(self._source, "version") else None
+        if version is not None and os.path.exists(os.path.join(self.root, version, "meta.json")):
+            try:
+                return version, ColumnarRoster(os.path.join(self.root, version)).rows()
+            except FileNotFoundError:
+                pass  # Pruned by another worker in the meantime: write it again
+        version, records = self._source.load()
+        roster = ColumnarRoster(write_columnar(version, records, self.root))
+        return version, roster.rows()
+
@@ -1,19 +1,72 @@
 import os
-from dotenv import load_dotenv
-from sqlalchemy import create_engine, Column, Integer, String, Boolean, Date
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-
-# Load environment variables
-load_dotenv()
+from functools import lru_cache
+from sqlalchemy import create_engine, func, Column, Index, Integer, String, Boolean, Date
+from sqlalchemy.orm import declarative_base, sessionmaker
 
 # Retrieve the database URL
 DATABASE_URL = os.getenv("DATABASE_URL")
 
+# Connection pool settings (ignored for SQLite, which uses its own pool classes)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+
+def engine_options(url):
+    """Returns pool tuning options for `create_engine` suitable for the database URL."""
+    if url.startswith("sqlite"):
+        return {}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": True,  # Transparently replace connections dropped by the server
+    }
+
+
+@lru_cache(maxsize=None)
+def get_engine():
+    """Creates the shared engine on first use, so importing the models needs no database."""
+    if not DATABASE_URL:
+        raise RuntimeError("DATABASE_URL is not set")
+    return create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+
+
+@lru_cache(maxsize=None)
+def _sessionmaker():
+    return sessionmaker(bind=get_engine(), expire_on_commit=False)
+
+
+def SessionLocal():
+    """Opens a session on the shared engine (creating the engine on first use)."""
+    return _sessionmaker()()
+
+
+def warm_up_pool(connections: int = 0) -> int:
+    """Opens up to `connections` pooled connections (default: DB_POOL_SIZE) and returns them to the pool.
+
+    Called during application warm-up so the first requests don't pay for
+    connection setup. Returns the number of connections opened.
+    """
+    engine = get_engine()
+    if engine.dialect.name == "sqlite":
+        connections = 1
+    opened = []
+    try:
+        for _ in range(connections or DB_POOL_SIZE):
+            connection = engine.connect()
+            opened.append(connection)
+            connection.exec_driver_sql("SELECT 1")
+    finally:
+        for connection in opened:
+            connection.close()
+    return len(opened)
+
+
 # Setup SQLAlchemy
 Base = declarative_base()
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(bind=engine)
 
 # Example Model
 class Candidate(Base):
@@ -24,8 +77,13 @@ class Candidate(Base):
     last_name = Column(String, nullable=False)
     title = Column(String, nullable=False)
     skills = Column(String, nullable=False)
-    is_staffed = Column(Boolean, nullable=False)
-    staffing_end_date = Column(Date, nullable=True)
-    years_experience = Column(Integer, nullable=False)
+    is_staffed = Column(Boolean, nullable=False, index=True)
+    staffing_end_date = Column(Date, nullable=True, index=True)
+    years_experience = Column(Integer, nullable=False, index=True)
     industry_experience = Column(String, nullable=False)
-    location = Column(String, nullable=False)
\ No newline at end of file
+    location = Column(String, nullable=False)
+
+    __table_args__ = (
+        # Case-insensitive location filter (see alembic revision 5b2d9c41e7a3)
+        Index("ix_candidates_location_lower", func.lower(location)),
+    )
@@ -0,0 +1,205 @@
+import threading
+import zlib
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.candidate_store import CandidateSnapshot, candidate_store
+from app.retrieval import tokenize
+
+# Hashed term-vector sizes per text field (stored sparsely, so only collisions depend on these)
+SKILL_DIM = 4096
+TEXT_DIM = 1024
+
+# Share of the 0-10 score contributed by each criterion (see README "Algoritmo de Pontuação")
+WEIGHTS = {
+    "skills": 0.35,
+    "title": 0.20,
+    "industry": 0.15,
+    "experience": 0.15,
+    "location": 0.15,
+}
+
+
+def _hashed_vector(text: Optional[str], dim: int) -> np.ndarray:
+    vector = np.zeros(dim, dtype=np.float32)
+    for term in tokenize(text):
+        vector[zlib.crc32(term.encode()) % dim] += 1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+@dataclass(frozen=True)
+class HashedTermMatrix:
+    """Sparse (COO) matrix of L2-normalized hashed term counts, one row per candidate."""
+
+    rows: np.ndarray
+    columns: np.ndarray
+    values: np.ndarray
+    n_rows: int
+
+    @classmethod
+    def build(cls, texts: List[Optional[str]], dim: int) -> "HashedTermMatrix":
+        rows, columns, values = [], [], []
+        for row, text in enumerate(texts):
+            counts: Dict[int, float] = {}
+            for term in tokenize(text):
+                column = zlib.crc32(term.encode()) % dim
+                counts[column] = counts.get(column, 0.0) + 1.0
+            norm = sum(count * count for count in counts.values()) ** 0.5
+            for column, count in counts.items():
+                rows.append(row)
+                columns.append(column)
+                values.append(count / norm)
+        return cls(
+            rows=np.asarray(rows, dtype=np.int32),
+            columns=np.asarray(columns, dtype=np.int32),
+            values=np.asarray(values, dtype=np.float32),
+            n_rows=len(texts),
+        )
+
+    def __matmul__(self, vector: np.ndarray) -> np.ndarray:
+        return np.bincount(self.rows, weights=self.values * vector[self.columns], minlength=self.n_rows)
+
+
+def _location_key(location: Optional[str]) -> str:
+    return " ".join(tokenize(location))
+
+
+@dataclass(frozen=True)
+class FeatureMatrix:
+    """Precomputed numeric features for every candidate in one snapshot."""
+
+    version: str
+    candidates: tuple
+    ids: np.ndarray
+    skills: HashedTermMatrix
+    titles: HashedTermMatrix
+    industries: HashedTermMatrix
+    years: np.ndarray
+    locations: np.ndarray
+    location_codes: Dict[str, int]
+
+    @classmethod
+    def build(cls, snapshot: CandidateSnapshot) -> "FeatureMatrix":
+        candidates = snapshot.candidates
+        location_codes: Dict[str, int] = {}
+        locations = np.fromiter(
+            (location_codes.setdefault(_location_key(c.get("location")), len(location_codes)) for c in candidates),
+            dtype=np.int32,
+            count=len(candidates),
+        )
+        return cls(
+            version=snapshot.version,
+            candidates=candidates,
+            ids=np.fromiter((c["id"] for c in candidates), dtype=np.int64, count=len(candidates)),
+            skills=HashedTermMatrix.build([c.get("skills") for c in candidates], SKILL_DIM),
+            titles=HashedTermMatrix.build([c.get("title") for c in candidates], TEXT_DIM),
+            industries=HashedTermMatrix.build([c.get("industry_experience") for c in candidates], TEXT_DIM),
+            years=np.fromiter((c.get("years_experience") or 0 for c in candidates), dtype=np.float32, count=len(candidates)),
+            locations=locations,
+            location_codes=location_codes,
+        )
+
+    def score(self, job: Mapping[str, Any]) -> Dict[str, np.ndarray]:
+        """Returns per-criterion scores in [0, 1] and the weighted 0-10 total for every candidate."""
+        required_years = float(job.get("years_experience") or 0)
+        location_code = self.location_codes.get(_location_key(job.get("location")), -1)
+        parts = {
+            "skills": self.skills @ _hashed_vector(job.get("required_skills"), SKILL_DIM),
+            "title": self.titles @ _hashed_vector(job.get("title"), TEXT_DIM),
+            "industry": self.industries @ _hashed_vector(job.get("industry"), TEXT_DIM),
+            "experience": np.clip(1.0 - np.abs(self.years - required_years) / max(required_years, 1.0), 0.0, 1.0),
+            "location": (self.locations == location_code).astype(np.float32),
+        }
+        parts["total"] = 10.0 * sum(WEIGHTS[name] * parts[name] for name in WEIGHTS)
+        return parts
+
+
+def explain(candidate: Mapping[str, Any], job: Mapping[str, Any]) -> str:
+    """Builds a short human-readable explanation of a fast-mode score."""
+    wanted = [s.strip() for s in str(job.get("required_skills") or "").split(",") if s.strip()]
+    have = {s.strip().lower() for s in str(candidate.get("skills") or "").split(",")}
+    matched = [s for s in wanted if s.lower() in have]
+    sentences = [
+        f"Matches {len(matched)} of {len(wanted)} required skills"
+        + (f" ({', '.join(matched)})." if matched else "."),
+        f"{candidate.get('years_experience')} years of experience vs {job.get('years_experience')} required.",
+        f"Current title: {candidate.get('title')}.",
+    ]
+    if _location_key(candidate.get("location")) == _location_key(job.get("location")):
+        sentences.append(f"Based in {candidate.get('location')}, the job location.")
+    else:
+        sentences.append(f"Based in {candidate.get('location')} (job in {job.get('location')}).")
+    industry = str(job.get("industry") or "").lower()
+    if industry and industry in str(candidate.get("industry_experience") or "").lower():
+        sentences.append(f"Has {job.get('industry')} industry experience.")
+    return " ".join(sentences)
+
+
+_lock = threading.Lock()
+_features: Optional[FeatureMatrix] = None
+
+
+def feature_matrix(snapshot: CandidateSnapshot) -> FeatureMatrix:
+    """Returns the feature matrix for a snapshot, building it once per data version."""
+    global _features
+    features = _features
+    if features is not None and features.version == snapshot.version:
+        return features
+    with _lock:
+        if _features is None or _features.version != snapshot.version:
+            _features = FeatureMatrix.build(snapshot)
+        return _features
+
+
+def rank(
+    job: Mapping[str, Any],
+    snapshot: CandidateSnapshot,
+    limit: int,
+    eligible_ids: Optional[Sequence[int]] = None,
+) -> List[Tuple[Mapping[str, Any], float]]:
+    """Returns the `limit` best `(candidate, score)` pairs by fast score, best first.
+
+    `eligible_ids` restricts the ranking to candidates that passed hard filters.
+    """
+    features = feature_matrix(snapshot)
+    if not features.candidates or limit <= 0:
+        return []
+    totals = features.score(job)["total"]
+    if eligible_ids is not None:
+        mask = np.isin(features.ids, np.fromiter(eligible_ids, dtype=np.int64))
+        totals = np.where(mask, totals, -np.inf)
+        limit = min(limit, int(mask.sum()))
+        if not limit:
+            return []
+    k = min(limit, len(totals))
+    top = np.argpartition(-totals, k - 1)[:k]
+    top = top[np.argsort(-totals[top], kind="stable")]
+    return [(features.candidates[i], float(totals[i])) for i in top]
+
+
+def fast_match(
+    job: Mapping[str, Any],
+    snapshot: CandidateSnapshot,
+    top_k: int = 3,
+    eligible_ids: Optional[Sequence[int]] = None,
+) -> List[Dict[str, Any]]:
+    """Scores the whole roster without the LLM and returns the top-k matches.
+
+    `eligible_ids` restricts the result to candidates that passed hard filters.
+    """
+    return [
+        {
+            "candidate_id": candidate["id"],
+            "full_name": f"{candidate.get('first_name', '')} {candidate.get('last_name', '')}",
+            "score": round(score, 2),
+            "explanation": explain(candidate, job),
+        }
+        for candidate, score in rank(job, snapshot, top_k, eligible_ids)
+    ]
+
+
+# Rebuild the features as soon as the roster changes rather than on the next request
+candidate_store.subscribe(lambda previous, current: feature_matrix(current))
@@ -0,0 +1,204 @@
+"""Streaming bulk ingestion of candidate records into the `candidates` table.
+
+Usage:
+    python -m app.ingest export.ndjson [--format ndjson|json|csv] [--batch-size 1000]
+
+Records are read incrementally, validated against `CandidateSchema`, and
+upserted in batched `executemany` transactions, so memory use stays constant
+regardless of the file size.
+"""
+import argparse
+import codecs
+import csv
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from itertools import islice
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional
+
+from pydantic import ValidationError
+
+from app.candidate_store import CANDIDATE_BACKEND, CANDIDATE_FIELDS, candidate_store
+from app.models import CandidateIn
+from app.parsing import JSONObjectStream
+
+logger = logging.getLogger(__name__)
+
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "1000"))
+
+FORMATS = ("ndjson", "json", "csv")
+
+# Bytes read per step when streaming a JSON array (which may be a single line)
+READ_SIZE = 64 * 1024
+
+# Validation errors kept in the report; the rest are only counted
+MAX_REPORTED_ERRORS = 20
+
+
+def detect_format(filename: str) -> str:
+    extension = os.path.splitext(filename)[1].lower().lstrip(".")
+    if extension in ("jsonl", "ndjson"):
+        return "ndjson"
+    if extension in FORMATS:
+        return extension
+    raise ValueError(f"Cannot infer the record format of {filename!r}; pass one of {FORMATS}")
+
+
+def _decoded_lines(stream: BinaryIO) -> Iterator[str]:
+    for line in stream:
+        yield line.decode("utf-8-sig") if isinstance(line, bytes) else line
+
+
+def iter_records(stream: BinaryIO, fmt: str) -> Iterator[Dict[str, Any]]:
+    """Yields raw records from a binary stream without reading it whole.
+
+    Malformed records are yielded as their raw text so they're counted as invalid.
+    """
+    if fmt == "ndjson":
+        for line in _decoded_lines(stream):
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    yield line
+    elif fmt == "csv":
+        yield from csv.DictReader(_decoded_lines(stream))
+    elif fmt == "json":
+        decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        objects = JSONObjectStream()
+        final = False
+        while not final:
+            chunk = stream.read(READ_SIZE)
+            final = not chunk
+            yield from objects.feed(decoder.decode(chunk, final=final))
+            yield from objects.rejected
+            objects.rejected.clear()
+    else:
+        raise ValueError(f"Unsupported format {fmt!r}; expected one of {FORMATS}")
+
+
+@dataclass
+class IngestReport:
+    rows_read: int = 0
+    rows_written: int = 0
+    rows_invalid: int = 0
+    seconds: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_read / self.seconds if self.seconds else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "rows_per_second": round(self.rows_per_second, 1)}
+
+
+def _validated(records: Iterable[Any], report: IngestReport) -> Iterator[Dict[str, Any]]:
+    for number, record in enumerate(records, start=1):
+        report.rows_read += 1
+        if not isinstance(record, dict):
+            error = "not a JSON object"
+        else:
+            try:
+                # CSV exports leave optional columns empty
+                record = {key: (None if value == "" else value) for key, value in record.items()}
+                row = CandidateIn.model_validate(record).model_dump()
+            except ValidationError as e:
+                first = e.errors()[0]
+                error = f"{'.'.join(map(str, first['loc']))}: {first['msg']}"
+            else:
+                yield row
+                continue
+        report.rows_invalid += 1
+        if len(report.errors) < MAX_REPORTED_ERRORS:
+            report.errors.append(f"record {number}: {error}")
+
+
+def _upsert_statement(dialect_name: str):
+    from app.db_models import Candidate
+
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    statement = insert(Candidate.__table__)
+    return statement.on_conflict_do_update(
+        index_elements=["id"], set_={name: statement.excluded[name] for name in CANDIDATE_FIELDS}
+    )
+
+
+def _write_batch(connection, upsert, batch: List[Dict[str, Any]]) -> None:
+    from sqlalchemy import insert, text
+
+    from app.db_models import Candidate
+
+    # A repeated id within one statement is rejected by PostgreSQL's ON CONFLICT
+    # (and by the delete/insert fallback); the last occurrence wins, as it would
+    # across batches
+    with_id = list({row["id"]: row for row in batch if row["id"] is not None}.values())
+    without_id = [{name: row[name] for name in CANDIDATE_FIELDS} for row in batch if row["id"] is None]
+    if with_id:
+        if upsert is not None:
+            connection.execute(upsert, with_id)
+        else:
+            # No native upsert for this dialect: replace existing rows first
+            table = Candidate.__table__
+            connection.execute(table.delete().where(table.c.id.in_([row["id"] for row in with_id])))
+            connection.execute(insert(table), with_id)
+        if connection.dialect.name == "postgresql":
+            # Explicit ids don't advance the serial sequence; move it past them so
+            # rows inserted without an id (here or through the API) don't collide
+            table_name = Candidate.__tablename__
+            connection.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table_name}', 'id'), (SELECT max(id) FROM {table_name}))"
+            ))
+    if without_id:
+        connection.execute(insert(Candidate.__table__), without_id)
+
+
+def ingest_stream(stream: BinaryIO, fmt: str, batch_size: int = INGEST_BATCH_SIZE, engine=None) -> IngestReport:
+    """Streams, validates and upserts candidate records, one transaction per batch."""
+    if engine is None:
+        from app.db_models import get_engine
+
+        engine = get_engine()
+
+    report = IngestReport()
+    started = time.perf_counter()
+    upsert = _upsert_statement(engine.dialect.name)
+    rows = _validated(iter_records(stream, fmt), report)
+    while batch := list(islice(rows, batch_size)):
+        with engine.begin() as connection:
+            _write_batch(connection, upsert, batch)
+        report.rows_written += len(batch)
+        logger.info("Ingested %d rows (%d invalid)", report.rows_written, report.rows_invalid)
+    report.seconds = time.perf_counter() - started
+
+    if CANDIDATE_BACKEND == "database":
+        candidate_store.reload()
+    return report
+
+
+def ingest_file(path: str, fmt: Optional[str] = None, batch_size: int = INGEST_BATCH_SIZE, engine=None) -> IngestReport:
+    with open(path, "rb") as stream:
+        return ingest_stream(stream, fmt or detect_format(path), batch_size, engine)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=FORMATS, help="record format (default: from the file extension)")
+    parser.add_argument("--batch-size", type=int, default=INGEST_BATCH_SIZE)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    report = ingest_file(args.path, args.format, args.batch_size)
+    print(json.dumps(report.to_dict(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+"""Persistent queue and worker pool for asynchronous match jobs.
+
+`POST /match/jobs` enqueues a match request and returns its id at once;
+workers claim jobs from a SQLite table and store the results for
+`GET /match/jobs/{id}`. Workers run on their own, scaled separately from
+the API:
+
+    python -m app.jobs [--workers 4]
+
+or inside the API process when MATCH_WORKERS is set.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.utils import STATE_DIR
+
+logger = logging.getLogger(__name__)
+
+# SQLite file holding the queue; ":memory:" keeps it for the process only
+MATCH_JOBS_DB = os.getenv("MATCH_JOBS_DB", os.path.join(STATE_DIR, "match_jobs.sqlite3"))
+
+# Workers started inside the API process (0 = only standalone workers)
+MATCH_WORKERS = int(os.getenv("MATCH_WORKERS", "0"))
+
+# Seconds a claimed job stays owned by its worker without a heartbeat; after
+# that it's considered abandoned (crashed worker) and handed out again
+JOB_LEASE_SECONDS = float(os.getenv("MATCH_JOB_LEASE", "120"))
+
+# Claims per job before it's marked as failed
+MAX_ATTEMPTS = int(os.getenv("MATCH_JOB_MAX_ATTEMPTS", "3"))
+
+# Seconds a finished (done or failed) job stays readable before it's deleted
+JOB_RETENTION_SECONDS = float(os.getenv("MATCH_JOB_RETENTION", str(7 * 24 * 3600)))
+
+# Minimum seconds between two sweeps of expired finished jobs
+SWEEP_INTERVAL = 60.0
+
+# Seconds between queue polls when idle (submissions in the same process wake workers at once)
+POLL_INTERVAL = 1.0
+
+# Longest wait between retries while the queue itself is failing
+MAX_BACKOFF = 30.0
+
+PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+class JobQueue:
+    """SQLite-backed job queue with deduplication and lease-based crash recovery.
+
+    A job submitted while an identical one (same `dedup_key`) is still pending
+    or running returns the existing job instead. Claimed jobs hold a lease
+    renewed by the worker's heartbeat; if a worker dies, the lease lapses and
+    the job is claimed again, up to MAX_ATTEMPTS times. Every claim gets a new
+    lease token that heartbeats and results must present, so a worker whose
+    lease lapsed can't overwrite the job another worker has since claimed.
+    Finished jobs are deleted `retention_seconds` after they finish, swept by
+    `claim()`.
+    """
+
+    def __init__(self, db_path: str = MATCH_JOBS_DB, lease_seconds: float = JOB_LEASE_SECONDS,
+                 max_attempts: int = MAX_ATTEMPTS, retention_seconds: float = JOB_RETENTION_SECONDS):
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retention_seconds = retention_seconds
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._next_sweep = 0.0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._db is None:
+            # Autocommit mode; multi-statement updates use explicit BEGIN IMMEDIATE
+            if self.db_path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30, isolation_level=None)
+            if self.db_path != ":memory:":
+                self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS match_jobs ("
+                "id TEXT PRIMARY KEY, dedup_key TEXT NOT NULL, status TEXT NOT NULL, payload TEXT NOT NULL, "
+                "result TEXT, error TEXT, attempts INTEGER NOT NULL DEFAULT 0, lease_until REAL, lease_token TEXT, "
+                "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS ix_match_jobs_active_dedup ON match_jobs (dedup_key) "
+                f"WHERE status IN ('{PENDING}', '{RUNNING}')"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS ix_match_jobs_status ON match_jobs (status, created_at)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS ix_match_jobs_finished ON match_jobs (status, updated_at)")
+        return self._db
+
+    def submit(self, payload: Dict[str, Any], dedup_key: str) -> Tuple[str, bool]:
+        """Enqueues a job; returns (job id, created). Identical active jobs are shared."""
+        now = time.time()
+        with self._lock:
+            db = self._connection()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                row = db.execute(
+                    f"SELECT id FROM match_jobs WHERE dedup_key = ? AND status IN ('{PENDING}', '{RUNNING}')",
+                    (dedup_key,),
+                ).fetchone()
+                if row is not None:
+                    db.execute("COMMIT")
+                    return row[0], False
+                job_id = uuid.uuid4().hex
+                db.execute(
+                    "INSERT INTO match_jobs (id, dedup_key, status, payload, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (job_id, dedup_key, PENDING, json.dumps(payload), now, now),
+                )
+                db.execute("COMMIT")
+                return job_id, True
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+
+    def claim(self) -> Optional[Tuple[str, str, Dict[str, Any]]]:
+        """Leases the oldest pending (or abandoned) job; returns (job id, lease token, payload) or None."""
+        now = time.time()
+        with self._lock:
+            db = self._connection()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                # Abandoned jobs that already used all their attempts are given up on
+                db.execute(
+                    f"UPDATE match_jobs SET status = '{FAILED}', error = 'Worker lost too many times', "
+                    f"updated_at = ? WHERE status = '{RUNNING}' AND lease_until < ? AND attempts >= ?",
+                    (now, now, self.max_attempts),
+                )
+                if now >= self._next_sweep:
+                    db.execute(
+                        f"DELETE FROM match_jobs WHERE status IN ('{DONE}', '{FAILED}') AND updated_at < ?",
+                        (now - self.retention_seconds,),
+                    )
+                    self._next_sweep = now + SWEEP_INTERVAL
+                row = db.execute(
+                    f"SELECT id, payload FROM match_jobs WHERE status = '{PENDING}' "
+                    f"OR (status = '{RUNNING}' AND lease_until < ?) ORDER BY created_at LIMIT 1",
+                    (now,),
+                ).fetchone()
+                token = uuid.uuid4().hex
+                if row is not None:
+                    db.execute(
+                        f"UPDATE match_jobs SET status = '{RUNNING}', attempts = attempts + 1, lease_until = ?, "
+                        "lease_token = ?, updated_at = ? WHERE id = ?",
+                        (now + self.lease_seconds, token, now, row[0]),
+                    )
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        return (row[0], token, json.loads(row[1])) if row is not None else None
+
+    def _update(self, job_id: str, token: str, assignments: str, *params: Any) -> bool:
+        """Applies `assignments` if the job is still leased with `token`; returns whether it was."""
+        with self._lock:
+            cursor = self._connection().execute(
+                f"UPDATE match_jobs SET {assignments}, updated_at = ? "
+                f"WHERE id = ? AND lease_token = ? AND status = '{RUNNING}'",
+                (*params, time.time(), job_id, token),
+            )
+        return cursor.rowcount > 0
+
+    def heartbeat(self, job_id: str, token: str) -> bool:
+        return self._update(job_id, token, "lease_until = ?", time.time() + self.lease_seconds)
+
+    def complete(self, job_id: str, token: str, result: Any) -> bool:
+        return self._update(
+            job_id, token, f"status = '{DONE}', result = ?, lease_until = NULL, lease_token = NULL", json.dumps(result)
+        )
+
+    def fail(self, job_id: str, token: str, error: str) -> bool:
+        return self._update(job_id, token, f"status = '{FAILED}', error = ?, lease_until = NULL, lease_token = NULL", error)
+
+    def release(self, job_id: str, token: str) -> bool:
+        """Returns a job to the queue without counting the interrupted attempt (clean shutdown)."""
+        return self._update(
+            job_id, token, f"status = '{PENDING}', attempts = attempts - 1, lease_until = NULL, lease_token = NULL"
+        )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT id, status, attempts, result, error, created_at, updated_at FROM match_jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        job_id, status, attempts, result, error, created_at, updated_at = row
+        return {
+            "id": job_id,
+            "status": status,
+            "attempts": attempts,
+            "result": json.loads(result) if result is not None else None,
+            "error": error,
+            "created_at": created_at,
+            "updated_at": updated_at,
+        }
+
+
+class WorkerPool:
+    """Runs `handler(payload)` for queued jobs on `size` concurrent asyncio workers."""
+
+    def __init__(self, queue: JobQueue, handler: JobHandler, size: int = MATCH_WORKERS,
+                 poll_interval: float = POLL_INTERVAL):
+        self.queue = queue
+        self.handler = handler
+        self.size = size
+        self.poll_interval = poll_interval
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def start(self) -> None:
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._work(n)) for n in range(self.size)]
+
+    def notify(self) -> None:
+        """Wakes idle workers after a submission."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _work(self, number: int) -> None:
+        failures = 0
+        while True:
+            try:
+                claimed = await asyncio.to_thread(self.queue.claim)
+                if claimed is not None:
+                    await self._run(number, *claimed)
+            except Exception:
+                # The queue itself failed (e.g. database locked or unwritable): keep the worker alive
+                failures += 1
+                delay = min(self.poll_interval * 2 ** failures, MAX_BACKOFF)
+                logger.exception("Worker %d couldn't use the job queue; retrying in %.1fs", number, delay)
+                await asyncio.sleep(delay)
+                continue
+            failures = 0
+            if claimed is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _run(self, number: int, job_id: str, token: str, payload: Dict[str, Any]) -> None:
+        logger.info("Worker %d running match job %s", number, job_id)
+        heartbeat = asyncio.create_task(self._heartbeat(job_id, token))
+        try:
+            result = await self.handler(payload)
+        except asyncio.CancelledError:
+            await asyncio.to_thread(self.queue.release, job_id, token)
+            raise
+        except Exception as e:
+            logger.exception("Match job %s failed", job_id)
+            stored = await asyncio.to_thread(self.queue.fail, job_id, token, str(e) or type(e).__name__)
+        else:
+            stored = await asyncio.to_thread(self.queue.complete, job_id, token, result)
+        finally:
+            heartbeat.cancel()
+        if not stored:
+            logger.warning("Worker %d lost the lease on match job %s; its result was discarded", number, job_id)
+
+    async def _heartbeat(self, job_id: str, token: str) -> None:
+        while True:
+            await asyncio.sleep(self.queue.lease_seconds / 3)
+            if not await asyncio.to_thread(self.queue.heartbeat, job_id, token):
+                return
+
+
+# Shared queue used by the API and by standalone workers
+job_queue = JobQueue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=max(2, MATCH_WORKERS))
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    from app.main import run_match_job
+
+    async def run():
+        pool = WorkerPool(job_queue, run_match_job, size=args.workers)
+        pool.start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await pool.stop()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
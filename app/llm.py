@@ -0,0 +1,468 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, Optional, Tuple
+
+import httpx
+
+from app.metrics import COMPLETION_TOKENS, LLM_REQUESTS, PROMPT_TOKENS
+from app.prompts import count_tokens
+from app.utils import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_BASE_URL = os.getenv("openai_base_url") or "https://api.openai.com/v1"
+LLM_MODEL = os.getenv("LLM_MODEL", "gpt-3.5-turbo")
+
+# Upstream requests allowed in flight per worker (also the connection pool size)
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+
+# Requests allowed to wait for a slot before new ones are rejected
+LLM_MAX_QUEUE = int(os.getenv("LLM_MAX_QUEUE", "256"))
+
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+
+# Upstream connections opened during application warm-up (0 = open them on first use)
+LLM_WARMUP_CONNECTIONS = int(os.getenv("LLM_WARMUP_CONNECTIONS", "0"))
+
+# Once this many calls have completed, a call still running past the given
+# percentile of their latencies gets a duplicate (hedged) request; the first
+# reply wins. 0 disables hedging.
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+
+# Recent call latencies the hedging percentile is computed over
+LATENCY_WINDOW = 200
+
+# Circuit breaker: when at least LLM_BREAKER_ERROR_RATE of the last
+# LLM_BREAKER_WINDOW calls failed, calls are rejected for LLM_BREAKER_COOLDOWN
+# seconds, then a single trial call decides whether to close it again
+LLM_BREAKER_WINDOW = int(os.getenv("LLM_BREAKER_WINDOW", "20"))
+LLM_BREAKER_ERROR_RATE = float(os.getenv("LLM_BREAKER_ERROR_RATE", "0.5"))
+LLM_BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", "30"))
+
+SYSTEM_PROMPT = "You are an assistant that evaluates candidates for job positions."
+
+
+class LLMError(Exception):
+    """Raised when the upstream completion API fails or returns an unusable reply."""
+
+
+class LLMOverloadedError(LLMError):
+    """Raised when too many requests are already waiting for an upstream slot."""
+
+
+class LLMTimeoutError(LLMError):
+    """Raised when a call can't finish before the deadline of the request that made it."""
+
+
+class LLMUnavailableError(LLMError):
+    """Raised without calling upstream while the circuit breaker is open."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+# Deadline (`time.monotonic()`) of the request being handled; bounds every LLM call it makes
+_deadline: ContextVar[Optional[float]] = ContextVar("llm_deadline", default=None)
+
+
+@contextmanager
+def request_deadline(seconds: Optional[float]) -> Iterator[Optional[float]]:
+    """Bounds the LLM calls made inside the block, and in tasks it starts, to `seconds` from now.
+
+    A nested scope can shorten the deadline but never extend it.
+    """
+    deadline = None if seconds is None else time.monotonic() + seconds
+    outer = _deadline.get()
+    if outer is not None and (deadline is None or outer < deadline):
+        deadline = outer
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left before the current request's deadline (None without one)."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+class CircuitBreaker:
+    """Fails calls fast while the upstream error rate is too high.
+
+    Closed, it tracks the outcome of the last `window` calls and opens once at
+    least `error_rate` of a full window failed. Open, it rejects every call
+    for `cooldown` seconds. Then it lets one trial call through (half-open):
+    success closes it, failure opens it again. Only the trial's outcome
+    counts while half-open: calls admitted before the breaker opened may
+    still finish then, and are ignored.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+    # Permits returned by `allow()`, to be passed back to `record()`
+    CALL, TRIAL = "call", "trial"
+
+    def __init__(self, window: int = LLM_BREAKER_WINDOW, error_rate: float = LLM_BREAKER_ERROR_RATE,
+                 cooldown: float = LLM_BREAKER_COOLDOWN):
+        self.window = window
+        self.error_rate = error_rate
+        self.cooldown = cooldown
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._state = self.CLOSED
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and self.retry_after() <= 0:
+            return self.HALF_OPEN
+        return self._state
+
+    def retry_after(self) -> float:
+        return max(0.0, self._opened_at + self.cooldown - time.monotonic())
+
+    def allow(self) -> Optional[str]:
+        """Admits a call upstream: returns its permit (CALL, or TRIAL when half-open), or None to reject it.
+
+        A half-open breaker admits one trial call at a time.
+        """
+        state = self.state
+        if state == self.CLOSED:
+            return self.CALL
+        if state == self.HALF_OPEN and not self._trial_running:
+            self._state, self._trial_running = self.HALF_OPEN, True
+            return self.TRIAL
+        return None
+
+    def record(self, ok: Optional[bool], permit: str = CALL) -> None:
+        """Records the outcome of a call admitted with `permit`.
+
+        `ok` None means the call was abandoned (e.g. its deadline passed) without an outcome.
+        """
+        if permit == self.TRIAL:
+            self._trial_running = False
+            if ok is None:
+                return
+            if ok:
+                self._state = self.CLOSED
+                self._outcomes.clear()
+            else:
+                self._open()
+            return
+        if ok is None or self._state != self.CLOSED:
+            return
+        self._outcomes.append(ok)
+        failures = self._outcomes.count(False)
+        if len(self._outcomes) == self.window and failures >= self.error_rate * self.window:
+            self._open()
+
+    def _open(self) -> None:
+        logger.warning("LLM circuit breaker open for %.0fs", self.cooldown)
+        self._state, self._opened_at = self.OPEN, time.monotonic()
+        self._outcomes.clear()
+
+
+class LLMClient:
+    """Async client for an OpenAI-compatible chat completions API.
+
+    A single pooled keep-alive `httpx.AsyncClient` is reused across requests, a
+    semaphore bounds the calls in flight and a waiting-room limit provides
+    backpressure. Identical payloads that are already in flight are coalesced
+    into one upstream call.
+
+    Calls are bounded by the request deadline (`request_deadline`). A call
+    slower than the LLM_HEDGE_PERCENTILE latency of recent calls is hedged
+    with a duplicate request when a slot is free, and a `CircuitBreaker`
+    rejects calls while the upstream keeps failing.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = OPENAI_API_KEY,
+        base_url: str = OPENAI_BASE_URL,
+        model: str = LLM_MODEL,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        max_queue: int = LLM_MAX_QUEUE,
+        timeout: float = LLM_TIMEOUT,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        hedge_percentile: float = LLM_HEDGE_PERCENTILE,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._transport = transport
+        self._loop = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._inflight = SingleFlight()
+        self._waiting = 0
+        self.hedge_percentile = hedge_percentile
+        self.breaker = breaker or CircuitBreaker()
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        # Closes of clients left behind by previous event loops, still running
+        self._closing: set = set()
+
+    def _bind(self) -> None:
+        """Creates the pool and semaphore for the running event loop (once per loop)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        if self._client is not None:
+            self._retire(self._client, self._loop)
+        self._loop = loop
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={"Authorization": f"Bearer {self.api_key or ''}"},
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+                keepalive_expiry=30.0,
+            ),
+            transport=self._transport,
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._inflight = SingleFlight()
+        self._waiting = 0
+
+    def _retire(self, client: httpx.AsyncClient, loop: asyncio.AbstractEventLoop) -> None:
+        """Closes a client created on a previous event loop, on that loop while it still runs."""
+        if loop.is_running():
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            return
+        # Its loop has stopped: close it from here, ignoring connections that can't be
+        # shut down cleanly without their loop
+        task = asyncio.ensure_future(client.aclose())
+        self._closing.add(task)
+        task.add_done_callback(lambda done: self._closing.discard(done) or done.cancelled() or done.exception())
+
+    async def warm_up(self, connections: int = LLM_WARMUP_CONNECTIONS) -> int:
+        """Opens up to `connections` keep-alive connections (TLS included); returns how many succeeded.
+
+        Uses the free `GET /models` endpoint. Failures are logged, not raised:
+        the first real calls will simply connect on their own.
+        """
+        self._bind()
+        connections = min(connections, self.max_concurrency)
+        results = await asyncio.gather(
+            *(self._client.get("/models") for _ in range(connections)), return_exceptions=True
+        )
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            logger.warning("LLM warm-up: %d of %d connections failed (%r)", len(errors), connections, errors[0])
+        return connections - len(errors)
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+        self._client = None
+        self._loop = None
+
+    def build_payload(self, prompt: str, max_tokens: int, **params: Any) -> Dict[str, Any]:
+        return {
+            "model": params.pop("model", self.model),
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt},
+            ],
+            "max_tokens": max_tokens,
+            **params,
+        }
+
+    async def complete(self, prompt: str, max_tokens: int = 1500, **params: Any) -> str:
+        """Returns the assistant message for `prompt`, sharing identical in-flight calls."""
+        self._bind()
+        payload = self.build_payload(prompt, max_tokens, **params)
+        key = hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+        try:
+            # A shared call runs under the deadline of the request that started it
+            return await asyncio.wait_for(self._inflight.do(key, lambda: self._post(payload)), remaining_time())
+        except asyncio.TimeoutError:
+            raise LLMTimeoutError("Request deadline passed before the completion finished") from None
+
+    async def _acquire(self) -> None:
+        """Waits for an upstream slot, rejecting the call if the waiting room is full."""
+        if self._waiting >= self.max_queue:
+            LLM_REQUESTS.inc(outcome="overloaded")
+            raise LLMOverloadedError(f"{self._waiting} LLM requests already waiting")
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds after which a running call is hedged, or None when hedging is off or unwarmed."""
+        if not self.hedge_percentile or len(self._latencies) < LLM_HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * self.hedge_percentile / 100))]
+
+    def _check_breaker(self) -> str:
+        """Returns the breaker's permit for a call, or raises LLMUnavailableError while it's open."""
+        permit = self.breaker.allow()
+        if permit is None:
+            LLM_REQUESTS.inc(outcome="rejected")
+            retry_after = self.breaker.retry_after()
+            raise LLMUnavailableError(f"LLM circuit breaker open; retry in {retry_after:.0f}s", retry_after)
+        return permit
+
+    async def _post(self, payload: Dict[str, Any]) -> str:
+        permit = self._check_breaker()
+        remaining = remaining_time()
+        try:
+            if remaining is not None and remaining <= 0:
+                raise asyncio.TimeoutError
+            content, body = await asyncio.wait_for(self._hedged(payload), remaining)
+        except asyncio.TimeoutError:
+            self.breaker.record(None, permit)
+            LLM_REQUESTS.inc(outcome="timeout")
+            raise LLMTimeoutError("Request deadline passed before the completion finished") from None
+        except LLMOverloadedError:
+            self.breaker.record(None, permit)
+            raise
+        except LLMError:
+            self.breaker.record(False, permit)
+            raise
+        except BaseException:
+            self.breaker.record(None, permit)
+            raise
+        self.breaker.record(True, permit)
+        self._record_usage(payload, content, body.get("usage"))
+        return content
+
+    async def _hedged(self, payload: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """Runs the call, adding a duplicate once it outlives the hedge delay; the first success wins."""
+        await self._acquire()
+        attempts = [self._start_attempt(payload)]
+        try:
+            delay = self.hedge_delay()
+            if delay is not None:
+                await asyncio.wait(attempts, timeout=delay)
+                # Hedge only with a free slot, so hedging never queues behind or starves other calls
+                if not attempts[0].done() and not self._semaphore.locked():
+                    await self._semaphore.acquire()
+                    LLM_REQUESTS.inc(outcome="hedged")
+                    attempts.append(self._start_attempt(payload))
+
+            pending, error = set(attempts), None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for attempt in done:
+                    if attempt.exception() is None:
+                        if attempt is not attempts[0]:
+                            LLM_REQUESTS.inc(outcome="hedge_won")
+                        return attempt.result()
+                    error = attempt.exception()
+            raise error
+        finally:
+            for attempt in attempts:
+                attempt.cancel()
+
+    def _start_attempt(self, payload: Dict[str, Any]) -> asyncio.Future:
+        """Starts one upstream request holding a slot the caller acquired; the slot is freed when it ends."""
+        attempt = asyncio.ensure_future(self._attempt(payload))
+        # A done callback, unlike `finally`, also runs for a task cancelled before it started
+        attempt.add_done_callback(lambda _: self._semaphore.release())
+        return attempt
+
+    async def _attempt(self, payload: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        started = time.monotonic()
+        try:
+            response = await self._client.post("/chat/completions", json=payload)
+            response.raise_for_status()
+            body = response.json()
+            content = body["choices"][0]["message"]["content"]
+        except (httpx.HTTPError, KeyError, IndexError, ValueError) as e:
+            LLM_REQUESTS.inc(outcome="error")
+            raise LLMError(f"Completion request failed: {e!r}") from e
+        self._latencies.append(time.monotonic() - started)
+        return content, body
+
+    @staticmethod
+    def _record_usage(payload: Dict[str, Any], content: str, usage: Optional[Dict[str, Any]] = None) -> None:
+        """Records token counts, from the API's `usage` when given, otherwise estimated."""
+        usage = usage or {}
+        prompt_tokens = usage.get("prompt_tokens")
+        if prompt_tokens is None:
+            prompt_tokens = sum(count_tokens(message["content"]) for message in payload["messages"])
+        completion_tokens = usage.get("completion_tokens")
+        if completion_tokens is None:
+            completion_tokens = count_tokens(content or "")
+        LLM_REQUESTS.inc(outcome="ok")
+        PROMPT_TOKENS.observe(prompt_tokens)
+        COMPLETION_TOKENS.observe(completion_tokens)
+
+    async def stream(self, prompt: str, max_tokens: int = 1500, **params: Any) -> AsyncIterator[str]:
+        """Yields the assistant message as it is generated (server-sent events).
+
+        Streams are never coalesced or hedged, but they share the concurrency
+        limit, the circuit breaker and the request deadline.
+        """
+        self._bind()
+        permit = self._check_breaker()
+        payload = {**self.build_payload(prompt, max_tokens, **params), "stream": True}
+        remaining = remaining_time()
+        # When the deadline comes first, an httpx timeout means the deadline passed
+        deadline_bound = remaining is not None and remaining < self.timeout
+        timeout = self.timeout if remaining is None else max(0.0, min(self.timeout, remaining))
+        received = []
+        ok, acquired = None, False
+        try:
+            # Inside the try, so a call rejected or cancelled while queued still
+            # hands back a half-open breaker's trial
+            await self._acquire()
+            acquired = True
+            async with self._client.stream("POST", "/chat/completions", json=payload, timeout=timeout) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    remaining = remaining_time()
+                    if remaining is not None and remaining <= 0:
+                        LLM_REQUESTS.inc(outcome="timeout")
+                        raise LLMTimeoutError("Request deadline passed while the completion was streaming")
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+                    if delta:
+                        received.append(delta)
+                        yield delta
+            ok = True
+        except httpx.TimeoutException as e:
+            if not deadline_bound:
+                ok = False
+                LLM_REQUESTS.inc(outcome="error")
+                raise LLMError(f"Completion stream failed: {e!r}") from e
+            # Same as `_post`: a call cut off by the request deadline isn't an upstream failure
+            LLM_REQUESTS.inc(outcome="timeout")
+            raise LLMTimeoutError("Request deadline passed while the completion was streaming") from None
+        except (httpx.HTTPError, KeyError, IndexError, ValueError) as e:
+            ok = False
+            LLM_REQUESTS.inc(outcome="error")
+            raise LLMError(f"Completion stream failed: {e!r}") from e
+        finally:
+            if acquired:
+                self._semaphore.release()
+            self.breaker.record(ok, permit)
+        self._record_usage(payload, "".join(received))
+
+
+# Shared client; its connection pool lives for the whole worker process
+llm_client = LLMClient()
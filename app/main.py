@@ -1,22 +1,106 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-from typing import List
-import openai
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import date, timedelta
+import logging
+import tempfile
+import time
+from fastapi import Body, FastAPI, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
 import os
-from dotenv import load_dotenv
 import json  # Import the JSON module for safe parsing
+import math
 
+from app.cache import cache_key, result_cache
+from app.cascade import Budget
+from app.candidate_store import candidate_store
+from app.fast_scoring import fast_match
+from app.ingest import FORMATS, ingest_stream
+from app.jobs import MATCH_WORKERS, WorkerPool, job_queue
+from app.llm import LLMError, LLMOverloadedError, LLMTimeoutError, LLMUnavailableError, llm_client, request_deadline
+from app.metrics import REQUEST_SECONDS, registry, server_timing, span, start_trace, summarize
+from app.parsing import ResponseParseError
+from app.profiling import PROFILING_ENABLED, SamplingProfiler, profile_store
+from app.repository import find_eligible
+from app.services import evaluate_batch, evaluate_candidates, evaluate_cascade, stream_candidates
+from app.warmup import warm_up
 
-# Load environment variables from the .env file
-load_dotenv()
+logger = logging.getLogger(__name__)
 
-app = FastAPI()
+# Level of the app's log lines (request timings, warm-up, failures)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 
-# Configure the OpenAI API key
-openai.api_key = os.getenv("OPENAI_API_KEY")
+# Default end-to-end deadline (seconds) of a match; the model calls it makes
+# are cut off when it passes. `budget.deadline_ms` overrides it per request.
+MATCH_TIMEOUT = float(os.getenv("MATCH_TIMEOUT", "60"))
 
-# Configure the OpenAI API base URL
-openai.api_base = os.getenv("openai_base_url")
+# What /match does when the model misses the deadline or its circuit breaker
+# is open: "fast" answers with the non-LLM ranking, "error" returns 504/503
+MATCH_LLM_FALLBACK = os.getenv("MATCH_LLM_FALLBACK", "fast")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Configured when the server starts, not on import; a no-op if the host
+    # (uvicorn --log-config, pytest) already set up the root logger
+    logging.basicConfig(level=LOG_LEVEL, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    # Preload the roster, its indexes and connection pools in the background;
+    # /health/ready reports 503 until this is done
+    warming = asyncio.create_task(warm_up.run())
+    # Resume queued match jobs, including any left running by a crashed worker
+    if worker_pool.size:
+        worker_pool.start()
+    yield
+    warming.cancel()
+    # Let a warm-up still in flight unwind before the pools it uses are closed
+    await asyncio.gather(warming, return_exceptions=True)
+    await worker_pool.stop()
+    await llm_client.aclose()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+@app.middleware("http")
+async def instrument(request: Request, call_next):
+    """Times each request and its matching stages; samples it too if `X-Profile: 1` is sent."""
+    trace = start_trace()
+    profiler = None
+    if PROFILING_ENABLED and request.headers.get("x-profile") == "1":
+        profiler = SamplingProfiler().start()
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        if profiler is not None:
+            profile_id = profile_store.add(profiler.stop())
+
+    route = request.scope.get("route")
+    path = getattr(route, "path", "unmatched")
+    # Streamed responses (/match/stream) do their work while the body is sent,
+    # after the headers: only stages finished by now go in Server-Timing, and
+    # the request is timed and logged once the body is complete
+    if trace:
+        response.headers["Server-Timing"] = server_timing(trace)
+    if profiler is not None:
+        response.headers["X-Profile-Id"] = profile_id
+    body = response.body_iterator
+
+    async def timed_body():
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            elapsed = time.perf_counter() - started
+            REQUEST_SECONDS.observe(elapsed, method=request.method, path=path, status=str(response.status_code))
+            if trace:
+                stages = " ".join(f"{stage}={ms:.1f}ms" for stage, ms in summarize(trace).items())
+                logger.info("%s %s %d %.1fms %s", request.method, path, response.status_code, elapsed * 1000, stages)
+
+    response.body_iterator = timed_body()
+    return response
 
 # Models
 class Job(BaseModel):
@@ -28,89 +112,294 @@ class Job(BaseModel):
     required_skills: str
     years_experience: int
 
+class MatchFilters(BaseModel):
+    # Hard requirements applied before any scoring (as SQL WHERE clauses with the database backend)
+    min_years_experience: Optional[int] = Field(default=None, ge=0)
+    location: Optional[str] = None
+    available_by: Optional[date] = None
+    # Engagement start; candidates must be free by start_date + start_window_days
+    start_date: Optional[date] = None
+    start_window_days: int = Field(default=0, ge=0, le=365)
+
+    def values(self):
+        values = self.model_dump(exclude_none=True, exclude={"start_date", "start_window_days"})
+        if self.start_date is not None:
+            deadline = self.start_date + timedelta(days=self.start_window_days)
+            values["available_by"] = min(deadline, values.get("available_by", deadline))
+        return values
+
+class MatchBudget(BaseModel):
+    # Token limit of the LLM tier of mode=cascade; the LLM band shrinks to fit it
+    max_tokens: Optional[int] = Field(default=None, ge=0)
+    # End-to-end deadline of the request (all modes; defaults to MATCH_TIMEOUT)
+    deadline_ms: Optional[int] = Field(default=None, ge=0)
+
 class MatchRequest(BaseModel):
     job: Job
+    # Number of retrieved candidates sent to the LLM (defaults to SHORTLIST_SIZE;
+    # with mode=cascade, the LLM band size, defaulting to CASCADE_BAND_SIZE)
+    shortlist_size: Optional[int] = Field(default=None, ge=1, le=500)
+    filters: Optional[MatchFilters] = None
+    budget: Optional[MatchBudget] = None
+
+    def filter_values(self):
+        return (self.filters.values() or None) if self.filters else None
+
+    def timeout(self):
+        if self.budget and self.budget.deadline_ms is not None:
+            return self.budget.deadline_ms / 1000
+        return MATCH_TIMEOUT
+
+def match_error(e):
+    """Maps a failed match to an HTTP error that says what went wrong upstream."""
+    if isinstance(e, LLMOverloadedError):
+        # Backpressure: too many completions already queued on this worker
+        return HTTPException(status_code=503, detail="Matching service is busy. Please retry shortly.",
+                             headers={"Retry-After": "1"})
+    if isinstance(e, LLMUnavailableError):
+        return HTTPException(status_code=503, detail="Matching model is unavailable. Please retry later.",
+                             headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))})
+    if isinstance(e, LLMTimeoutError):
+        return HTTPException(status_code=504, detail="Matching did not finish before the deadline.")
+    if isinstance(e, ResponseParseError):
+        # Replies with no recoverable candidate evaluation
+        return HTTPException(
+            status_code=502,
+            detail="Invalid response format from OpenAI. Please check the prompt or the OpenAI API response."
+        )
+    return HTTPException(status_code=502, detail="Matching model request failed.")
+
+async def rank_fast(request, tier=None):
+    """Vectorized offline scoring over the precomputed candidate feature matrix."""
+    with span("candidate_load"):
+        snapshot = candidate_store.snapshot()
+        filters = request.filter_values()
+        eligible_ids = [c["id"] for c in await find_eligible(snapshot, filters)] if filters else None
+    with span("rank"):
+        matches = fast_match(request.job.model_dump(), snapshot, top_k=3, eligible_ids=eligible_ids)
+    return [{**match, "tier": tier} for match in matches]
 
 class CandidateMatch(BaseModel):
     full_name: str
     score: float
     explanation: str
+    # Which cascade tier produced the score ("llm" or "fast"; mode=cascade only)
+    tier: Optional[Literal["llm", "fast"]] = None
+
+@app.post("/match", response_model=List[CandidateMatch], response_model_exclude_none=True)
+async def match_candidates(
+    request: MatchRequest,
+    response: Response,
+    mode: Literal["llm", "fast", "cascade"] = Query(
+        "llm",
+        description="'fast' scores the whole roster with NumPy, without the LLM; 'cascade' ranks with the fast "
+                    "scorer and has the LLM re-rank only the top band, sized to the request's budget",
+    ),
+):
+    """Returns the top 3 candidates for a job.
 
-@app.post("/match", response_model=List[CandidateMatch])
-async def match_candidates(request: MatchRequest):
+    Model calls are cut off at the request deadline. When it passes, or the
+    model's circuit breaker is open, the fast ranking is returned instead
+    (with `X-Match-Degraded` set) unless MATCH_LLM_FALLBACK is "error".
+    """
     try:
-        # Step 1: Load candidates from a JSON file
-        with open("app/data/candidates.json", "r") as f:
-            candidates = json.load(f)
-
-        # Step 2: Construct a single prompt with all candidate profiles
-        candidate_profiles = "\n".join(
-            f"""
-            Candidate {i + 1}:
-            Name: {candidate.get('first_name', '')} {candidate.get('last_name', '')}
-            Title: {candidate.get('title', 'N/A')}
-            Skills: {candidate.get('skills', 'N/A')}
-            Experience: {candidate.get('years_experience', 'N/A')} years
-            Industry Experience: {candidate.get('industry_experience', 'N/A')}
-            Location: {candidate.get('location', 'N/A')}
-            """
-            for i, candidate in enumerate(candidates)
-        )
+        if mode == "fast":
+            return await rank_fast(request)
+
+        with request_deadline(request.timeout()) as deadline:
+            if mode == "cascade":
+                max_tokens = request.budget.max_tokens if request.budget else None
+                return await evaluate_cascade(
+                    request.job.model_dump(), top_k=3, filters=request.filter_values(),
+                    band_size=request.shortlist_size, budget=Budget(max_tokens=max_tokens, deadline=deadline),
+                )
+
+            # Shortlist from the shared candidate snapshot, then score chunks concurrently
+            # through the pooled async LLM client and keep the global top 3
+            return await evaluate_candidates(
+                request.job.model_dump(), request.shortlist_size, top_k=3, filters=request.filter_values()
+            )
+
+    except (LLMError, ResponseParseError) as e:
+        if isinstance(e, (LLMTimeoutError, LLMUnavailableError)) and MATCH_LLM_FALLBACK == "fast":
+            logger.warning("Serving fast matches instead of the LLM: %s", e)
+            response.headers["X-Match-Degraded"] = "timeout" if isinstance(e, LLMTimeoutError) else "circuit_open"
+            return await rank_fast(request, tier="fast")
+        logger.warning("Match failed upstream: %r", e)
+        raise match_error(e)
+    except Exception as e:
+        # Capture other errors and return a 500 error message
+        logger.exception("Error in /match endpoint: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+class BatchMatchResult(BaseModel):
+    # Position of the job in the request list
+    index: int
+    matches: List[CandidateMatch] = []
+    error: Optional[str] = None
 
-        prompt = f"""
-        Based on the job description below, evaluate and rank the candidates provided. 
-        For each candidate, provide a score (0-10) and an explanation for the score.
-        Return the results in the following JSON format:
-        [
-            {{
-                "full_name": "Candidate Name",
-                "score": float,
-                "explanation": "Reason for the score"
-            }},
-            ...
-        ]
-
-        Job Description:
-        {request.job.dict()}
-
-        Candidate Profiles:
-        {candidate_profiles}
-        """
-
-        # Step 3: Call the OpenAI model using ChatCompletion
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are an assistant that evaluates candidates for job positions."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=1500  # Adjust max_tokens based on the size of the input
+async def run_match_job(payload):
+    """Worker handler for queued /match jobs; returns the JSON-ready matches."""
+    request = MatchRequest.model_validate(payload)
+    with request_deadline(request.timeout()):
+        matches = await evaluate_candidates(
+            request.job.model_dump(), request.shortlist_size, top_k=3, filters=request.filter_values()
         )
+    return [CandidateMatch(**match).model_dump() for match in matches]
 
-        # Step 4: Extract and parse the response
-        content = response['choices'][0]['message']['content']
-        print(f"Raw OpenAI response: {content}")  # Debugging log
+worker_pool = WorkerPool(job_queue, run_match_job, size=MATCH_WORKERS)
 
-        # Remove Markdown-style code block formatting if present
-        if content.startswith("```") and content.endswith("```"):
-            content = content.strip("```").strip("json").strip()
+class MatchJob(BaseModel):
+    id: str
+    status: Literal["pending", "running", "done", "failed"]
+    attempts: int = 0
+    result: Optional[List[CandidateMatch]] = None
+    error: Optional[str] = None
+    created_at: float
+    updated_at: float
 
-        # Safely parse the response content as JSON
-        scored_candidates = json.loads(content)
+@app.post("/match/jobs", status_code=202)
+async def submit_match_job(request: MatchRequest):
+    """Queues a match and returns its job id at once; poll `GET /match/jobs/{id}` for the result.
 
-        # Step 5: Sort candidates by score in descending order
-        top_candidates = sorted(scored_candidates, key=lambda c: c["score"], reverse=True)[:3]
+    Submitting a request identical to one still pending or running returns
+    that job instead of queueing the work twice.
+    """
+    filters = request.filter_values()
+    dedup_key = cache_key(
+        request.job.model_dump(), candidate_store.version, shortlist_size=request.shortlist_size,
+        top_k=3, filters=sorted(filters.items()) if filters else None,
+        budget=sorted(request.budget.model_dump().items()) if request.budget else None,
+    )
+    job_id, created = await run_in_threadpool(job_queue.submit, request.model_dump(mode="json"), dedup_key)
+    worker_pool.notify()
+    return {"id": job_id, "status_url": f"/match/jobs/{job_id}", "deduplicated": not created}
 
-        return top_candidates
+@app.get("/match/jobs/{job_id}", response_model=MatchJob)
+async def get_match_job(job_id: str):
+    """Reports a queued match's status and, once done, its matches."""
+    job = await run_in_threadpool(job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Match job not found")
+    return job
 
-    except json.JSONDecodeError as e:
-        # Handle JSON parsing errors
-        print(f"JSON parsing error: {e}")
-        raise HTTPException(
-            status_code=500,
-            detail="Invalid response format from OpenAI. Please check the prompt or the OpenAI API response."
-        )
+
+@app.post("/match/batch", response_model=List[BatchMatchResult])
+async def match_candidates_batch(
+    requests: List[MatchRequest] = Body(..., min_length=1, max_length=100),
+    mode: Literal["llm", "fast"] = Query("llm", description="'fast' scores the whole roster with NumPy, without the LLM"),
+):
+    """Matches many jobs in one call against a shared candidate snapshot.
+
+    In LLM mode the jobs' shortlists are packed together into combined model
+    calls; a job whose calls all failed gets an `error` instead of matches.
+    """
+    try:
+        if mode == "fast":
+            snapshot = candidate_store.snapshot()
+            eligible = []
+            for request in requests:
+                filters = request.filter_values()
+                eligible.append([c["id"] for c in await find_eligible(snapshot, filters)] if filters else None)
+
+            def rank_all():
+                # Up to 100 full-roster scorings: keep them off the event loop
+                return [
+                    {"index": index, "matches": fast_match(request.job.model_dump(), snapshot, top_k=3, eligible_ids=ids)}
+                    for index, (request, ids) in enumerate(zip(requests, eligible))
+                ]
+
+            return await run_in_threadpool(rank_all)
+
+        # The jobs share model calls, so the batch runs to its tightest deadline
+        with request_deadline(min(request.timeout() for request in requests)):
+            results = await evaluate_batch([
+                {"job": request.job.model_dump(), "shortlist_size": request.shortlist_size, "filters": request.filter_values()}
+                for request in requests
+            ], top_k=3)
+        return [{"index": index, **result} for index, result in enumerate(results)]
+
+    except (LLMError, ResponseParseError) as e:
+        logger.warning("Batch match failed upstream: %r", e)
+        raise match_error(e)
     except Exception as e:
-        # Capture other errors and return a 500 error message
-        print(f"Error in /match endpoint: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error")
\ No newline at end of file
+        logger.exception("Error in /match/batch endpoint: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@app.post("/match/stream")
+async def match_candidates_stream(request: MatchRequest):
+    """Streams matches as NDJSON: one `candidate` event per scored candidate, then the ranked `result`."""
+    def public(match):
+        return CandidateMatch(**match).model_dump(exclude_none=True)
+
+    async def events():
+        # The deadline starts when streaming does, which is when the model calls are made
+        with request_deadline(request.timeout()):
+            async for event, data in stream_candidates(
+                request.job.model_dump(), request.shortlist_size, top_k=3, filters=request.filter_values()
+            ):
+                if event == "candidate":
+                    data = public(data)
+                elif event == "result":
+                    data = [public(match) for match in data]
+                yield json.dumps({"event": event, "data": data}) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+@app.get("/match/cache")
+async def match_cache_stats():
+    """Reports hit/miss counters of the match result cache."""
+    return result_cache.stats()
+
+
+@app.get("/health/live")
+async def health_live():
+    """Liveness probe: the process is up and serving."""
+    return {"status": "ok"}
+
+
+@app.get("/health/ready")
+async def health_ready():
+    """Readiness probe: 200 once warm-up has preloaded the roster and opened connections, 503 before."""
+    return JSONResponse(warm_up.to_dict(), status_code=200 if warm_up.ready else 503)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Request, stage, token, pool-size and cache metrics in the Prometheus text format."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/debug/profiles/{profile_id}", response_class=PlainTextResponse)
+async def get_profile(profile_id: str):
+    """Collapsed stacks of a request profiled with `X-Profile: 1` (flamegraph.pl / speedscope input)."""
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile
+
+
+@app.post("/candidates/ingest")
+async def ingest_candidates(
+    request: Request,
+    format: Literal[FORMATS] = Query(..., description="Record format of the request body"),
+    batch_size: int = Query(1000, ge=1, le=50_000),
+):
+    """Bulk-loads candidates from the raw request body (NDJSON, JSON array or CSV).
+
+    The body is spooled to disk as it arrives and ingested in batched
+    transactions on a worker thread, so neither step holds the whole upload.
+    """
+    with tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) as upload:
+        async for chunk in request.stream():
+            upload.write(chunk)
+        upload.seek(0)
+        try:
+            report = await run_in_threadpool(ingest_stream, upload, format, batch_size)
+        except Exception as e:
+            logger.exception("Error in /candidates/ingest endpoint: %s", e)
+            raise HTTPException(status_code=500, detail="Candidate ingestion failed")
+    return report.to_dict()
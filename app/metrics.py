@@ -0,0 +1,191 @@
+"""In-process metrics exported in the Prometheus text format on `/metrics`.
+
+Only counters and histograms are needed, so they are implemented here rather
+than pulling in `prometheus_client`. Matching stages are timed with `span`,
+which feeds `match_stage_duration_seconds` and the per-request trace that is
+logged and returned in the `Server-Timing` header.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TOKEN_BUCKETS = (50, 100, 250, 500, 1000, 1500, 2000, 3000, 4000, 8000)
+SIZE_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 10_000, 100_000)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}", *self.samples()]
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets: Sequence[float], labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [non-cumulative bucket counts..., +Inf count], sum
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._series.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[bisect_left(self.buckets, value)] += 1
+            total[0] += value
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(self._key(labels))
+        return sum(series[0]) if series else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            series = sorted((key, (list(counts), total[0])) for key, (counts, total) in self._series.items())
+        lines = []
+        for key, (counts, total) in series:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                lines.append(f"{self.name}_bucket{_format_labels((*self.labelnames, 'le'), (*key, le))} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self._metrics for line in metric.render()) + "\n"
+
+
+registry = Registry()
+
+REQUEST_SECONDS = registry.register(Histogram(
+    "http_request_duration_seconds", "Time until the response body is fully sent (streams included), by route.",
+    LATENCY_BUCKETS, ("method", "path", "status"),
+))
+STAGE_SECONDS = registry.register(Histogram(
+    "match_stage_duration_seconds", "Time spent in each matching stage.", LATENCY_BUCKETS, ("stage",),
+))
+CANDIDATE_POOL_SIZE = registry.register(Histogram(
+    "match_candidate_pool_size", "Candidates selected for scoring per job.", SIZE_BUCKETS,
+))
+PROMPT_TOKENS = registry.register(Histogram(
+    "llm_prompt_tokens", "Prompt tokens per LLM call.", TOKEN_BUCKETS,
+))
+COMPLETION_TOKENS = registry.register(Histogram(
+    "llm_completion_tokens", "Completion tokens per LLM call.", TOKEN_BUCKETS,
+))
+LLM_REQUESTS = registry.register(Counter(
+    "llm_requests_total", "LLM calls by outcome.", ("outcome",),
+))
+CACHE_REQUESTS = registry.register(Counter(
+    "match_cache_requests_total", "Result cache lookups and memoized candidate scores, by outcome.",
+    ("cache", "result"),
+))
+CASCADE_CANDIDATES = registry.register(Counter(
+    "match_cascade_candidates_total", "Cascade candidates whose final score came from each tier.", ("tier",),
+))
+
+# Stage timings of the request being handled, for the log line and Server-Timing header
+_trace: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("match_trace", default=None)
+
+
+def start_trace() -> List[Tuple[str, float]]:
+    trace: List[Tuple[str, float]] = []
+    _trace.set(trace)
+    return trace
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Times a matching stage (candidate_load, prompt_build, llm_call, parse, rank...)."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, stage=stage)
+        trace = _trace.get()
+        if trace is not None:
+            trace.append((stage, elapsed))
+
+
+def summarize(trace: Sequence[Tuple[str, float]]) -> Dict[str, float]:
+    """Total milliseconds per stage, in first-seen order.
+
+    Concurrent chunks overlap, so a stage's total can exceed the request time.
+    """
+    totals: Dict[str, float] = {}
+    for stage, seconds in trace:
+        totals[stage] = totals.get(stage, 0.0) + seconds * 1000
+    return totals
+
+
+def server_timing(trace: Sequence[Tuple[str, float]]) -> str:
+    return ", ".join(f"{stage};dur={ms:.1f}" for stage, ms in summarize(trace).items())
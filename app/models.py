@@ -1,7 +1,9 @@
 from typing import Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from datetime import date
 
+from app.candidate_store import parse_staffing_date
+
 
 class JobRequest(BaseModel):
     cst_name: str
@@ -25,6 +27,16 @@ class CandidateSchema(BaseModel):
     industry_experience: str
     location: str
 
+    @field_validator("staffing_end_date", mode="before")
+    @classmethod
+    def parse_staffing_end_date(cls, value):
+        # Accept the MM-DD-YYYY format used by candidates.json as well as ISO dates
+        return parse_staffing_date(value)
+
+
+class CandidateIn(CandidateSchema):
+    id: Optional[int] = None  # Rows without an id are inserted; rows with one are upserted
+
 
 class Config:
     orm_mode = True  # Important! Enables ORM compatibility
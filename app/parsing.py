@@ -0,0 +1,142 @@
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+# Characters that can change the scanner state; everything else is skipped in bulk
+_OUTSIDE = re.compile(r"\{")
+_IN_OBJECT = re.compile(r'[{}"]')
+_IN_STRING = re.compile(r'["\\]')
+
+
+class JSONObjectStream:
+    """Incrementally extracts top-level JSON objects from model output.
+
+    Text is fed in arbitrary pieces (e.g. streamed tokens); every `{...}` object
+    that closes at nesting depth zero is decoded and returned as soon as its
+    closing brace arrives. Anything outside objects -- code fences, the
+    surrounding `[`/`]`, commas or prose -- is ignored, and an object cut off
+    by the end of the output is simply never returned.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._start = -1
+        self._depth = 0
+        self._in_string = False
+        # Raw text of closed objects that weren't valid JSON, for lenient recovery
+        self.rejected: List[str] = []
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        """Consumes more text and returns the objects completed by it."""
+        self._buffer += text
+        objects: List[Dict[str, Any]] = []
+        buffer = self._buffer
+        pos = self._pos
+        while True:
+            if self._start < 0:
+                match = _OUTSIDE.search(buffer, pos)
+                if match is None:
+                    pos = len(buffer)
+                    break
+                self._start = match.start()
+                self._depth = 1
+                pos = match.end()
+            elif self._in_string:
+                match = _IN_STRING.search(buffer, pos)
+                if match is None:
+                    pos = len(buffer)
+                    break
+                if match.group() == "\\":
+                    if match.end() >= len(buffer):
+                        pos = match.start()  # Wait for the escaped character
+                        break
+                    pos = match.end() + 1
+                else:
+                    self._in_string = False
+                    pos = match.end()
+            else:
+                match = _IN_OBJECT.search(buffer, pos)
+                if match is None:
+                    pos = len(buffer)
+                    break
+                char = match.group()
+                pos = match.end()
+                if char == '"':
+                    self._in_string = True
+                elif char == "{":
+                    self._depth += 1
+                else:
+                    self._depth -= 1
+                    if self._depth == 0:
+                        self._emit(buffer[self._start:pos], objects)
+                        self._start = -1
+
+        # Drop consumed text so the buffer only ever holds the object being read
+        keep_from = self._start if self._start >= 0 else pos
+        self._buffer = buffer[keep_from:]
+        self._pos = pos - keep_from
+        if self._start >= 0:
+            self._start = 0
+        return objects
+
+    def _emit(self, text: str, objects: List[Dict[str, Any]]) -> None:
+        try:
+            # strict=False accepts raw newlines inside strings (multi-line explanations)
+            value = json.loads(text, strict=False)
+        except ValueError:
+            self.rejected.append(text)
+            return
+        if isinstance(value, dict):
+            objects.append(value)
+
+
+class ResponseParseError(ValueError):
+    """Raised when no candidate evaluation can be recovered from a model reply."""
+
+
+# Lenient per-field extraction for objects that aren't valid JSON (single quotes, trailing commas, "8/10")
+_FIELD_PATTERNS = {
+    "id": re.compile(r"""["']?\bid["']?\s*:\s*["']?([\w-]+)"""),
+    # The closing quote is the one before the next field, so apostrophes (O'Brien) stay in the name
+    "full_name": re.compile(r"""["']?full_name["']?\s*:\s*["']([^\n]+?)["']\s*(?=[,}]|$)"""),
+    "score": re.compile(r"""["']?score["']?\s*:\s*["']?(\d+(?:\.\d+)?)"""),
+    "explanation": re.compile(r"""["']?explanation["']?\s*:\s*["'](.*?)["']?\s*,?\s*\}?\s*$""", re.S),
+}
+
+# Plain-text replies such as "1. Name: Ana Lee\nScore: 8/10\nExplanation: ..." (explanations may span lines)
+_LABELLED_ENTRY = re.compile(
+    r"""(?:^|\n)[ \t]*(?:\d+[.)][ \t]*)?(?:\*\*)?(?:Full[ _]Name|Name|Candidate|ID)(?:\*\*)?[ \t]*:[ \t]*(?:\*\*)?(?P<full_name>[^\n*]+?)(?:\*\*)?[ \t]*\n"""
+    r"""[ \t]*(?:-[ \t]*)?(?:\*\*)?Score(?:\*\*)?[ \t]*:[ \t]*(?:\*\*)?(?P<score>\d+(?:\.\d+)?)[^\n]*\n"""
+    r"""[ \t]*(?:-[ \t]*)?(?:\*\*)?Explanation(?:\*\*)?[ \t]*:[ \t]*(?P<explanation>.*?)"""
+    r"""(?=\n[ \t]*(?:\d+[.)][ \t]*)?(?:\*\*)?(?:Full[ _]Name|Name|Candidate|ID)(?:\*\*)?[ \t]*:|\n[ \t]*```|\Z)""",
+    re.S | re.I,
+)
+
+
+def _recover_fields(text: str) -> Optional[Dict[str, Any]]:
+    fields = {}
+    for name, pattern in _FIELD_PATTERNS.items():
+        match = pattern.search(text)
+        if match is not None:
+            fields[name] = match.group(1).strip()
+    if "score" not in fields or not ("id" in fields or "full_name" in fields):
+        return None
+    return fields
+
+
+def parse_candidate_objects(text: str) -> List[Dict[str, Any]]:
+    """Recovers every candidate evaluation from a complete or truncated model reply.
+
+    JSON objects are found in a single pass with `JSONObjectStream`, so code
+    fences, surrounding prose, multi-line explanations and a reply cut off by
+    `max_tokens` are all tolerated. Objects that aren't valid JSON get a
+    lenient field-by-field extraction, and replies without any objects fall
+    back to the labelled plain-text format.
+    """
+    stream = JSONObjectStream()
+    objects = stream.feed(text)
+    objects.extend(fields for fields in map(_recover_fields, stream.rejected) if fields is not None)
+    if not objects and not stream.rejected:
+        objects = [match.groupdict() for match in _LABELLED_ENTRY.finditer(text)]
+    return objects
@@ -0,0 +1,84 @@
+"""Opt-in sampling profiler for individual requests.
+
+With `MATCH_PROFILING=1`, a request sent with the `X-Profile: 1` header is
+sampled every few milliseconds from a background thread. The collapsed
+stacks (one `frame;frame;frame count` line per distinct stack, the input
+format of flamegraph.pl and speedscope) are kept in memory and served from
+`/debug/profiles/{id}`.
+"""
+import os
+import sys
+import threading
+import uuid
+from collections import Counter, OrderedDict
+from typing import Optional
+
+PROFILING_ENABLED = os.getenv("MATCH_PROFILING", "0") == "1"
+
+# Seconds between stack samples
+PROFILE_INTERVAL = float(os.getenv("MATCH_PROFILE_INTERVAL", "0.005"))
+
+# Finished profiles kept for download
+MAX_PROFILES = 20
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class SamplingProfiler:
+    """Samples the call stack of one thread until stopped.
+
+    The event loop runs every request on the same thread, so concurrent
+    requests show up in each other's samples; profile under low load.
+    """
+
+    def __init__(self, thread_id: Optional[int] = None, interval: float = PROFILE_INTERVAL):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def start(self) -> "SamplingProfiler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> str:
+        """Stops sampling and returns the collapsed stacks."""
+        self._stop.set()
+        self._thread.join()
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common()) + "\n"
+
+
+class ProfileStore:
+    def __init__(self, max_profiles: int = MAX_PROFILES):
+        self.max_profiles = max_profiles
+        self._profiles: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, collapsed: str) -> str:
+        profile_id = uuid.uuid4().hex[:12]
+        with self._lock:
+            self._profiles[profile_id] = collapsed
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+        return profile_id
+
+    def get(self, profile_id: str) -> Optional[str]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+
+profile_store = ProfileStore()
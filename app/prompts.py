@@ -1,13 +1,179 @@
-def generate_batch_prompt(job, candidates):
-    """Generates a prompt that evaluates all candidates in a single request."""
-    # TODO: Create a more robust prompt for evaluating multiple candidates against specific job requirements as outlined
-    return f"""
-    You are an AI assistant evaluating how well candidates match a job description.
+import logging
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, List, Mapping, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Input tokens allowed for one scoring prompt (instructions + job + candidate rows)
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "3000"))
+
+# Completion tokens reserved per evaluated candidate, plus the array overhead
+TOKENS_PER_EVALUATION = int(os.getenv("TOKENS_PER_EVALUATION", "60"))
+COMPLETION_OVERHEAD_TOKENS = 40
+MAX_COMPLETION_TOKENS = int(os.getenv("MAX_COMPLETION_TOKENS", "1500"))
+
+CANDIDATE_COLUMNS = ("id", "title", "skills", "years", "industries", "location")
+
+INSTRUCTIONS = (
+    "Score how well each candidate fits the job from 0 to 10 and explain why in at most 25 words.\n"
+    'Reply with only a JSON array: [{"id": "<candidate id>", "score": <number>, "explanation": "<text>"}]'
+)
+
+BATCH_INSTRUCTIONS = (
+    "Score how well each candidate fits the job it is listed under from 0 to 10 and explain why in at most 25 words.\n"
+    'Reply with only a JSON array covering every job: [{"id": "<candidate id>", "score": <number>, "explanation": "<text>"}]'
+)
+
+try:  # pragma: no cover - depends on the optional tiktoken package
+    import tiktoken
+
+    _encoding = tiktoken.get_encoding("cl100k_base")
+
+    def count_tokens(text: str) -> int:
+        """Counts tokens with the model's tokenizer."""
+        return len(_encoding.encode(text))
+
+except ImportError:
+    _PIECES = re.compile(r"\w+|[^\w\s]")
+
+    def count_tokens(text: str) -> int:
+        """Approximates BPE token counts: one per word or symbol, plus one per extra 6 letters."""
+        return sum(1 + (len(piece) - 1) // 6 for piece in _PIECES.findall(text))
+
+
+def _cell(value: Any) -> str:
+    return " ".join(str(value if value is not None else "").replace("|", "/").split())
+
+
+def candidate_ref(position: int, job_ref: str = "") -> str:
+    """Short id used for a candidate inside one prompt (names are rejoined afterwards)."""
+    return f"{job_ref}c{position}"
+
+
+def job_ref(position: int) -> str:
+    """Short id of a job section in a multi-job prompt; prefixes its candidates' ids."""
+    return f"j{position}"
+
+
+def render_candidate_row(position: int, candidate: Mapping[str, Any], job_ref: str = "") -> str:
+    """Renders a candidate as one pipe-separated row of the candidate table."""
+    return "|".join((
+        candidate_ref(position, job_ref),
+        _cell(candidate.get("title")),
+        _cell(candidate.get("skills")),
+        _cell(candidate.get("years_experience")),
+        _cell(candidate.get("industry_experience")),
+        _cell(candidate.get("location")),
+    ))
+
 
-    **Job Description**
-    Title: {job['title']}
+def render_job(job: Mapping[str, Any]) -> str:
+    """Renders the job as compact `key=value` pairs."""
+    return "; ".join(f"{name}={_cell(value)}" for name, value in job.items() if value not in (None, ""))
 
-    **Candidates Being Evaluated**
-    {candidates}
+
+def render_header(job: Mapping[str, Any]) -> str:
+    """Renders the instructions, the job and the candidate table header."""
+    return f"{INSTRUCTIONS}\n\nJob: {render_job(job)}\n\nCandidates ({'|'.join(CANDIDATE_COLUMNS)}):"
+
+
+def render_section_header(ref: str, job: Mapping[str, Any]) -> str:
+    """Renders one job of a multi-job prompt and its candidate table header."""
+    return f"\nJob {ref}: {render_job(job)}\nCandidates ({'|'.join(CANDIDATE_COLUMNS)}):"
+
+
+def completion_budget(n_candidates: int) -> int:
+    """Sizes max_tokens so every candidate's evaluation fits in the reply."""
+    return min(MAX_COMPLETION_TOKENS, COMPLETION_OVERHEAD_TOKENS + n_candidates * TOKENS_PER_EVALUATION)
+
+
+def max_candidates_per_prompt() -> int:
+    """Largest candidate count whose evaluations fit in MAX_COMPLETION_TOKENS."""
+    return max(1, (MAX_COMPLETION_TOKENS - COMPLETION_OVERHEAD_TOKENS) // TOKENS_PER_EVALUATION)
+
+
+@dataclass
+class MatchPrompt:
+    """A rendered scoring prompt and what's needed to read its reply."""
+
+    text: str
+    max_tokens: int
+    input_tokens: int
+    # Short candidate id -> candidate, for rejoining names and ids on the way back
+    candidates: Dict[str, Mapping[str, Any]] = field(default_factory=dict)
+    # Candidates that didn't fit in the input budget
+    overflow: List[Mapping[str, Any]] = field(default_factory=list)
+    # Short candidate id -> key of the job it was scored against (multi-job prompts only)
+    jobs: Dict[str, Hashable] = field(default_factory=dict)
+
+
+def build_match_prompt(
+    job: Mapping[str, Any],
+    candidates: Sequence[Mapping[str, Any]],
+    token_budget: int = PROMPT_TOKEN_BUDGET,
+) -> MatchPrompt:
+    """Builds a compact, token-budgeted prompt that scores `candidates` against `job`.
+
+    Candidates are encoded as a pipe-separated table keyed by short ids; rows
+    that would exceed `token_budget` (or the completion budget) are left out and
+    returned in `overflow`.
     """
+    header = render_header(job)
+    used = count_tokens(header)
+    rows: List[str] = []
+    refs: Dict[str, Mapping[str, Any]] = {}
+    limit = max_candidates_per_prompt()
+    for position, candidate in enumerate(candidates, start=1):
+        row = render_candidate_row(position, candidate)
+        cost = count_tokens(row) + 1  # +1 for the newline
+        if rows and (used + cost > token_budget or len(rows) >= limit):
+            break
+        rows.append(row)
+        refs[candidate_ref(position)] = candidate
+        used += cost
+
+    overflow = list(candidates[len(rows):])
+    if overflow:
+        logger.warning("Prompt budget of %d tokens reached; %d candidates left out", token_budget, len(overflow))
+    return MatchPrompt(
+        text="\n".join([header, *rows]),
+        max_tokens=completion_budget(len(rows)),
+        input_tokens=used,
+        candidates=refs,
+        overflow=overflow,
+    )
 
+
+def build_batch_prompt(sections: Sequence[Tuple[Hashable, Mapping[str, Any], Sequence[Mapping[str, Any]]]]) -> MatchPrompt:
+    """Packs several jobs' candidates into one scoring prompt.
+
+    `sections` are `(job_key, job, candidates)` triples, already sized to fit
+    the budgets (see `scoring.pack_jobs`). Candidate ids carry their section's
+    prefix (`j2c5`), so each evaluation in the reply maps back to its job.
+    """
+    lines = [BATCH_INSTRUCTIONS]
+    refs: Dict[str, Mapping[str, Any]] = {}
+    jobs: Dict[str, Hashable] = {}
+    for section, (key, job, candidates) in enumerate(sections, start=1):
+        lines.append(render_section_header(job_ref(section), job))
+        for position, candidate in enumerate(candidates, start=1):
+            lines.append(render_candidate_row(position, candidate, job_ref(section)))
+            ref = candidate_ref(position, job_ref(section))
+            refs[ref] = candidate
+            jobs[ref] = key
+
+    text = "\n".join(lines)
+    return MatchPrompt(
+        text=text,
+        max_tokens=completion_budget(len(refs)),
+        input_tokens=count_tokens(text),
+        candidates=refs,
+        jobs=jobs,
+    )
+
+
+def generate_batch_prompt(job, candidates):
+    """Generates a prompt that evaluates all candidates in a single request."""
+    return build_match_prompt(job, candidates).text
@@ -0,0 +1,95 @@
+from datetime import date
+from typing import Any, List, Mapping, Optional, Sequence
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.availability import availability_index
+from app.candidate_store import CANDIDATE_BACKEND, CandidateSnapshot
+
+
+def is_eligible(
+    candidate: Mapping[str, Any],
+    min_years_experience: Optional[int] = None,
+    location: Optional[str] = None,
+    available_by: Optional[date] = None,
+) -> bool:
+    """In-memory equivalent of the SQL filters in `CandidateRepository.find`."""
+    if min_years_experience is not None and (candidate.get("years_experience") or 0) < min_years_experience:
+        return False
+    if location is not None and str(candidate.get("location") or "").lower() != location.lower():
+        return False
+    if available_by is not None and candidate.get("is_staffed"):
+        end_date = candidate.get("staffing_end_date")
+        if end_date is None or end_date > available_by:
+            return False
+    return True
+
+
+class CandidateRepository:
+    """Finds the candidates passing hard filters, pushed down into SQL.
+
+    Only the ids of rows that pass the filters leave the database, and every
+    filter is backed by an index (see alembic revision 5b2d9c41e7a3). The
+    records themselves come from the in-memory snapshot, which with the
+    database backend still holds the full roster (`DatabaseSource`).
+    """
+
+    def __init__(self, session_factory=None):
+        self._session_factory = session_factory
+
+    def _session(self):
+        if self._session_factory is None:
+            from app.db_models import SessionLocal
+
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    def find(
+        self,
+        min_years_experience: Optional[int] = None,
+        location: Optional[str] = None,
+        available_by: Optional[date] = None,
+    ) -> List[int]:
+        """Returns the ids of the candidates passing the filters, in id order."""
+        from sqlalchemy import func, or_, select
+
+        from app.db_models import Candidate
+
+        query = select(Candidate.id)
+        if min_years_experience is not None:
+            query = query.where(Candidate.years_experience >= min_years_experience)
+        if location is not None:
+            query = query.where(func.lower(Candidate.location) == location.lower())
+        if available_by is not None:
+            query = query.where(or_(
+                Candidate.is_staffed.is_(False),
+                Candidate.staffing_end_date <= available_by,
+            ))
+
+        with self._session() as session:
+            return list(session.execute(query.order_by(Candidate.id)).scalars())
+
+
+candidate_repository = CandidateRepository()
+
+
+async def find_eligible(snapshot: CandidateSnapshot, filters: Mapping[str, Any]) -> Sequence[Mapping[str, Any]]:
+    """Returns the candidates of `snapshot` passing `filters`, from SQL or from memory.
+
+    The SQL query runs on a worker thread, and the ids it returns are mapped
+    back onto the snapshot's own records (and re-checked against them), so
+    rows inserted or edited after the snapshot's version never mix in. In
+    memory, `available_by` is answered by the availability index, so only the
+    candidates free by then are checked against the remaining filters.
+    """
+    if CANDIDATE_BACKEND == "database":
+        found = await run_in_threadpool(candidate_repository.find, **filters)
+        pinned = (snapshot.by_id.get(candidate_id) for candidate_id in found)
+        return [candidate for candidate in pinned if candidate is not None and is_eligible(candidate, **filters)]
+    filters = dict(filters)
+    pool = snapshot.candidates
+    available_by = filters.pop("available_by", None)
+    if available_by is not None:
+        availability_index.sync(snapshot)
+        pool = [snapshot.by_id[i] for i in availability_index.available_by(available_by) if i in snapshot.by_id]
+    return [candidate for candidate in pool if is_eligible(candidate, **filters)]
@@ -0,0 +1,186 @@
+import heapq
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Any, Container, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from app.candidate_store import CandidateSnapshot, candidate_hash, candidate_store
+from app.prompts import max_candidates_per_prompt
+
+# Default number of candidates forwarded to the LLM when a request doesn't set
+# one; by default as many as one prompt holds, so a default match is one call
+DEFAULT_SHORTLIST_SIZE = int(os.getenv("SHORTLIST_SIZE", str(max_candidates_per_prompt())))
+
+# Relative importance of each indexed candidate field (BM25F-style weighted term frequency)
+FIELD_WEIGHTS = {
+    "skills": 3.0,
+    "title": 2.0,
+    "industry_experience": 1.5,
+    "location": 1.0,
+}
+
+# Job fields used to build the query, paired with the weight of their terms
+QUERY_FIELDS = {
+    "required_skills": 3.0,
+    "title": 2.0,
+    "industry": 1.5,
+    "location": 1.0,
+}
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercases and splits free text into index terms."""
+    if not text:
+        return []
+    return TOKEN_PATTERN.findall(str(text).lower())
+
+
+def job_query(job: Any) -> Dict[str, float]:
+    """Builds a weighted term query from a job model or dict."""
+    fields = job if isinstance(job, Mapping) else job.model_dump()
+    query: Dict[str, float] = {}
+    for name, weight in QUERY_FIELDS.items():
+        for term in tokenize(fields.get(name)):
+            query[term] = max(query.get(term, 0.0), weight)
+    return query
+
+
+class CandidateIndex:
+    """Inverted index over candidate fields with BM25 ranking.
+
+    The index follows the candidate store incrementally: `sync()` only re-indexes
+    candidates whose row hash changed and drops the ones that disappeared.
+    """
+
+    def __init__(self, field_weights: Mapping[str, float] = FIELD_WEIGHTS, k1: float = 1.2, b: float = 0.75):
+        self.field_weights = dict(field_weights)
+        self.k1 = k1
+        self.b = b
+        self.version: Optional[str] = None
+        self._loaded_at = 0.0
+        self._lock = threading.RLock()
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._doc_terms: Dict[int, Dict[str, float]] = {}
+        self._doc_length: Dict[int, float] = {}
+        self._doc_hash: Dict[int, str] = {}
+        self._total_length = 0.0
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def upsert(self, candidate: Mapping[str, Any]) -> bool:
+        """Indexes a candidate; returns False if it was already indexed unchanged."""
+        candidate_id = candidate["id"]
+        row_hash = candidate_hash(candidate)
+        with self._lock:
+            if self._doc_hash.get(candidate_id) == row_hash:
+                return False
+            self.remove(candidate_id)
+
+            terms: Counter = Counter()
+            for name, weight in self.field_weights.items():
+                for term in tokenize(candidate.get(name)):
+                    terms[term] += weight
+            for term, tf in terms.items():
+                self._postings.setdefault(term, {})[candidate_id] = tf
+
+            length = sum(terms.values())
+            self._doc_terms[candidate_id] = dict(terms)
+            self._doc_length[candidate_id] = length
+            self._doc_hash[candidate_id] = row_hash
+            self._total_length += length
+            return True
+
+    def remove(self, candidate_id: int) -> None:
+        with self._lock:
+            terms = self._doc_terms.pop(candidate_id, None)
+            if terms is None:
+                return
+            for term in terms:
+                postings = self._postings[term]
+                del postings[candidate_id]
+                if not postings:
+                    del self._postings[term]
+            self._total_length -= self._doc_length.pop(candidate_id)
+            del self._doc_hash[candidate_id]
+
+    def sync(self, snapshot: CandidateSnapshot) -> int:
+        """Brings the index in line with a snapshot; returns the number of changed docs."""
+        with self._lock:
+            if self.version == snapshot.version or snapshot.loaded_at < self._loaded_at:
+                return 0  # Already current, or an older snapshot held by a slow request
+            changed = sum(self.upsert(candidate) for candidate in snapshot.candidates)
+            for candidate_id in [i for i in self._doc_terms if i not in snapshot.by_id]:
+                self.remove(candidate_id)
+                changed += 1
+            self.version = snapshot.version
+            self._loaded_at = snapshot.loaded_at
+            return changed
+
+    def search(
+        self, query: Mapping[str, float], k: int, allowed: Optional[Container[int]] = None
+    ) -> List[Tuple[int, float]]:
+        """Returns up to `k` (candidate_id, score) pairs with a positive BM25 score.
+
+        When `allowed` is given, only those candidate ids are ranked.
+        """
+        with self._lock:
+            n_docs = len(self._doc_terms)
+            if not n_docs or k <= 0:
+                return []
+            avg_length = self._total_length / n_docs or 1.0
+            scores: Dict[int, float] = {}
+            for term, query_weight in query.items():
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for candidate_id, tf in postings.items():
+                    if allowed is not None and candidate_id not in allowed:
+                        continue
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_length[candidate_id] / avg_length)
+                    scores[candidate_id] = scores.get(candidate_id, 0.0) + (
+                        query_weight * idf * tf * (self.k1 + 1) / (tf + norm)
+                    )
+        return heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+
+
+# Shared index kept in step with the candidate store
+candidate_index = CandidateIndex()
+candidate_store.subscribe(lambda previous, current: candidate_index.sync(current))
+
+
+def shortlist_candidates(
+    job: Any,
+    snapshot: CandidateSnapshot,
+    k: Optional[int] = None,
+    eligible: Optional[Sequence[Mapping[str, Any]]] = None,
+    index: Optional[CandidateIndex] = None,
+) -> List[Mapping[str, Any]]:
+    """Returns the top-`k` candidates for a job, ranked by BM25 over the candidate index.
+
+    `eligible` restricts the ranking to candidates that passed the request's
+    hard filters. When fewer than `k` candidates share a term with the job, the
+    shortlist is padded with the remaining (eligible) candidates in roster
+    order so the LLM always has `k` profiles to rank. `index` defaults to the
+    shared `candidate_index`.
+    """
+    index = candidate_index if index is None else index
+    k = DEFAULT_SHORTLIST_SIZE if k is None else k
+    pool = snapshot.candidates if eligible is None else eligible
+    by_id = snapshot.by_id if eligible is None else {candidate["id"]: candidate for candidate in eligible}
+    index.sync(snapshot)
+    ranked = index.search(job_query(job), k, allowed=None if eligible is None else by_id)
+    shortlist = [by_id[candidate_id] for candidate_id, _ in ranked if candidate_id in by_id]
+    if len(shortlist) < k:
+        chosen = {candidate["id"] for candidate in shortlist}
+        for candidate in pool:
+            if len(shortlist) >= k:
+                break
+            if candidate["id"] not in chosen:
+                shortlist.append(candidate)
+    return shortlist
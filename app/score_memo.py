@@ -0,0 +1,113 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from app.candidate_store import candidate_hash
+from app.utils import STATE_DIR
+
+# SQLite file holding per-candidate scores; ":memory:" keeps them for the process only
+SCORE_MEMO_DB = os.getenv("SCORE_MEMO_DB", os.path.join(STATE_DIR, "score_memo.sqlite3"))
+
+# Seconds a stored score stays usable (default: one week)
+SCORE_MEMO_TTL = float(os.getenv("SCORE_MEMO_TTL", str(7 * 24 * 3600)))
+
+# Most scores kept on disk; the least recently stored are dropped first
+SCORE_MEMO_MAX_ROWS = int(os.getenv("SCORE_MEMO_MAX_ROWS", "200000"))
+
+# Minimum seconds between two prunes of expired and surplus rows
+PRUNE_INTERVAL = 60
+
+# SQLite's default limit on bound parameters is 999
+LOOKUP_BATCH_SIZE = 500
+
+
+class ScoreMemo:
+    """Persists LLM scores per (job fingerprint, candidate id, candidate row hash).
+
+    A stored score is only reused while the candidate's row hash is unchanged,
+    so editing a profile re-scores exactly that candidate. Scores older than
+    `ttl` are ignored, and `store()` periodically deletes them along with the
+    oldest rows beyond `max_rows`.
+    """
+
+    def __init__(self, db_path: str = SCORE_MEMO_DB, ttl: float = SCORE_MEMO_TTL, max_rows: int = SCORE_MEMO_MAX_ROWS):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._next_prune = 0.0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._db is None:
+            if self.db_path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS candidate_scores ("
+                "job_key TEXT NOT NULL, candidate_id INTEGER NOT NULL, row_hash TEXT NOT NULL, "
+                "full_name TEXT NOT NULL, score REAL NOT NULL, explanation TEXT NOT NULL, "
+                "updated_at REAL NOT NULL, PRIMARY KEY (job_key, candidate_id))"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS candidate_scores_updated_at ON candidate_scores (updated_at)")
+            self._db.commit()
+        return self._db
+
+    def lookup(self, job_key: str, candidates: Iterable[Mapping[str, Any]]) -> Dict[int, Dict[str, Any]]:
+        """Returns memoized matches for candidates whose row hash is unchanged."""
+        hashes = {candidate["id"]: candidate_hash(candidate) for candidate in candidates}
+        ids = list(hashes)
+        found: Dict[int, Dict[str, Any]] = {}
+        fresh_after = time.time() - self.ttl
+        with self._lock:
+            db = self._connection()
+            for start in range(0, len(ids), LOOKUP_BATCH_SIZE):
+                batch = ids[start:start + LOOKUP_BATCH_SIZE]
+                rows = db.execute(
+                    "SELECT candidate_id, row_hash, full_name, score, explanation FROM candidate_scores "
+                    f"WHERE job_key = ? AND updated_at > ? AND candidate_id IN ({','.join('?' * len(batch))})",
+                    (job_key, fresh_after, *batch),
+                )
+                for candidate_id, row_hash, full_name, score, explanation in rows:
+                    if hashes[candidate_id] == row_hash:
+                        found[candidate_id] = {
+                            "candidate_id": candidate_id,
+                            "full_name": full_name,
+                            "score": score,
+                            "explanation": explanation,
+                        }
+        return found
+
+    def store(self, job_key: str, candidates: Mapping[int, Mapping[str, Any]], matches: List[Dict[str, Any]]) -> None:
+        """Saves scored matches that carry a `candidate_id` present in `candidates`."""
+        now = time.time()
+        rows = [
+            (job_key, match["candidate_id"], candidate_hash(candidates[match["candidate_id"]]),
+             match["full_name"], float(match["score"]), match.get("explanation", ""), now)
+            for match in matches
+            if match.get("candidate_id") in candidates
+        ]
+        if not rows:
+            return
+        with self._lock:
+            db = self._connection()
+            db.executemany("INSERT OR REPLACE INTO candidate_scores VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            if now >= self._next_prune:
+                self._prune(db, now)
+            db.commit()
+
+    def _prune(self, db: sqlite3.Connection, now: float) -> None:
+        """Deletes expired scores, then the least recently stored ones beyond `max_rows`."""
+        db.execute("DELETE FROM candidate_scores WHERE updated_at <= ?", (now - self.ttl,))
+        db.execute(
+            "DELETE FROM candidate_scores WHERE rowid IN "
+            "(SELECT rowid FROM candidate_scores ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_rows,),
+        )
+        self._next_prune = now + PRUNE_INTERVAL
+
+
+# Shared memo used by the /match pipeline
+score_memo = ScoreMemo()
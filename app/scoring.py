@@ -0,0 +1,139 @@
+import asyncio
+import heapq
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Mapping, Optional, Sequence, Tuple
+
+from app.prompts import (
+    BATCH_INSTRUCTIONS,
+    PROMPT_TOKEN_BUDGET,
+    count_tokens,
+    job_ref,
+    max_candidates_per_prompt,
+    render_candidate_row,
+    render_header,
+    render_section_header,
+)
+
+logger = logging.getLogger(__name__)
+
+# Number of chunk requests allowed in flight at once for a single match
+MAX_CONCURRENT_CHUNKS = int(os.getenv("SCORING_CONCURRENCY", "4"))
+
+ChunkScorer = Callable[[Mapping[str, Any], List[Mapping[str, Any]]], Awaitable[List[Dict[str, Any]]]]
+
+
+def chunk_candidates(
+    candidates: Sequence[Mapping[str, Any]],
+    job: Optional[Mapping[str, Any]] = None,
+    token_budget: int = PROMPT_TOKEN_BUDGET,
+    max_chunk_size: Optional[int] = None,
+) -> List[List[Mapping[str, Any]]]:
+    """Splits candidates into chunks whose prompts fit the input and completion budgets.
+
+    Rows are measured with the same encoding and token counter as
+    `prompts.build_match_prompt`, so every chunk renders without overflow.
+    """
+    row_budget = token_budget - (count_tokens(render_header(job)) if job else 0)
+    max_chunk_size = max_chunk_size or max_candidates_per_prompt()
+    chunks: List[List[Mapping[str, Any]]] = []
+    current: List[Mapping[str, Any]] = []
+    used = 0
+    for candidate in candidates:
+        cost = count_tokens(render_candidate_row(len(current) + 1, candidate)) + 1
+        if current and (used + cost > row_budget or len(current) >= max_chunk_size):
+            chunks.append(current)
+            current, used = [], 0
+            cost = count_tokens(render_candidate_row(1, candidate)) + 1
+        current.append(candidate)
+        used += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+JobSection = Tuple[Hashable, Mapping[str, Any], List[Mapping[str, Any]]]
+
+
+def pack_jobs(
+    jobs: Sequence[Tuple[Hashable, Mapping[str, Any], Sequence[Mapping[str, Any]]]],
+    token_budget: int = PROMPT_TOKEN_BUDGET,
+    max_chunk_size: Optional[int] = None,
+) -> List[List[JobSection]]:
+    """Packs several jobs' candidates into as few prompts as the budgets allow.
+
+    Returns one list of `(job_key, job, candidates)` sections per prompt, for
+    `prompts.build_batch_prompt`. Small shortlists share a prompt; large ones
+    are split across prompts like `chunk_candidates` does for a single job.
+    """
+    max_chunk_size = max_chunk_size or max_candidates_per_prompt()
+    base_cost = count_tokens(BATCH_INSTRUCTIONS)
+    prompts: List[List[JobSection]] = []
+    current: List[JobSection] = []
+    used, size = base_cost, 0
+
+    for key, job, candidates in jobs:
+        section: Optional[JobSection] = None
+        for candidate in candidates:
+            while True:
+                ref = job_ref(len(current) + (section is None))
+                cost = count_tokens(render_candidate_row(len(section[2]) + 1 if section else 1, candidate, ref)) + 1
+                if section is None:
+                    cost += count_tokens(render_section_header(ref, job)) + 1
+                if size == 0 or (used + cost <= token_budget and size < max_chunk_size):
+                    break
+                # The prompt is full: close it and continue this job in a new one
+                prompts.append(current)
+                current, section, used, size = [], None, base_cost, 0
+            if section is None:
+                section = (key, job, [])
+                current.append(section)
+            section[2].append(candidate)
+            used += cost
+            size += 1
+
+    if current:
+        prompts.append(current)
+    return prompts
+
+
+async def score_candidates(
+    job: Mapping[str, Any],
+    candidates: Sequence[Mapping[str, Any]],
+    score_chunk: ChunkScorer,
+    top_k: Optional[int] = 3,
+    token_budget: int = PROMPT_TOKEN_BUDGET,
+    max_concurrency: int = MAX_CONCURRENT_CHUNKS,
+    errors: Optional[List[BaseException]] = None,
+) -> List[Dict[str, Any]]:
+    """Scores candidates map-reduce style and returns the global top-k (all if None).
+
+    Each chunk is scored by `score_chunk(job, chunk)` with at most
+    `max_concurrency` chunks in flight. Failed chunks are logged and skipped so
+    the best results from the remaining chunks are still returned; the error is
+    only raised when every chunk fails. Errors of skipped chunks are appended
+    to `errors` when given, so callers can tell a partial result apart.
+    """
+    chunks = chunk_candidates(candidates, job, token_budget)
+    if not chunks:
+        return []
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(chunk):
+        async with semaphore:
+            return await score_chunk(job, chunk)
+
+    results = await asyncio.gather(*(run(chunk) for chunk in chunks), return_exceptions=True)
+
+    failures = [(n, result) for n, result in enumerate(results, start=1) if isinstance(result, BaseException)]
+    if len(failures) == len(results):
+        raise failures[0][1]
+    for n, failure in failures:
+        logger.warning("Scoring chunk %d of %d failed: %r", n, len(chunks), failure)
+    if errors is not None:
+        errors.extend(failure for _, failure in failures)
+
+    scored = [match for result in results if not isinstance(result, BaseException) for match in result]
+    if top_k is None:
+        return sorted(scored, key=lambda match: float(match["score"]), reverse=True)
+    return heapq.nlargest(top_k, scored, key=lambda match: float(match["score"]))
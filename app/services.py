@@ -1,47 +1,393 @@
-from openai import OpenAI
 import os
-import json
+import asyncio
+import heapq
+import logging
 import re
-from dotenv import load_dotenv
+import time
 
-# Load API key from environment variables
-load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+from app.cache import cache_key, fingerprint_job, result_cache
+from app.cascade import CASCADE_BAND_SIZE, CASCADE_POOL_SIZE, Budget, latency_model, plan_band
+from app.candidate_store import candidate_store
+from app.fast_scoring import explain, rank
+from app.llm import LLMError, llm_client
+from app.metrics import CACHE_REQUESTS, CANDIDATE_POOL_SIZE, CASCADE_CANDIDATES, span
+from app.parsing import JSONObjectStream, ResponseParseError, parse_candidate_objects
+from app.prompts import build_batch_prompt, build_match_prompt, candidate_ref, completion_budget
+from app.repository import find_eligible
+from app.retrieval import shortlist_candidates
+from app.score_memo import score_memo
+from app.scoring import MAX_CONCURRENT_CHUNKS, chunk_candidates, pack_jobs, score_candidates
 
-# Load candidates from the JSON file
-CANDIDATES_FILE = os.path.join(os.path.dirname(__file__), "data/candidates.json")
+logger = logging.getLogger(__name__)
 
 def load_candidates():
-    """Loads candidates from a JSON file."""
-    with open(CANDIDATES_FILE, "r") as file:
-        return json.load(file)
+    """Returns the current candidate snapshot from the shared in-process store."""
+    return candidate_store.snapshot().candidates
 
-def evaluate_candidates(job):
-    """Evaluates all candidates using a SINGLE OpenAI API request."""
-    candidates = load_candidates()
+async def score_chunk_with_llm(job, chunk):
+    """Scores one chunk of candidates with a single chat completion call."""
+    with span("prompt_build"):
+        prompt = build_match_prompt(job, chunk)
+    with span("llm_call"):
+        content = await llm_client.complete(prompt.text, max_tokens=prompt.max_tokens)
 
-    # Make a single OpenAI API call with a detailed prompt to get candidate evaluations 
-    response = ""
+    # Recover every complete evaluation, even from fenced, wrapped or truncated replies
+    with span("parse"):
+        return parse_batch_response(content, top_k=None, candidates=candidate_lookup(prompt))
 
-    # Parse the LLM response
-    result_text = response.strip()
-    results = parse_batch_response(result_text)
+def full_name(candidate):
+    return f"{candidate.get('first_name', '')} {candidate.get('last_name', '')}".strip()
 
+def _ref_key(value):
+    return " ".join(str(value).split()).lower()
+
+def candidate_lookup(prompt):
+    """Maps the prompt's short ids (and, as a fallback, full names) to candidates."""
+    lookup = {_ref_key(full_name(candidate)): candidate for candidate in prompt.candidates.values()}
+    lookup.update(prompt.candidates)
+    return lookup
+
+def _evaluated_ref(obj):
+    """Key of the candidate an evaluation is about: its short id, else its name.
+
+    Models sometimes answer with the bare number of a short id (2 for "c2").
+    """
+    ref = obj.get("id")
+    if isinstance(ref, int) or (isinstance(ref, str) and ref.strip().isdigit()):
+        ref = candidate_ref(int(ref))
+    return _ref_key(ref or obj.get("full_name") or "")
+
+def resolve_candidate(obj, lookup):
+    """Rejoins a parsed evaluation with its candidate's full name and id.
+
+    Returns None for an evaluation of a candidate that isn't in the prompt
+    (an id or name the model made up), which callers drop.
+    """
+    candidate = lookup.get(_evaluated_ref(obj))
+    if candidate is None and obj.get("full_name"):
+        candidate = lookup.get(_ref_key(obj["full_name"]))
+    if candidate is None:
+        logger.warning("Model evaluated an unknown candidate (id=%r, full_name=%r)", obj.get("id"), obj.get("full_name"))
+        return None
+    return {**obj, "full_name": full_name(candidate), "candidate_id": candidate["id"]}
+
+def _filter_key(filters):
+    return sorted(filters.items()) if filters else None
+
+async def select_candidates(job, snapshot, shortlist_size=None, filters=None):
+    """Applies the hard filters (pushed down to SQL with the database backend), then shortlists."""
+    with span("candidate_load"):
+        eligible = await find_eligible(snapshot, filters) if filters else None
+        candidates = shortlist_candidates(job, snapshot, shortlist_size, eligible=eligible)
+    CANDIDATE_POOL_SIZE.observe(len(candidates))
+    return candidates
+
+def cached_result(key):
+    """Looks `key` up in the result cache, counting hits and misses; returns a copy of the matches."""
+    cached = result_cache.get(key)
+    CACHE_REQUESTS.inc(cache="result", result="miss" if cached is None else "hit")
+    return None if cached is None else [dict(match) for match in cached]
+
+def cache_result(key, matches):
+    """Caches a copy of complete results, so callers can't alter the cached entry."""
+    result_cache.set(key, [dict(match) for match in matches])
+
+def lookup_memoized(job_key, candidates):
+    """Returns memoized scores for `candidates`, counting per-candidate hits and misses."""
+    memoized = score_memo.lookup(job_key, candidates)
+    CACHE_REQUESTS.inc(len(memoized), cache="score_memo", result="hit")
+    CACHE_REQUESTS.inc(len(candidates) - len(memoized), cache="score_memo", result="miss")
+    return memoized
+
+async def evaluate_candidates(job, shortlist_size=None, top_k=3, filters=None):
+    """Evaluates the job's candidate shortlist with concurrent chunked LLM requests.
+
+    `filters` (min_years_experience, location, available_by) exclude candidates
+    before retrieval and scoring.
+
+    Results are cached per (normalized job, candidate data version, options), and
+    individual candidate scores are memoized so roster edits only re-score the
+    candidates that changed.
+    """
+    with span("candidate_load"):
+        snapshot = candidate_store.snapshot()
+    key = cache_key(job, snapshot.version, shortlist_size=shortlist_size, top_k=top_k, filters=_filter_key(filters))
+    cached = cached_result(key)
+    if cached is not None:
+        return cached
+
+    candidates = await select_candidates(job, snapshot, shortlist_size, filters)
+
+    # Only candidates that are new or changed since they were last scored for this job go to the LLM
+    job_key = f"{fingerprint_job(job)}:{llm_client.model}"
+    memoized = lookup_memoized(job_key, candidates)
+    pending = [candidate for candidate in candidates if candidate["id"] not in memoized]
+    scored, errors = [], []
+    if pending:
+        scored = await score_candidates(job, pending, score_chunk_with_llm, top_k=None, errors=errors)
+        score_memo.store(job_key, {candidate["id"]: candidate for candidate in pending}, scored)
+
+    with span("rank"):
+        results = heapq.nlargest(top_k, [*memoized.values(), *scored], key=lambda match: float(match["score"]))
+    # A chunk that failed (e.g. a transient upstream error) would otherwise be missing until the entry expires
+    if not errors:
+        cache_result(key, results)
+    return results
+
+async def score_chunk_timed(job, chunk):
+    """`score_chunk_with_llm` that also feeds the cascade's latency model."""
+    started = time.monotonic()
+    matches = await score_chunk_with_llm(job, chunk)
+    latency_model.observe(time.monotonic() - started, completion_budget(len(chunk)))
+    return matches
+
+async def evaluate_cascade(job, top_k=3, filters=None, band_size=None, budget=None):
+    """Ranks everyone with the fast scorer, then re-ranks the top band with the LLM.
+
+    `band_size` defaults to CASCADE_BAND_SIZE; `budget` (a `cascade.Budget`)
+    caps the tokens and time spent on the LLM tier, which shrinks the band.
+    Each match carries the `tier` ("llm" or "fast") its score came from:
+    LLM-scored candidates rank first, and fast scores only fill the top-k when
+    the LLM tier scored fewer candidates than that. If the LLM tier fails or
+    runs out of time, the fast ranking is returned. Results are only cached
+    when the whole band got an LLM score.
+    """
+    budget = budget or Budget()
+    band_size = CASCADE_BAND_SIZE if band_size is None else band_size
+    with span("candidate_load"):
+        snapshot = candidate_store.snapshot()
+    # Only results whose band the budget didn't cut are cached, so the budget isn't part of the key
+    key = cache_key(job, snapshot.version, mode="cascade", band_size=band_size, top_k=top_k, filters=_filter_key(filters))
+    cached = cached_result(key)
+    if cached is not None:
+        return cached
+
+    with span("candidate_load"):
+        eligible_ids = [c["id"] for c in await find_eligible(snapshot, filters)] if filters else None
+    with span("fast_rank"):
+        ranked = rank(job, snapshot, max(CASCADE_POOL_SIZE, band_size, top_k), eligible_ids)
+    CANDIDATE_POOL_SIZE.observe(len(ranked))
+
+    job_key = f"{fingerprint_job(job)}:{llm_client.model}"
+    memoized = lookup_memoized(job_key, [candidate for candidate, _ in ranked])
+    band = plan_band(job, ranked, top_k, band_size, budget, memoized)
+    # A band cut short by the budget is still returned, but not cached for requests with more room
+    degraded = (budget.max_tokens is not None or budget.deadline is not None) and (
+        len(band) < len(plan_band(job, ranked, top_k, band_size, Budget(), memoized))
+    )
+    pending = [candidate for candidate in band if candidate["id"] not in memoized]
+    scored, errors = [], []
+    if pending:
+        try:
+            scored = await asyncio.wait_for(
+                score_candidates(job, pending, score_chunk_timed, top_k=None, errors=errors), budget.remaining()
+            )
+        except (asyncio.TimeoutError, LLMError, ResponseParseError) as e:
+            logger.warning("Cascade LLM tier failed for %d candidates, using fast scores: %r", len(pending), e)
+            degraded = True
+        else:
+            # Failed chunks leave some of the band with fast scores only; the
+            # ones that were scored are still memoized
+            degraded = degraded or bool(errors) or len(scored) < len(pending)
+            score_memo.store(job_key, {candidate["id"]: candidate for candidate in pending}, scored)
+
+    with span("rank"):
+        llm_matches = sorted(
+            ({**match, "tier": "llm"} for match in [*memoized.values(), *scored]),
+            key=lambda match: float(match["score"]), reverse=True,
+        )
+        llm_ids = {match.get("candidate_id") for match in llm_matches}
+        fast_matches = [
+            {
+                "candidate_id": candidate["id"],
+                "full_name": full_name(candidate),
+                "score": round(score, 2),
+                "explanation": explain(candidate, job),
+                "tier": "fast",
+            }
+            for candidate, score in ranked[:top_k + len(llm_ids)]
+            if candidate["id"] not in llm_ids
+        ]
+        results = [*llm_matches, *fast_matches][:top_k]
+    for tier in ("llm", "fast"):
+        CASCADE_CANDIDATES.inc(sum(match["tier"] == tier for match in results), tier=tier)
+    if not degraded:
+        cache_result(key, results)
     return results
 
-def parse_batch_response(response_text: str):
-    """Parses the batch response and extracts scores and explanations for all candidates."""
-    results = []
+async def score_packed_prompt(prompt):
+    """Scores one multi-job prompt; returns {job_key: [matches]}."""
+    with span("llm_call"):
+        content = await llm_client.complete(prompt.text, max_tokens=prompt.max_tokens)
+    scored = {}
+    with span("parse"):
+        for obj in parse_candidate_objects(content):
+            ref = _ref_key(obj.get("id") or "")
+            match = normalize_match(resolve_candidate(obj, prompt.candidates)) if ref in prompt.jobs else None
+            if match is not None:
+                scored.setdefault(prompt.jobs[ref], []).append(match)
+    if not scored:
+        raise ResponseParseError(f"No candidate evaluations found in a {len(content)}-character reply")
+    return scored
+
+async def evaluate_batch(requests, top_k=3):
+    """Evaluates many jobs at once; returns one {"matches": [...]} or {"error": ...} per request.
 
-    # 1. Leverage regex to handle varying spaces and multi-line explanations when getting the candidates, their scores, and explanations
+    `requests` are dicts with `job` and optional `shortlist_size` and `filters`.
+    All jobs share one candidate snapshot, and their pending shortlists are
+    packed together into as few model calls as the token budget allows, run
+    under the usual chunk concurrency limit. Caching and score memoization
+    work as in `evaluate_candidates`.
+    """
+    with span("candidate_load"):
+        snapshot = candidate_store.snapshot()
+    results = [None] * len(requests)
+    keys, job_keys, memoized, pending = {}, {}, {}, []
+    for index, request in enumerate(requests):
+        job, shortlist_size, filters = request["job"], request.get("shortlist_size"), request.get("filters")
+        keys[index] = cache_key(job, snapshot.version, shortlist_size=shortlist_size, top_k=top_k, filters=_filter_key(filters))
+        cached = cached_result(keys[index])
+        if cached is not None:
+            results[index] = {"matches": cached}
+            continue
+        candidates = await select_candidates(job, snapshot, shortlist_size, filters)
+        job_keys[index] = f"{fingerprint_job(job)}:{llm_client.model}"
+        memoized[index] = lookup_memoized(job_keys[index], candidates)
+        pending.append((index, job, [c for c in candidates if c["id"] not in memoized[index]]))
 
-    # 2. Append each candidate's names, score, and explanation to the results list
+    with span("prompt_build"):
+        prompts = [build_batch_prompt(sections) for sections in pack_jobs(pending)]
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_CHUNKS)
 
-    # 3. Sort candidates by score in descending order
+    async def run(prompt):
+        async with semaphore:
+            return await score_packed_prompt(prompt)
 
-    # 4. Return only the top 3 candidates
+    replies = await asyncio.gather(*(run(prompt) for prompt in prompts), return_exceptions=True)
 
+    scored = {index: [] for index, _, _ in pending}
+    failed = set()
+    for prompt, reply in zip(prompts, replies):
+        if isinstance(reply, BaseException):
+            logger.warning("Batch scoring prompt failed: %r", reply)
+            failed.update(prompt.jobs.values())
+            continue
+        for index, matches in reply.items():
+            scored[index].extend(matches)
+
+    for index, _, candidates in pending:
+        if index in failed and not scored[index] and not memoized[index]:
+            results[index] = {"error": "Scoring failed for this job."}
+            continue
+        score_memo.store(job_keys[index], {candidate["id"]: candidate for candidate in candidates}, scored[index])
+        matches = heapq.nlargest(top_k, [*memoized[index].values(), *scored[index]], key=lambda match: float(match["score"]))
+        if index not in failed:
+            cache_result(keys[index], matches)
+        results[index] = {"matches": matches}
     return results
 
+def normalize_match(obj):
+    """Returns a match dict with the CandidateMatch fields, or None if `obj` isn't one."""
+    if obj is None:
+        return None
+    try:
+        match = {
+            "full_name": str(obj["full_name"]).strip(),
+            "score": float(obj["score"]),
+            "explanation": str(obj.get("explanation", "")).strip(),
+        }
+    except (KeyError, TypeError, ValueError):
+        return None
+    if "candidate_id" in obj:
+        match["candidate_id"] = obj["candidate_id"]
+    return match
+
+async def stream_candidates(job, shortlist_size=None, top_k=3, filters=None):
+    """Yields ("candidate", match) events as soon as each score is known, then ("result", top_k).
+
+    Cached and memoized scores are emitted first; the remaining shortlist is
+    streamed from the model chunk by chunk, and each candidate object is
+    emitted as soon as it closes in the token stream.
+    """
+    with span("candidate_load"):
+        snapshot = candidate_store.snapshot()
+    key = cache_key(job, snapshot.version, shortlist_size=shortlist_size, top_k=top_k, filters=_filter_key(filters))
+    cached = cached_result(key)
+    if cached is not None:
+        for match in cached:
+            yield "candidate", match
+        yield "result", cached
+        return
+
+    candidates = await select_candidates(job, snapshot, shortlist_size, filters)
+    job_key = f"{fingerprint_job(job)}:{llm_client.model}"
+    memoized = lookup_memoized(job_key, candidates)
+    for match in memoized.values():
+        yield "candidate", match
+
+    pending = [candidate for candidate in candidates if candidate["id"] not in memoized]
+    chunks = chunk_candidates(pending, job)
+    queue = asyncio.Queue()
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_CHUNKS)
+    failures = []
+
+    async def stream_chunk(chunk):
+        with span("prompt_build"):
+            prompt = build_match_prompt(job, chunk)
+        lookup = candidate_lookup(prompt)
+        parser = JSONObjectStream()
+        async with semaphore:
+            try:
+                # Parsing happens as tokens arrive, so it's timed as part of the call
+                with span("llm_call"):
+                    async for delta in llm_client.stream(prompt.text, max_tokens=prompt.max_tokens):
+                        for obj in parser.feed(delta):
+                            match = normalize_match(resolve_candidate(obj, lookup))
+                            if match is not None:
+                                await queue.put(match)
+            except Exception as e:
+                logger.warning("Streaming chunk failed: %r", e)
+                failures.append(e)
+
+    async def produce():
+        try:
+            await asyncio.gather(*(stream_chunk(chunk) for chunk in chunks))
+        finally:
+            await queue.put(None)
+
+    producer = asyncio.create_task(produce())
+    scored = []
+    try:
+        while (match := await queue.get()) is not None:
+            scored.append(match)
+            yield "candidate", match
+    finally:
+        producer.cancel()
+
+    if chunks and len(failures) == len(chunks) and not memoized:
+        yield "error", "Scoring failed for every candidate chunk."
+        return
+
+    score_memo.store(job_key, {candidate["id"]: candidate for candidate in pending}, scored)
+    results = heapq.nlargest(top_k, [*memoized.values(), *scored], key=lambda match: match["score"])
+    if not failures:
+        cache_result(key, results)
+    yield "result", results
 
+def parse_batch_response(response_text: str, top_k=3, candidates=None):
+    """Parses the batch response and extracts scores and explanations for all candidates.
 
+    `candidates` maps the prompt's short ids to candidates (see `candidate_lookup`)
+    so names and ids are rejoined. Returns the `top_k` best matches sorted by
+    score (all of them if None). Raises ResponseParseError if the reply contains
+    no usable evaluation.
+    """
+    objects = parse_candidate_objects(response_text)
+    if candidates:
+        objects = [resolved for resolved in (resolve_candidate(obj, candidates) for obj in objects) if resolved]
+    results = [match for match in map(normalize_match, objects) if match]
+    if not results:
+        raise ResponseParseError(f"No candidate evaluations found in a {len(response_text)}-character reply")
+    if top_k is None:
+        return sorted(results, key=lambda match: match["score"], reverse=True)
+    return heapq.nlargest(top_k, results, key=lambda match: match["score"])
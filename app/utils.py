@@ -0,0 +1,29 @@
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+# Directory for runtime state (job queue, score memo, columnar snapshots), outside the source tree
+STATE_DIR = os.getenv("STATE_DIR", os.path.join(os.path.expanduser("~"), ".local", "state", "talent-match"))
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into one in-flight awaitable.
+
+    The first caller for a key starts the work; callers arriving while it is
+    still running await the same result instead of repeating it.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._calls[key] = future
+            future.add_done_callback(lambda _: self._calls.pop(key, None))
+        # Shield so one cancelled caller doesn't cancel the call for everyone else
+        return await asyncio.shield(future)
@@ -0,0 +1,80 @@
+"""Application warm-up, run by the lifespan handler before readiness is reported.
+
+Importing the app builds nothing expensive: the candidate indexes, the
+database engine and the LLM connection pool are all created on first use.
+Warm-up triggers that first use ahead of traffic (loading the roster builds
+the retrieval, availability and fast-scoring indexes through their store
+subscriptions) and `GET /health/ready` answers 503 until it has finished.
+A failed warm-up (e.g. the database isn't reachable yet) is retried with
+exponential backoff, so the worker becomes ready once its dependencies are.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, Optional
+
+from app.candidate_store import CANDIDATE_BACKEND, candidate_store
+from app.llm import LLM_WARMUP_CONNECTIONS, llm_client
+
+logger = logging.getLogger(__name__)
+
+# Seconds before retrying a failed warm-up; doubles after each failure up to WARMUP_MAX_RETRY_DELAY
+WARMUP_RETRY_DELAY = float(os.getenv("WARMUP_RETRY_DELAY", "1"))
+WARMUP_MAX_RETRY_DELAY = float(os.getenv("WARMUP_MAX_RETRY_DELAY", "60"))
+
+WARMING, READY, FAILED = "warming", "ready", "failed"
+
+
+class WarmUp:
+    def __init__(self, retry_delay: float = WARMUP_RETRY_DELAY, max_retry_delay: float = WARMUP_MAX_RETRY_DELAY):
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.status = WARMING
+        self.error: Optional[str] = None
+        self.attempts = 0
+        # Milliseconds per warm-up step
+        self.steps: Dict[str, float] = {}
+
+    @property
+    def ready(self) -> bool:
+        return self.status == READY
+
+    async def _step(self, name: str, coroutine) -> None:
+        started = time.perf_counter()
+        await coroutine
+        self.steps[name] = round((time.perf_counter() - started) * 1000, 1)
+
+    async def _warm(self) -> None:
+        # Loads the roster and builds every index subscribed to the store
+        await self._step("candidates", asyncio.to_thread(candidate_store.snapshot))
+        if CANDIDATE_BACKEND == "database":
+            from app.db_models import warm_up_pool
+
+            await self._step("database", asyncio.to_thread(warm_up_pool))
+        if LLM_WARMUP_CONNECTIONS:
+            await self._step("llm", llm_client.warm_up())
+
+    async def run(self) -> None:
+        """Warms up, retrying until it succeeds (or the task is cancelled at shutdown)."""
+        self.status, self.error, self.steps, self.attempts = WARMING, None, {}, 0
+        delay = self.retry_delay
+        while True:
+            self.attempts += 1
+            try:
+                await self._warm()
+                break
+            except Exception as e:
+                self.status, self.error = FAILED, str(e) or type(e).__name__
+                logger.exception("Warm-up attempt %d failed; retrying in %.0fs", self.attempts, delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_retry_delay)
+        self.status, self.error = READY, None
+        logger.info("Warm-up finished: %s", ", ".join(f"{name}={ms:.0f}ms" for name, ms in self.steps.items()))
+
+    def to_dict(self) -> Dict[str, object]:
+        return {"status": self.status, "error": self.error, "attempts": self.attempts, "steps_ms": self.steps}
+
+
+# Warm-up state of this worker process
+warm_up = WarmUp()
@@ -0,0 +1,71 @@
+"""Measures how long a fresh worker takes to import the app.
+
+Each run imports the module in a new interpreter with `python -X importtime`
+(so nothing is cached in `sys.modules`) and reports the median wall time of
+the import, plus the modules with the largest cumulative import time. With
+`--budget-ms`, it exits with status 1 when the median exceeds the budget, so
+it can guard against slow imports creeping back in CI.
+
+Usage:
+    python -m benchmarks.bench_import [--module app.main] [--runs 5] [--top 15]
+                                      [--budget-ms 2000] [--output results.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_times(module: str) -> Dict[str, Dict[str, int]]:
+    """Imports `module` in a fresh interpreter; returns {module: {"self_us", "cumulative_us"}}."""
+    # No DATABASE_URL: importing the app must not need a database
+    env = {name: value for name, value in os.environ.items() if name != "DATABASE_URL"}
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    ).stderr
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if self_us.strip().isdigit():
+            times[name.strip()] = {"self_us": int(self_us), "cumulative_us": int(cumulative_us)}
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="slowest modules to list")
+    parser.add_argument("--budget-ms", type=float, help="fail if the median import takes longer")
+    parser.add_argument("--output", help="also save the results as JSON")
+    args = parser.parse_args()
+
+    runs: List[Dict[str, Dict[str, int]]] = [import_times(args.module) for _ in range(args.runs)]
+    total_ms = statistics.median(run[args.module]["cumulative_us"] for run in runs) / 1000
+    slowest = sorted(
+        ((name, statistics.median(run[name]["cumulative_us"] for run in runs if name in run) / 1000)
+         for name in runs[-1]),
+        key=lambda item: item[1], reverse=True,
+    )[1:args.top + 1]
+
+    print(f"import {args.module}: {total_ms:.1f} ms (median of {args.runs})")
+    for name, ms in slowest:
+        print(f"{ms:10.1f} ms  {name}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"module": args.module, "median_ms": total_ms, "slowest_ms": dict(slowest)}, f, indent=2)
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        print(f"Over budget: {total_ms:.1f} ms > {args.budget_ms:.1f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Micro-benchmark for parsing recorded LLM match replies.
+
+Compares the original approach in `/match` (strip code fences, then
+`json.loads` the whole reply) with `services.parse_batch_response` over the
+corpus in `benchmarks/data/recorded_responses.json`, reporting how many
+candidates each recovers and the time per reply.
+
+Usage:
+    python -m benchmarks.bench_parser [--repeat 2000]
+"""
+import argparse
+import json
+import os
+import timeit
+
+from app.parsing import ResponseParseError
+from app.services import parse_batch_response
+
+CORPUS_FILE = os.path.join(os.path.dirname(__file__), "data/recorded_responses.json")
+
+
+def legacy_parse(content):
+    """The parser previously inlined in main.py."""
+    if content.startswith("```") and content.endswith("```"):
+        content = content.strip("```").strip("json").strip()
+    return json.loads(content)
+
+
+def recovered(parse, content):
+    try:
+        return len(parse(content))
+    except (ValueError, ResponseParseError):
+        return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=2000, help="parses of the whole corpus per timing run")
+    args = parser.parse_args()
+
+    with open(CORPUS_FILE) as f:
+        corpus = json.load(f)
+
+    parsers = {
+        "legacy json.loads": legacy_parse,
+        "parse_batch_response": lambda content: parse_batch_response(content, top_k=None),
+    }
+    print(f"{len(corpus)} recorded replies, {sum(map(len, corpus))} characters")
+    for name, parse in parsers.items():
+        candidates = sum(recovered(parse, content) for content in corpus)
+        failures = sum(recovered(parse, content) == 0 for content in corpus)
+        seconds = min(timeit.repeat(
+            lambda: [recovered(parse, content) for content in corpus], number=args.repeat, repeat=3
+        ))
+        per_reply_us = seconds / (args.repeat * len(corpus)) * 1e6
+        print(f"{name:>22}: {candidates:3d} candidates recovered, {failures} failed replies, {per_reply_us:8.1f} us/reply")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Compares roster load time and memory: parsed JSON vs the columnar snapshot.
+
+Each measurement runs in a fresh process that loads a synthetic roster
+through `CandidateStore`, then reads every field of every candidate (as the
+retrieval index build does). Reported per process: load and scan time, RSS,
+and private memory -- the part that is multiplied by the number of uvicorn
+workers. Columnar pages are file-backed and shared between workers, so they
+show up in RSS but not in private memory.
+
+Usage:
+    python -m benchmarks.bench_snapshot [--size 100000] [--output results.json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.generate_roster import write_roster
+
+
+def memory_mb():
+    """RSS and private memory of this process (Linux only)."""
+    usage = {}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                name, _, rest = line.partition(":")
+                if name in ("Rss", "Private_Clean", "Private_Dirty"):
+                    usage[name] = int(rest.split()[0]) / 1024
+    except OSError:
+        return {"rss_mb": None, "private_mb": None}
+    return {
+        "rss_mb": round(usage["Rss"], 1),
+        "private_mb": round(usage["Private_Clean"] + usage["Private_Dirty"], 1),
+    }
+
+
+def measure(representation, roster, columnar_dir):
+    """Runs in the child process; prints one JSON line."""
+    from app.candidate_store import CandidateStore, JsonFileSource
+    from app.columnar import ColumnarSource
+
+    baseline = memory_mb()
+    source = JsonFileSource(roster)
+    if representation != "json":
+        source = ColumnarSource(source, root=columnar_dir)
+    started = time.perf_counter()
+    snapshot = CandidateStore(source).snapshot()
+    loaded = time.perf_counter() - started
+    after_load = memory_mb()
+
+    started = time.perf_counter()
+    for candidate in snapshot.candidates:
+        for value in candidate.values():
+            pass
+    scanned = time.perf_counter() - started
+    after_scan = memory_mb()
+
+    print(json.dumps({
+        "representation": representation,
+        "candidates": len(snapshot),
+        "load_seconds": round(loaded, 3),
+        "scan_seconds": round(scanned, 3),
+        "baseline_private_mb": baseline["private_mb"],
+        "loaded": after_load,
+        "scanned": after_scan,
+    }))
+
+
+def run_child(representation, roster, columnar_dir):
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_snapshot", "--child", representation, roster, columnar_dir],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--output", help="also save the results as JSON")
+    parser.add_argument("--child", nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        measure(*args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as workdir:
+        roster = os.path.join(workdir, "candidates.json")
+        columnar_dir = os.path.join(workdir, "columnar")
+        write_roster(roster, args.size)
+        results = [
+            run_child("json", roster, columnar_dir),
+            # First worker: parses the JSON and writes the snapshot; later workers only map it
+            {**run_child("columnar (first worker)", roster, columnar_dir)},
+            {**run_child("columnar", roster, columnar_dir)},
+        ]
+
+    print(f"{args.size} candidates")
+    for result in results:
+        print(
+            f"{result['representation']:>24}: load {result['load_seconds']:7.3f}s, "
+            f"scan {result['scan_seconds']:6.3f}s, RSS {result['scanned']['rss_mb']} MB, "
+            f"private {result['scanned']['private_mb']} MB"
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"size": args.size, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
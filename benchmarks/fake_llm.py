@@ -0,0 +1,123 @@
+"""Local stand-in for the OpenAI-compatible chat completions API.
+
+Answers every scoring prompt with a JSON array covering each candidate row
+(`c3|...` or, for packed prompts, `j2c3|...`), after a configurable latency
+plus a per-token generation delay. A fraction of replies can be made
+malformed (truncated, wrapped in prose, or not JSON at all) to exercise the
+parser's recovery paths. Token counts are tallied and exposed on `/stats`.
+
+Point the app at it with `openai_base_url=http://127.0.0.1:8081/v1`.
+
+Usage:
+    python -m benchmarks.fake_llm [--port 8081] [--latency 0.3] [--tokens-per-second 60] [--malformed-rate 0.05]
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.prompts import count_tokens
+
+settings = {
+    # Fixed delay before the first token, in seconds
+    "latency": float(os.getenv("FAKE_LLM_LATENCY", "0.3")),
+    # Completion tokens generated per second (0 = instantly)
+    "tokens_per_second": float(os.getenv("FAKE_LLM_TOKENS_PER_SECOND", "60")),
+    # Share of replies that are malformed
+    "malformed_rate": float(os.getenv("FAKE_LLM_MALFORMED_RATE", "0")),
+}
+
+SEED = int(os.getenv("FAKE_LLM_SEED", "0"))
+
+_ROW = re.compile(r"^((?:j\d+)?c\d+)\|(.*)$", re.M)
+
+app = FastAPI()
+stats = {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0, "malformed": 0}
+_random = random.Random(SEED)
+
+
+def score_rows(prompt: str) -> str:
+    """Builds a well-formed reply with a stable pseudo-score per candidate row."""
+    evaluations = []
+    for ref, row in _ROW.findall(prompt):
+        digest = hashlib.sha1(f"{prompt[:200]}|{row}".encode()).digest()
+        evaluations.append({"id": ref, "score": round(digest[0] / 25.5, 1), "explanation": "Synthetic evaluation."})
+    return json.dumps(evaluations)
+
+
+def malform(reply: str) -> str:
+    kind = _random.choice(("truncated", "prose", "garbage"))
+    if kind == "truncated":
+        return reply[: len(reply) * 3 // 5]
+    if kind == "prose":
+        return f"Here are the evaluations:\n```json\n{reply}\n```\nLet me know if you need more."
+    return "I'm sorry, I can't evaluate these candidates right now."
+
+
+def make_reply(payload) -> str:
+    prompt = payload["messages"][-1]["content"]
+    reply = score_rows(prompt)
+    if _random.random() < settings["malformed_rate"]:
+        stats["malformed"] += 1
+        reply = malform(reply)
+    stats["requests"] += 1
+    stats["prompt_tokens"] += sum(count_tokens(message["content"]) for message in payload["messages"])
+    stats["completion_tokens"] += count_tokens(reply)
+    return reply
+
+
+def _generation_delay(tokens: int) -> float:
+    rate = settings["tokens_per_second"]
+    return tokens / rate if rate > 0 else 0.0
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    payload = await request.json()
+    reply = make_reply(payload)
+    await asyncio.sleep(settings["latency"])
+
+    if not payload.get("stream"):
+        await asyncio.sleep(_generation_delay(count_tokens(reply)))
+        return JSONResponse({"choices": [{"index": 0, "message": {"role": "assistant", "content": reply}}]})
+
+    pieces = [reply[i:i + 16] for i in range(0, len(reply), 16)]
+    delay = _generation_delay(count_tokens(reply)) / max(1, len(pieces))
+
+    async def events():
+        for piece in pieces:
+            await asyncio.sleep(delay)
+            yield f"data: {json.dumps({'choices': [{'index': 0, 'delta': {'content': piece}}]})}\n\n"
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.get("/stats")
+async def get_stats():
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=settings["latency"])
+    parser.add_argument("--tokens-per-second", type=float, default=settings["tokens_per_second"])
+    parser.add_argument("--malformed-rate", type=float, default=settings["malformed_rate"])
+    args = parser.parse_args()
+    settings.update(latency=args.latency, tokens_per_second=args.tokens_per_second, malformed_rate=args.malformed_rate)
+
+    import uvicorn
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
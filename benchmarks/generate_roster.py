@@ -0,0 +1,75 @@
+"""Generates synthetic candidate rosters in the `candidates.json` schema.
+
+Rows are written one at a time, so rosters of a million candidates don't
+need to fit in memory. The same seed and anchor date always produce the
+same roster; staffing end dates fall between 60 days before and a year after
+the anchor (ANCHOR_DATE unless `--anchor-date` is given).
+
+Usage:
+    python -m benchmarks.generate_roster 100000 benchmarks/data/roster-100000.json [--seed 0]
+                                         [--anchor-date 2025-06-01]
+"""
+import argparse
+import json
+import random
+from datetime import date, timedelta
+from typing import Any, Dict, Iterator
+
+FIRST_NAMES = ("Ana", "Bruno", "Carla", "Diego", "Elena", "Felipe", "Grace", "Hugo", "Iris", "João",
+               "Kenji", "Laura", "Marcos", "Nina", "Omar", "Paula", "Rafael", "Sofia", "Tomás", "Yara")
+LAST_NAMES = ("Anderson", "Barros", "Chen", "Duarte", "Evans", "Ferreira", "Garcia", "Haddad", "Ito",
+              "Johnson", "Kowalski", "Lima", "Moreira", "Nguyen", "Oliveira", "Patel", "Rocha", "Silva")
+TITLES = ("Data Scientist", "Backend Engineer", "Frontend Engineer", "Data Engineer", "ML Engineer",
+          "DevOps Engineer", "Product Manager", "QA Engineer", "Solutions Architect", "Business Analyst")
+SKILLS = ("Python", "Java", "Go", "TypeScript", "React", "FastAPI", "Django", "PostgreSQL", "MongoDB",
+          "Kafka", "Spark", "Airflow", "AWS", "GCP", "Azure", "Docker", "Kubernetes", "Terraform",
+          "Machine Learning", "Deep Learning", "NLP", "Data Visualization", "SQL", "CI/CD", "Agile")
+INDUSTRIES = ("Healthcare", "Retail", "Consulting", "Finance", "Tech", "Energy", "Logistics",
+              "Education", "Telecom", "Government", "Manufacturing", "Media")
+LOCATIONS = ("Austin", "New York", "San Francisco", "Chicago", "Seattle", "Boston", "Denver",
+             "Atlanta", "Miami", "Remote")
+
+# Staffing end dates are spread around this day, so rosters don't depend on when they're generated
+ANCHOR_DATE = date(2025, 6, 1)
+
+
+def generate_candidates(count: int, seed: int = 0, anchor: date = ANCHOR_DATE) -> Iterator[Dict[str, Any]]:
+    rng = random.Random(seed)
+    for _ in range(count):
+        is_staffed = rng.random() < 0.6
+        end_date = anchor + timedelta(days=rng.randint(-60, 365))
+        yield {
+            "first_name": rng.choice(FIRST_NAMES),
+            "last_name": rng.choice(LAST_NAMES),
+            "title": rng.choice(TITLES),
+            "skills": ", ".join(rng.sample(SKILLS, rng.randint(2, 6))),
+            "is_staffed": is_staffed,
+            "staffing_end_date": end_date.strftime("%m-%d-%Y") if is_staffed else None,
+            "years_experience": rng.randint(0, 25),
+            "industry_experience": ", ".join(rng.sample(INDUSTRIES, rng.randint(1, 3))),
+            "location": rng.choice(LOCATIONS),
+        }
+
+
+def write_roster(path: str, count: int, seed: int = 0, anchor: date = ANCHOR_DATE) -> None:
+    """Writes `count` candidates to `path` as a JSON array, streaming row by row."""
+    with open(path, "w") as f:
+        f.write("[\n")
+        for position, candidate in enumerate(generate_candidates(count, seed, anchor)):
+            f.write(("," if position else "") + json.dumps(candidate) + "\n")
+        f.write("]\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("count", type=int)
+    parser.add_argument("path")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--anchor-date", type=date.fromisoformat, default=ANCHOR_DATE,
+                        help="day the staffing end dates are spread around (YYYY-MM-DD)")
+    args = parser.parse_args()
+    write_roster(args.path, args.count, args.seed, args.anchor_date)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""End-to-end load test of the API against the local fake LLM server.
+
+For each roster size, a synthetic roster is generated, the app is started
+with uvicorn against `benchmarks.fake_llm`, and every `/match` mode is driven
+with unique jobs at a fixed concurrency. For each run it reports p50/p95/p99
+latency, requests/sec, the server's peak RSS (high-water mark so far, so it
+accumulates across the modes of one roster) and LLM tokens per request.
+Results are saved as JSON, tagged with the current commit, so runs can be
+compared across commits.
+
+Usage:
+    python -m benchmarks.load_test [--sizes 100,10000,100000] [--modes llm,fast,stream]
+                                   [--requests 50] [--concurrency 8] [--latency 0.3]
+                                   [--tokens-per-second 60] [--malformed-rate 0.05]
+                                   [--output benchmarks/results/run.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from benchmarks.generate_roster import INDUSTRIES, LOCATIONS, SKILLS, TITLES, write_roster
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+MODES = {
+    "llm": ("/match", {}),
+    "fast": ("/match", {"mode": "fast"}),
+    "stream": ("/match/stream", {}),
+}
+
+
+def make_jobs(count: int, seed: int = 1) -> List[Dict[str, Any]]:
+    """Distinct jobs, so neither the result cache nor the score memo short-circuits a request."""
+    rng = random.Random(seed)
+    return [{
+        "cst_name": f"Client {n}",
+        "client_problem_statement": f"Staffing request {n}: need help delivering a {rng.choice(INDUSTRIES)} project.",
+        "title": rng.choice(TITLES),
+        "location": rng.choice(LOCATIONS),
+        "industry": rng.choice(INDUSTRIES),
+        "required_skills": ", ".join(rng.sample(SKILLS, 3)),
+        "years_experience": rng.randint(1, 12),
+    } for n in range(count)]
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered) + 0.5) - 1))]
+
+
+def peak_rss_mb(pid: int) -> Optional[float]:
+    """High-water resident set size of a process (Linux only)."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+def current_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def start_server(args: List[str], env: Dict[str, str]) -> subprocess.Popen:
+    return subprocess.Popen([sys.executable, *args], cwd=ROOT, env={**os.environ, **env},
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_until_ready(url: str, process: subprocess.Popen, timeout: float) -> float:
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode} before {url} was ready")
+        try:
+            if httpx.get(url, timeout=1).status_code == 200:
+                return time.perf_counter() - started
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"{url} not ready after {timeout:.0f}s")
+
+
+def stop_server(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+async def drive(base_url: str, mode: str, jobs: List[Dict[str, Any]], concurrency: int) -> Dict[str, Any]:
+    path, params = MODES[mode]
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    first_events: List[float] = []
+    errors = 0
+
+    async def one(client: httpx.AsyncClient, job: Dict[str, Any]) -> None:
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                if mode == "stream":
+                    async with client.stream("POST", path, params=params, json={"job": job}) as response:
+                        first_event = None
+                        async for line in response.aiter_lines():
+                            if line and first_event is None:
+                                first_event = time.perf_counter() - started
+                        if first_event is not None:
+                            first_events.append(first_event)
+                        ok = response.status_code == 200
+                else:
+                    response = await client.post(path, params=params, json={"job": job})
+                    ok = response.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=300) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(one(client, job) for job in jobs))
+        elapsed = time.perf_counter() - started
+
+    report = {
+        "requests": len(jobs),
+        "errors": errors,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "requests_per_second": round(len(latencies) / elapsed, 2) if elapsed else None,
+    }
+    for name in ("p50_ms", "p95_ms", "p99_ms"):
+        if report[name] is not None:
+            report[name] = round(report[name] * 1000, 1)
+    if mode == "stream":
+        report["first_event_p50_ms"] = round(percentile(first_events, 50) * 1000, 1) if first_events else None
+    return report
+
+
+def run(args) -> Dict[str, Any]:
+    llm_url = f"http://127.0.0.1:{args.llm_port}"
+    app_url = f"http://127.0.0.1:{args.app_port}"
+    fake_llm = start_server(
+        ["-m", "benchmarks.fake_llm", "--port", str(args.llm_port), "--latency", str(args.latency),
+         "--tokens-per-second", str(args.tokens_per_second), "--malformed-rate", str(args.malformed_rate)],
+        {},
+    )
+    runs = []
+    try:
+        wait_until_ready(f"{llm_url}/stats", fake_llm, timeout=30)
+        for size in args.sizes:
+            with tempfile.TemporaryDirectory() as workdir:
+                roster = os.path.join(workdir, "candidates.json")
+                write_roster(roster, size)
+                server = start_server(
+                    ["-m", "uvicorn", "app.main:app", "--port", str(args.app_port), "--log-level", "warning"],
+                    {
+                        "CANDIDATES_FILE": roster,
+                        "CANDIDATE_BACKEND": "json",
+                        "openai_base_url": f"{llm_url}/v1",
+                        "OPENAI_API_KEY": "benchmark",
+                        "SCORE_MEMO_DB": os.path.join(workdir, "score_memo.sqlite3"),
+                        "MATCH_CACHE_DB": "",
+                    },
+                )
+                try:
+                    startup = wait_until_ready(f"{app_url}/health/ready", server, timeout=args.startup_timeout)
+                    for mode in args.modes:
+                        before = httpx.get(f"{llm_url}/stats").json()
+                        report = asyncio.run(drive(app_url, mode, make_jobs(args.requests, seed=len(runs)), args.concurrency))
+                        after = httpx.get(f"{llm_url}/stats").json()
+                        per_request = {
+                            name: round((after[counter] - before[counter]) / args.requests, 1)
+                            for name, counter in (
+                                ("llm_calls_per_request", "requests"),
+                                ("prompt_tokens_per_request", "prompt_tokens"),
+                                ("completion_tokens_per_request", "completion_tokens"),
+                            )
+                        }
+                        runs.append({
+                            "roster_size": size,
+                            "mode": mode,
+                            "startup_seconds": round(startup, 2),
+                            **report,
+                            "peak_rss_mb": peak_rss_mb(server.pid),
+                            **per_request,
+                        })
+                        print(json.dumps(runs[-1]))
+                finally:
+                    stop_server(server)
+    finally:
+        stop_server(fake_llm)
+
+    return {
+        "commit": current_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "latency": args.latency,
+            "tokens_per_second": args.tokens_per_second,
+            "malformed_rate": args.malformed_rate,
+        },
+        "runs": runs,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=lambda value: [int(size) for size in value.split(",")], default=[100, 10_000, 100_000])
+    parser.add_argument("--modes", type=lambda value: value.split(","), default=list(MODES))
+    parser.add_argument("--requests", type=int, default=50, help="requests per mode and roster size")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.3, help="fake LLM delay before the first token (s)")
+    parser.add_argument("--tokens-per-second", type=float, default=60, help="fake LLM generation speed")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="share of malformed fake LLM replies")
+    parser.add_argument("--app-port", type=int, default=8090)
+    parser.add_argument("--llm-port", type=int, default=8091)
+    parser.add_argument("--startup-timeout", type=float, default=600)
+    parser.add_argument("--output", help="results file (default: benchmarks/results/load-<commit>-<time>.json)")
+    args = parser.parse_args()
+    unknown = set(args.modes) - set(MODES)
+    if unknown:
+        parser.error(f"unknown modes: {', '.join(sorted(unknown))}")
+
+    results = run(args)
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"load-{results['commit'] or 'unknown'}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
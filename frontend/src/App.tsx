@@ -6,7 +6,7 @@ import {
 import JobForm from './components/JobForm';
 import ResultsPanel from './components/ResultsPanel';
 import { CandidateMatch, Job } from './types';
-import { matchCandidates } from './services/api';
+import { streamMatchCandidates } from './services/api';
 
 const theme = createTheme({
   palette: {
@@ -33,8 +33,12 @@ const App: React.FC = () => {
   const handleJobSubmit = async (job: Job) => {
     setLoading(true);
     setError(null);
+    setMatches([]);
     try {
-      const results = await matchCandidates(job);
+      // Show candidates as they are scored, best first, then settle on the final ranking
+      const results = await streamMatchCandidates(job, (candidate) => {
+        setMatches((current) => [...current, candidate].sort((a, b) => b.score - a.score));
+      });
       setMatches(results);
     } catch (err) {
       setError('Failed to match candidates. Please try again.');
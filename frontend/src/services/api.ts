@@ -1,5 +1,5 @@
 import axios from 'axios';
-import { Job, CandidateMatch } from '../types';
+import { Job, CandidateMatch, MatchStreamEvent } from '../types';
 
 const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000';
 
@@ -11,4 +11,57 @@ export const matchCandidates = async (job: Job): Promise<CandidateMatch[]> => {
     console.error('Error matching candidates:', error);
     throw error;
   }
-};
\ No newline at end of file
+};
+
+// Streams matches from /match/stream (NDJSON). `onCandidate` is called for every
+// candidate as soon as the model finishes scoring it; the promise resolves with
+// the final ranked top matches.
+export const streamMatchCandidates = async (
+  job: Job,
+  onCandidate: (candidate: CandidateMatch) => void
+): Promise<CandidateMatch[]> => {
+  const response = await fetch(`${API_BASE_URL}/match/stream`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ job }),
+  });
+  if (!response.ok || !response.body) {
+    throw new Error(`Streaming match failed with status ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  let result: CandidateMatch[] | null = null;
+
+  const handleLine = (line: string) => {
+    if (!line.trim()) {
+      return;
+    }
+    const message: MatchStreamEvent = JSON.parse(line);
+    if (message.event === 'candidate') {
+      onCandidate(message.data);
+    } else if (message.event === 'result') {
+      result = message.data;
+    } else {
+      throw new Error(message.data);
+    }
+  };
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) {
+      break;
+    }
+    buffer += decoder.decode(value, { stream: true });
+    const lines = buffer.split('\n');
+    buffer = lines.pop() ?? '';
+    lines.forEach(handleLine);
+  }
+  handleLine(buffer);
+
+  if (result === null) {
+    throw new Error('Match stream ended without a result');
+  }
+  return result;
+};
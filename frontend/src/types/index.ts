@@ -21,4 +21,9 @@ export interface JobFormProps {
 
 export interface ResultsPanelProps {
   matches: CandidateMatch[];
-}
\ No newline at end of file
+}
+
+export type MatchStreamEvent =
+  | { event: 'candidate'; data: CandidateMatch }
+  | { event: 'result'; data: CandidateMatch[] }
+  | { event: 'error'; data: string };
@@ -0,0 +1,53 @@
+import random
+from datetime import date, timedelta
+
+from app.availability import AvailabilityIndex
+from app.candidate_store import CandidateSnapshot, normalize_candidate
+from app.main import MatchFilters
+from app.repository import is_eligible
+
+TODAY = date(2025, 6, 1)
+
+
+def make_snapshot(version, rows):
+    candidates = tuple(normalize_candidate(row, i + 1) for i, row in enumerate(rows))
+    return CandidateSnapshot(version=version, candidates=candidates, by_id={c["id"]: c for c in candidates})
+
+
+def random_rows(count, seed=0):
+    rng = random.Random(seed)
+    return [{
+        "first_name": f"C{i}",
+        "is_staffed": rng.random() < 0.7,
+        "staffing_end_date": (TODAY + timedelta(days=rng.randint(-30, 90))).isoformat() if rng.random() < 0.9 else None,
+    } for i in range(count)]
+
+
+def test_index_matches_a_full_scan():
+    snapshot = make_snapshot("v1", random_rows(500))
+    index = AvailabilityIndex()
+    index.sync(snapshot)
+    for offset in (-40, 0, 15, 200):
+        day = TODAY + timedelta(days=offset)
+        expected = {c["id"] for c in snapshot.candidates if is_eligible(c, available_by=day)}
+        assert sorted(index.available_by(day)) == sorted(expected)
+
+
+def test_staffing_changes_are_applied_incrementally():
+    rows = random_rows(50)
+    index = AvailabilityIndex()
+    index.sync(make_snapshot("v1", rows))
+
+    rows[0] = {"first_name": "C0", "is_staffed": True, "staffing_end_date": "01-01-2030"}
+    rows[1] = {"first_name": "C1", "is_staffed": False}
+    assert index.sync(make_snapshot("v2", rows[:-1])) == 3
+    assert 1 not in index.available_by(date(2029, 12, 31))
+    assert 1 in index.available_by(date(2030, 1, 1))
+    assert 2 in index.available_by(date(2000, 1, 1))
+    assert 50 not in index.available_by(date(2100, 1, 1))
+
+
+def test_start_window_sets_the_availability_deadline():
+    filters = MatchFilters(start_date=date(2025, 7, 1), start_window_days=14, location="Austin")
+    assert filters.values() == {"location": "Austin", "available_by": date(2025, 7, 15)}
+    assert MatchFilters(start_date=date(2025, 7, 1), available_by=date(2025, 6, 20)).values()["available_by"] == date(2025, 6, 20)
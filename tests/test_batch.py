@@ -0,0 +1,80 @@
+import json
+import re
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app import main, services
+from app.cache import ResultCache
+from app.llm import LLMClient, remaining_time
+from app.main import app
+from app.prompts import build_batch_prompt
+from app.score_memo import ScoreMemo
+from app.scoring import pack_jobs
+
+JOB = {
+    "cst_name": "Acme Inc",
+    "client_problem_statement": "Need a data scientist.",
+    "title": "Data Scientist",
+    "location": "Austin",
+    "industry": "Healthcare",
+    "required_skills": "Machine Learning, Python",
+    "years_experience": 5,
+}
+
+CANDIDATES = [
+    {"id": i, "first_name": f"First{i}", "last_name": "Last", "title": "Engineer", "skills": "Python",
+     "years_experience": 4, "industry_experience": "Tech", "location": "Austin"}
+    for i in range(1, 31)
+]
+
+
+def test_small_shortlists_share_a_prompt_and_large_ones_are_split():
+    prompts = pack_jobs([("a", JOB, CANDIDATES[:4]), ("b", JOB, CANDIDATES[:4]), ("c", JOB, CANDIDATES)],
+                        max_chunk_size=20)
+    assert [[(key, len(candidates)) for key, _, candidates in sections] for sections in prompts] == [
+        [("a", 4), ("b", 4), ("c", 12)], [("c", 18)],
+    ]
+
+    prompt = build_batch_prompt(prompts[0])
+    assert prompt.jobs["j2c4"] == "b" and prompt.candidates["j3c1"]["id"] == 1
+    assert "j3c12|Engineer" in prompt.text
+
+
+def test_batch_endpoint_packs_jobs_into_combined_calls(monkeypatch):
+    calls = []
+
+    def reply(request):
+        prompt = json.loads(request.content)["messages"][1]["content"]
+        calls.append(prompt)
+        refs = re.findall(r"^(j\d+c\d+)\|", prompt, re.M)
+        content = json.dumps([{"id": ref, "score": 10 - int(ref.split("c")[1]), "explanation": "fit"} for ref in refs])
+        return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+
+    monkeypatch.setattr(services, "llm_client", LLMClient(api_key="test", transport=httpx.MockTransport(reply)))
+    monkeypatch.setattr(services, "score_memo", ScoreMemo(":memory:"))
+    monkeypatch.setattr(services, "result_cache", ResultCache(db_path=None))
+
+    jobs = [{"job": {**JOB, "title": title}, "shortlist_size": 5} for title in ("Data Scientist", "ML Engineer", "Analyst")]
+    response = TestClient(app).post("/match/batch", json=jobs)
+
+    assert response.status_code == 200
+    assert len(calls) == 1
+    results = response.json()
+    assert [result["index"] for result in results] == [0, 1, 2]
+    assert all(len(result["matches"]) == 3 and result["error"] is None for result in results)
+    assert results[0]["matches"][0]["score"] == 9
+
+
+def test_a_batch_runs_to_its_tightest_deadline(monkeypatch):
+    seen = []
+
+    async def evaluate_batch(jobs, top_k):
+        seen.append(remaining_time())
+        return [{"matches": [], "error": None} for _ in jobs]
+
+    monkeypatch.setattr(main, "evaluate_batch", evaluate_batch)
+    jobs = [{"job": JOB}, {"job": JOB, "budget": {"deadline_ms": 2000}}, {"job": JOB, "budget": {"deadline_ms": 9000}}]
+
+    assert TestClient(app).post("/match/batch", json=jobs).status_code == 200
+    assert 1.5 < seen[0] <= 2
@@ -0,0 +1,77 @@
+import asyncio
+import json
+import re
+
+import httpx
+
+from app import services
+from app.cache import ResultCache, cache_key, fingerprint_job
+from app.llm import LLMClient
+from app.score_memo import ScoreMemo
+
+JOB = {
+    "cst_name": "Acme Inc",
+    "title": "Senior Backend Engineer",
+    "required_skills": "Python, FastAPI, PostgreSQL",
+    "years_experience": 5,
+}
+
+
+def test_fingerprint_ignores_whitespace_case_and_order():
+    variant = {
+        "years_experience": 5,
+        "required_skills": "postgresql,  python , FASTAPI",
+        "title": "  senior   backend engineer",
+        "cst_name": "ACME INC",
+    }
+    assert fingerprint_job(variant) == fingerprint_job(JOB)
+    assert fingerprint_job({**JOB, "years_experience": 6}) != fingerprint_job(JOB)
+
+
+def test_lru_and_version_invalidation():
+    cache = ResultCache(max_entries=2, ttl=60, db_path=None)
+    old = cache_key(JOB, "v1", top_k=3)
+    cache.set(old, [{"full_name": "Ana"}])
+    assert cache.get(old) == [{"full_name": "Ana"}]
+
+    cache.invalidate("v2")
+    assert cache.get(old) is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_sqlite_tier_survives_restart(tmp_path):
+    db_path = str(tmp_path / "cache.sqlite3")
+    key = cache_key(JOB, "v1", top_k=3)
+    ResultCache(db_path=db_path).set(key, [{"full_name": "Ana", "score": 9.0}])
+
+    restarted = ResultCache(db_path=db_path)
+    assert restarted.get(key) == [{"full_name": "Ana", "score": 9.0}]
+    assert restarted.stats()["disk_hits"] == 1
+
+
+def test_results_with_failed_chunks_are_not_cached(monkeypatch):
+    calls = []
+
+    def reply(request):
+        calls.append(request)
+        if len(calls) == 1:
+            return httpx.Response(500)
+        prompt = json.loads(request.content)["messages"][1]["content"]
+        content = json.dumps([{"id": ref, "score": 7, "explanation": "fit"} for ref in re.findall(r"^(c\d+)\|", prompt, re.M)])
+        return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+
+    monkeypatch.setattr(services, "llm_client", LLMClient(api_key="test", max_concurrency=1,
+                                                          transport=httpx.MockTransport(reply)))
+    monkeypatch.setattr(services, "score_memo", ScoreMemo(":memory:"))
+    monkeypatch.setattr(services, "result_cache", ResultCache(db_path=None))
+    job = {**JOB, "client_problem_statement": "Backend work.", "location": "Austin", "industry": "Tech"}
+
+    first = asyncio.run(services.evaluate_candidates(job, shortlist_size=30))
+    assert first and services.result_cache.stats()["entries"] == 0
+
+    first[0]["score"] = -1  # Callers get copies, never the cached entry itself
+    second = asyncio.run(services.evaluate_candidates(job, shortlist_size=30))
+    assert services.result_cache.stats()["entries"] == 1
+    assert asyncio.run(services.evaluate_candidates(job, shortlist_size=30)) == second
+    second[0]["score"] = -1
+    assert asyncio.run(services.evaluate_candidates(job, shortlist_size=30))[0]["score"] == 7
@@ -0,0 +1,82 @@
+import json
+import threading
+import time
+from datetime import date
+
+from app.candidate_store import CandidateStore, JsonFileSource
+
+
+def write_roster(path, candidates):
+    path.write_text(json.dumps(candidates))
+
+
+def make_candidate(first_name, **overrides):
+    candidate = {
+        "first_name": first_name,
+        "last_name": "Doe",
+        "title": "Data Scientist",
+        "skills": "Python, SQL",
+        "is_staffed": True,
+        "staffing_end_date": "09-19-2025",
+        "years_experience": 5,
+        "industry_experience": "Retail",
+        "location": "Austin",
+    }
+    candidate.update(overrides)
+    return candidate
+
+
+def test_snapshot_is_shared_until_the_file_changes(tmp_path):
+    roster = tmp_path / "candidates.json"
+    write_roster(roster, [make_candidate("Ana"), make_candidate("Bo")])
+    store = CandidateStore(JsonFileSource(str(roster)), check_interval=0)
+    changes = []
+    store.subscribe(lambda previous, current: changes.append((previous, current)))
+
+    first = store.snapshot()
+    assert store.snapshot() is first
+    assert [c["id"] for c in first] == [1, 2]
+    assert first.by_id[1]["staffing_end_date"] == date(2025, 9, 19)
+
+    write_roster(roster, [make_candidate("Ana"), make_candidate("Bo"), make_candidate("Cy")])
+    second = store.refresh()
+    assert second is not first
+    assert second.version != first.version
+    assert len(first) == 2 and len(second) == 3
+    assert changes[-1] == (first, second)
+
+
+def test_malformed_file_keeps_last_good_snapshot(tmp_path):
+    roster = tmp_path / "candidates.json"
+    write_roster(roster, [make_candidate("Ana")])
+    store = CandidateStore(JsonFileSource(str(roster)), check_interval=0)
+    first = store.snapshot()
+
+    roster.write_text("[{\"first_name\": ")
+    assert store.refresh() is first
+
+
+def test_reloads_happen_off_the_request_path(tmp_path):
+    roster = tmp_path / "candidates.json"
+    write_roster(roster, [make_candidate("Ana")])
+    loading = threading.Event()
+
+    class SlowSource(JsonFileSource):
+        def load(self):
+            if store._snapshot is not None:
+                loading.wait(5)
+            return super().load()
+
+    store = CandidateStore(SlowSource(str(roster)), check_interval=0)
+    first = store.snapshot()
+    write_roster(roster, [make_candidate("Ana"), make_candidate("Bo")])
+
+    started = time.monotonic()
+    assert store.snapshot() is first  # The reload waits in the background...
+    assert time.monotonic() - started < 1
+    loading.set()
+    for _ in range(100):
+        if store.snapshot() is not first:
+            break
+        time.sleep(0.01)
+    assert len(store.snapshot()) == 2  # ...and is swapped in once done
@@ -0,0 +1,111 @@
+import asyncio
+import json
+import re
+import time
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app import cascade, services
+from app.cache import ResultCache
+from app.cascade import Budget, LatencyModel, plan_band
+from app.llm import LLMClient
+from app.main import app
+from app.score_memo import ScoreMemo
+
+JOB = {
+    "cst_name": "Acme Inc",
+    "client_problem_statement": "Need a data scientist.",
+    "title": "Data Scientist",
+    "location": "Austin",
+    "industry": "Healthcare",
+    "required_skills": "Machine Learning, Python",
+    "years_experience": 5,
+}
+
+RANKED = [
+    ({"id": i, "first_name": f"First{i}", "last_name": "Last", "title": "Engineer", "skills": "Python",
+      "years_experience": 4, "industry_experience": "Tech", "location": "Austin"}, score)
+    for i, score in enumerate([9.0, 8.5, 8.0, 7.8, 7.6, 5.0, 4.0], start=1)
+]
+
+
+def ids(candidates):
+    return [candidate["id"] for candidate in candidates]
+
+
+def test_band_takes_borderline_candidates_and_shrinks_to_the_budget():
+    # Band of 2, plus candidates within 0.5 of the 3rd-best fast score (8.0)
+    assert ids(plan_band(JOB, RANKED, top_k=3, band_size=2)) == [1, 2, 3, 4, 5]
+    assert ids(plan_band(JOB, RANKED, top_k=3, band_size=2, budget=Budget(max_tokens=0))) == []
+
+    one_candidate_tokens = 300
+    assert len(plan_band(JOB, RANKED, top_k=3, band_size=2, budget=Budget(max_tokens=one_candidate_tokens))) == 1
+    # Candidates with memoized LLM scores don't use up the budget
+    assert ids(plan_band(JOB, RANKED, top_k=3, band_size=2, budget=Budget(max_tokens=one_candidate_tokens),
+                         memoized={1, 2})) == [1, 2, 3]
+
+
+def test_latency_deadline_limits_the_band():
+    slow = LatencyModel(seconds_per_token=1.0)
+    assert plan_band(JOB, RANKED, band_size=5, budget=Budget(deadline=time.monotonic() + 1), model=slow) == []
+    assert len(plan_band(JOB, RANKED, band_size=5, budget=Budget(deadline=time.monotonic() + 3600), model=slow)) == 5
+
+
+def test_cascade_reports_the_tier_of_each_score(monkeypatch):
+    def reply(request):
+        prompt = json.loads(request.content)["messages"][1]["content"]
+        content = json.dumps([{"id": ref, "score": 9, "explanation": "fit"} for ref in re.findall(r"^(c\d+)\|", prompt, re.M)])
+        return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+
+    monkeypatch.setattr(services, "llm_client", LLMClient(api_key="test", transport=httpx.MockTransport(reply)))
+    monkeypatch.setattr(services, "score_memo", ScoreMemo(":memory:"))
+    monkeypatch.setattr(services, "result_cache", ResultCache(db_path=None))
+    monkeypatch.setattr(cascade, "CASCADE_MARGIN", -100)  # No borderline candidates
+    client = TestClient(app)
+
+    response = client.post("/match?mode=cascade", json={"job": JOB, "shortlist_size": 2})
+    assert response.status_code == 200
+    assert [match["tier"] for match in response.json()] == ["llm", "llm", "fast"]
+
+    response = client.post("/match?mode=cascade", json={"job": {**JOB, "title": "Analyst"}, "budget": {"max_tokens": 0}})
+    assert [match["tier"] for match in response.json()] == ["fast"] * 3
+
+
+def test_cascade_falls_back_to_fast_scores_when_the_llm_fails(monkeypatch):
+    failing = LLMClient(api_key="test", transport=httpx.MockTransport(lambda request: httpx.Response(500)))
+    monkeypatch.setattr(services, "llm_client", failing)
+    monkeypatch.setattr(services, "score_memo", ScoreMemo(":memory:"))
+    monkeypatch.setattr(services, "result_cache", ResultCache(db_path=None))
+
+    matches = TestClient(app).post("/match?mode=cascade", json={"job": JOB}).json()
+    assert [match["tier"] for match in matches] == ["fast"] * 3
+
+
+def test_cut_or_partial_bands_are_not_cached(monkeypatch):
+    calls = []
+
+    def reply(request):
+        calls.append(request)
+        if len(calls) == 1:
+            return httpx.Response(500)
+        prompt = json.loads(request.content)["messages"][1]["content"]
+        content = json.dumps([{"id": ref, "score": 9, "explanation": "fit"} for ref in re.findall(r"^(c\d+)\|", prompt, re.M)])
+        return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+
+    monkeypatch.setattr(services, "llm_client", LLMClient(api_key="test", transport=httpx.MockTransport(reply)))
+    monkeypatch.setattr(services, "score_memo", ScoreMemo(":memory:"))
+    monkeypatch.setattr(services, "result_cache", ResultCache(db_path=None))
+    monkeypatch.setattr(cascade, "CASCADE_MARGIN", -100)
+
+    cut = asyncio.run(services.evaluate_cascade(JOB, band_size=2, budget=Budget(deadline=time.monotonic() - 1)))
+    assert [match["tier"] for match in cut] == ["fast"] * 3
+    assert not calls
+
+    # The first chunk fails: only part of the band gets an LLM score, and nothing is cached
+    monkeypatch.setattr("app.scoring.max_candidates_per_prompt", lambda: 1)
+    partial = asyncio.run(services.evaluate_cascade(JOB, band_size=2))
+    assert [match["tier"] for match in partial].count("llm") == 1
+
+    full = asyncio.run(services.evaluate_cascade(JOB, band_size=2))
+    assert [match["tier"] for match in full] == ["llm", "llm", "fast"]
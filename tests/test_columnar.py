@@ -0,0 +1,59 @@
+import json
+import os
+import time
+
+import numpy as np
+
+from app.candidate_store import CandidateStore, JsonFileSource, candidate_hash, normalize_candidate
+from app import columnar
+from app.columnar import ColumnarRoster, ColumnarSource, write_columnar
+
+ROWS = [
+    {"first_name": "Ana", "last_name": "Lee", "title": "Engineer", "skills": "Python, C++", "is_staffed": True,
+     "staffing_end_date": "09-19-2025", "years_experience": 6, "industry_experience": "Tech", "location": "Austin"},
+    {"first_name": "Bo", "last_name": "Lee", "title": "Engineer", "skills": None, "is_staffed": False,
+     "staffing_end_date": None, "years_experience": None, "industry_experience": "Tech", "location": "Austin"},
+    {"id": 42, "first_name": "Zoë", "last_name": "Ruiz", "title": "Designer", "skills": "Figma", "is_staffed": None,
+     "staffing_end_date": "2026-01-31", "years_experience": 0, "industry_experience": "", "location": "São Paulo"},
+]
+
+
+def test_rows_round_trip_through_the_mapped_arrays(tmp_path):
+    roster = ColumnarRoster(write_columnar("v1", ROWS, str(tmp_path)))
+    rows = roster.rows()
+    for position, (raw, row) in enumerate(zip(ROWS, rows), start=1):
+        expected = normalize_candidate(raw, position)
+        assert dict(row) == dict(expected)
+        assert candidate_hash(row) == candidate_hash(expected)
+
+    assert isinstance(roster.column("location"), np.ndarray)
+    assert roster.column("location")[0] == roster.column("location")[1]  # Interned once
+    assert roster.meta["strings"] < sum(1 for row in ROWS for value in row.values() if isinstance(value, str))
+
+
+def test_workers_map_an_existing_snapshot_without_parsing(tmp_path):
+    path = tmp_path / "candidates.json"
+    path.write_text(json.dumps(ROWS))
+    first = CandidateStore(ColumnarSource(JsonFileSource(str(path)), root=str(tmp_path / "columnar"))).snapshot()
+
+    class NoParse(JsonFileSource):
+        def load(self):
+            raise AssertionError("the snapshot should have been mapped, not parsed")
+
+    second = CandidateStore(ColumnarSource(NoParse(str(path)), root=str(tmp_path / "columnar"))).snapshot()
+    assert second.version == first.version
+    assert second.by_id[42]["location"] == "São Paulo"
+
+
+def test_old_versions_are_only_pruned_once_unused(tmp_path, monkeypatch):
+    monkeypatch.setattr(columnar, "KEEP_VERSIONS", 1)
+    root = str(tmp_path)
+    stale = time.time() - 2 * columnar.PRUNE_GRACE_SECONDS
+    write_columnar("v1", ROWS, root)
+    os.utime(tmp_path / "v1", (stale, stale))
+    write_columnar("v2", ROWS, root)
+    os.utime(tmp_path / "v2", (stale, stale))
+    ColumnarRoster(str(tmp_path / "v2"))  # A worker has just mapped v2...
+
+    write_columnar("v3", ROWS, root)
+    assert sorted(os.listdir(root)) == ["v2", "v3"]  # ...so only v1 goes
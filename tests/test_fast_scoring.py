@@ -0,0 +1,64 @@
+import time
+
+from fastapi.testclient import TestClient
+
+from app.candidate_store import CandidateSnapshot, normalize_candidate
+from app.fast_scoring import fast_match
+from app.main import app
+
+JOB = {
+    "cst_name": "Acme Inc",
+    "client_problem_statement": "Need a backend engineer to optimize data pipeline performance.",
+    "title": "Senior Backend Engineer",
+    "location": "New York",
+    "industry": "Tech",
+    "required_skills": "Python, FastAPI, PostgreSQL, Data Pipelines",
+    "years_experience": 5,
+}
+
+
+def make_snapshot(rows):
+    candidates = tuple(normalize_candidate(row, i + 1) for i, row in enumerate(rows))
+    return CandidateSnapshot(version=str(len(rows)), candidates=candidates, by_id={c["id"]: c for c in candidates})
+
+
+def test_fast_match_prefers_skill_location_and_experience_fit():
+    snapshot = make_snapshot([
+        {"first_name": "Ana", "last_name": "Lee", "title": "Backend Engineer", "skills": "Python, FastAPI, PostgreSQL",
+         "years_experience": 5, "industry_experience": "Tech", "location": "New York"},
+        {"first_name": "Bo", "last_name": "Kim", "title": "UX Designer", "skills": "Figma, Wireframing",
+         "years_experience": 12, "industry_experience": "Retail", "location": "Austin"},
+        {"first_name": "Cy", "last_name": "Ray", "title": "Data Engineer", "skills": "Python, Spark",
+         "years_experience": 4, "industry_experience": "Healthcare", "location": "New York"},
+    ])
+    top = fast_match(JOB, snapshot, top_k=2)
+    assert [match["full_name"] for match in top] == ["Ana Lee", "Cy Ray"]
+    assert 0 <= top[1]["score"] <= top[0]["score"] <= 10
+    assert "Matches 3 of 4 required skills" in top[0]["explanation"]
+
+
+def test_fast_match_scales_to_large_rosters():
+    rows = [
+        {"first_name": f"C{i}", "last_name": "Doe", "title": "Engineer", "skills": f"Python, Skill{i % 97}",
+         "years_experience": i % 20, "industry_experience": "Tech", "location": "Austin"}
+        for i in range(20_000)
+    ]
+    snapshot = make_snapshot(rows)
+    fast_match(JOB, snapshot)  # builds the feature matrix once
+    start = time.perf_counter()
+    assert len(fast_match(JOB, snapshot, top_k=3)) == 3
+    assert time.perf_counter() - start < 0.5
+
+
+def test_match_endpoint_fast_mode():
+    response = TestClient(app).post("/match?mode=fast", json={"job": JOB})
+    assert response.status_code == 200
+    assert len(response.json()) == 3
+    assert set(response.json()[0]) == {"full_name", "score", "explanation"}
+
+
+def test_batch_endpoint_fast_mode():
+    response = TestClient(app).post("/match/batch?mode=fast", json=[{"job": JOB}, {"job": JOB}])
+    assert response.status_code == 200
+    assert [result["index"] for result in response.json()] == [0, 1]
+    assert all(len(result["matches"]) == 3 for result in response.json())
@@ -0,0 +1,72 @@
+import io
+import json
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.pool import StaticPool
+
+from app.db_models import Base, Candidate
+from app.ingest import detect_format, ingest_stream, iter_records
+
+RECORD = dict(first_name="Ana", last_name="Lee", title="Engineer", skills="Python", is_staffed="true",
+              staffing_end_date="09-19-2025", years_experience=6, industry_experience="Tech", location="Austin")
+
+
+def make_engine():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def rows(engine):
+    with engine.connect() as connection:
+        return connection.execute(select(Candidate).order_by(Candidate.id)).mappings().all()
+
+
+def test_ndjson_is_validated_and_written_in_batches():
+    lines = [json.dumps({**RECORD, "first_name": f"C{i}"}) for i in range(5)]
+    lines += ['{"first_name": "broken"', json.dumps({**RECORD, "years_experience": "many"})]
+    engine = make_engine()
+
+    report = ingest_stream(io.BytesIO("\n".join(lines).encode()), "ndjson", batch_size=2, engine=engine)
+
+    assert (report.rows_read, report.rows_written, report.rows_invalid) == (7, 5, 2)
+    assert report.errors[1].startswith("record 7: years_experience")
+    stored = rows(engine)
+    assert [row["first_name"] for row in stored] == ["C0", "C1", "C2", "C3", "C4"]
+    assert stored[0]["is_staffed"] is True and stored[0]["staffing_end_date"].isoformat() == "2025-09-19"
+
+
+def test_rows_with_ids_are_upserted():
+    engine = make_engine()
+    ingest_stream(io.BytesIO(json.dumps([{**RECORD, "id": 7}]).encode()), "json", engine=engine)
+    body = "id,first_name,last_name,title,skills,is_staffed,staffing_end_date,years_experience,industry_experience,location\n"
+    body += "7,Ana,Lee,Staff Engineer,Python,false,,7,Tech,Boston\n"
+
+    report = ingest_stream(io.BytesIO(body.encode()), "csv", engine=engine)
+
+    assert report.rows_written == 1
+    (row,) = rows(engine)
+    assert (row["id"], row["title"], row["staffing_end_date"], row["location"]) == (7, "Staff Engineer", None, "Boston")
+
+
+def test_a_repeated_id_in_one_batch_keeps_the_last_row(monkeypatch):
+    monkeypatch.setattr("app.ingest._upsert_statement", lambda dialect: None)  # Delete/insert fallback
+    records = [{**RECORD, "id": 3, "title": "Engineer"}, {**RECORD, "first_name": "Bo"}, {**RECORD, "id": 3, "title": "Lead"}]
+    engine = make_engine()
+
+    report = ingest_stream(io.BytesIO(json.dumps(records).encode()), "json", engine=engine)
+
+    assert report.rows_written == 3
+    assert [(row["id"], row["first_name"], row["title"]) for row in rows(engine)] == [(3, "Ana", "Lead"), (4, "Bo", "Engineer")]
+
+
+def test_json_arrays_are_read_incrementally():
+    payload = json.dumps([{**RECORD, "first_name": "Zoë"}] * 3).encode()
+    stream = io.BytesIO(payload)
+    stream.read = lambda size=-1, read=stream.read: read(min(size, 5))  # Split multi-byte characters
+
+    assert [record["first_name"] for record in iter_records(stream, "json")] == ["Zoë"] * 3
+    assert detect_format("export.jsonl") == "ndjson"
@@ -0,0 +1,146 @@
+import asyncio
+import json
+import re
+import sqlite3
+import time
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app import main, services
+from app.cache import ResultCache
+from app.jobs import JobQueue, WorkerPool
+from app.llm import LLMClient
+from app.score_memo import ScoreMemo
+
+JOB = {
+    "cst_name": "Acme Inc",
+    "client_problem_statement": "Need a data scientist.",
+    "title": "Data Scientist",
+    "location": "Austin",
+    "industry": "Healthcare",
+    "required_skills": "Machine Learning, Python",
+    "years_experience": 5,
+}
+
+
+def test_identical_active_jobs_are_deduplicated(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"))
+    first, created = queue.submit({"n": 1}, "key")
+    assert created
+    assert queue.submit({"n": 1}, "key") == (first, False)
+
+    job_id, token, payload = queue.claim()
+    assert (job_id, payload) == (first, {"n": 1})
+    assert queue.complete(first, token, [1, 2])
+    assert queue.get(first)["status"] == "done"
+    assert queue.submit({"n": 1}, "key")[1]  # A finished job doesn't block a new one
+
+
+def test_jobs_with_different_budgets_are_not_shared(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, "job_queue", JobQueue(str(tmp_path / "jobs.sqlite3")))
+    client = TestClient(main.app)
+
+    first = client.post("/match/jobs", json={"job": JOB}).json()
+    assert client.post("/match/jobs", json={"job": JOB}).json()["id"] == first["id"]
+    tight = client.post("/match/jobs", json={"job": JOB, "budget": {"deadline_ms": 500}}).json()
+    assert tight["id"] != first["id"] and not tight["deduplicated"]
+
+
+def test_finished_jobs_are_deleted_after_the_retention(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"), retention_seconds=0.01)
+    finished, _ = queue.submit({}, "finished")
+    _, token, _ = queue.claim()
+    queue.complete(finished, token, [])
+    waiting, _ = queue.submit({}, "waiting")
+    time.sleep(0.02)
+
+    queue._next_sweep = 0
+    assert queue.claim()[0] == waiting
+    assert queue.get(finished) is None
+    assert queue.get(waiting)["status"] == "running"
+
+
+def test_abandoned_jobs_are_resumed_then_given_up(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    job_id, _ = JobQueue(path).submit({}, "key")
+    assert JobQueue(path, lease_seconds=0).claim()[0] == job_id  # This worker "crashes"
+
+    restarted = JobQueue(path, lease_seconds=0, max_attempts=2)
+    time.sleep(0.01)
+    assert restarted.claim()[0] == job_id
+    time.sleep(0.01)
+    assert restarted.claim() is None
+    assert restarted.get(job_id)["status"] == "failed"
+
+
+def test_a_worker_that_lost_its_lease_cannot_store_a_result(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"), lease_seconds=0)
+    job_id, _ = queue.submit({}, "key")
+    _, stale, _ = queue.claim()
+    time.sleep(0.01)
+    _, current, _ = queue.claim()  # The lease lapsed and another worker took over
+
+    assert not queue.heartbeat(job_id, stale)
+    assert not queue.complete(job_id, stale, ["stale"])
+    assert queue.complete(job_id, current, ["current"])
+    assert queue.get(job_id)["result"] == ["current"]
+
+
+def test_workers_survive_queue_errors(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"))
+    queue.submit({"n": 1}, "key")
+    claim, failures = queue.claim, []
+
+    def flaky_claim():
+        if not failures:
+            failures.append(1)
+            raise sqlite3.OperationalError("database is locked")
+        return claim()
+
+    queue.claim = flaky_claim
+    done = []
+
+    async def handler(payload):
+        done.append(payload)
+        return []
+
+    async def run():
+        pool = WorkerPool(queue, handler, size=1, poll_interval=0.01)
+        pool.start()
+        for _ in range(100):
+            if done:
+                break
+            await asyncio.sleep(0.01)
+        await pool.stop()
+
+    asyncio.run(run())
+    assert failures and done == [{"n": 1}]
+
+
+def test_submitted_jobs_are_scored_by_the_worker_pool(monkeypatch, tmp_path):
+    def reply(request):
+        prompt = json.loads(request.content)["messages"][1]["content"]
+        content = json.dumps([{"id": ref, "score": 6, "explanation": "fit"} for ref in re.findall(r"^(c\d+)\|", prompt, re.M)])
+        return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+
+    monkeypatch.setattr(services, "llm_client", LLMClient(api_key="test", transport=httpx.MockTransport(reply)))
+    monkeypatch.setattr(services, "score_memo", ScoreMemo(":memory:"))
+    monkeypatch.setattr(services, "result_cache", ResultCache(db_path=None))
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"))
+    monkeypatch.setattr(main, "job_queue", queue)
+    monkeypatch.setattr(main, "worker_pool", WorkerPool(queue, main.run_match_job, size=2, poll_interval=0.05))
+
+    with TestClient(main.app) as client:
+        submitted = client.post("/match/jobs", json={"job": JOB, "shortlist_size": 5})
+        assert submitted.status_code == 202
+        job_id = submitted.json()["id"]
+        for _ in range(100):
+            job = client.get(f"/match/jobs/{job_id}").json()
+            if job["status"] in ("done", "failed"):
+                break
+            time.sleep(0.05)
+
+    assert job["status"] == "done"
+    assert len(job["result"]) == 3 and job["result"][0]["score"] == 6
+    assert client.get("/match/jobs/unknown").status_code == 404
@@ -0,0 +1,205 @@
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main, services
+from app.cache import ResultCache
+from app.llm import CircuitBreaker, LLMClient, LLMError, LLMTimeoutError, LLMUnavailableError, request_deadline
+from app.main import app
+from app.score_memo import ScoreMemo
+
+
+def completion(content):
+    return {"choices": [{"message": {"role": "assistant", "content": content}}]}
+
+
+def test_identical_inflight_requests_are_coalesced():
+    calls = []
+
+    async def handler(request):
+        calls.append(json.loads(request.content))
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json=completion("[]"))
+
+    client = LLMClient(api_key="test", transport=httpx.MockTransport(handler))
+
+    async def run():
+        results = await asyncio.gather(
+            client.complete("same job"), client.complete("same job"), client.complete("other job")
+        )
+        await client.aclose()
+        return results
+
+    assert asyncio.run(run()) == ["[]", "[]", "[]"]
+    assert len(calls) == 2
+
+
+def test_concurrency_is_bounded():
+    active = peak = 0
+
+    async def handler(request):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return httpx.Response(200, json=completion("ok"))
+
+    client = LLMClient(api_key="test", max_concurrency=2, transport=httpx.MockTransport(handler))
+
+    async def run():
+        await asyncio.gather(*(client.complete(f"job {i}") for i in range(6)))
+        await client.aclose()
+
+    asyncio.run(run())
+    assert peak == 2
+
+
+def test_pools_of_previous_event_loops_are_closed():
+    client = LLMClient(api_key="test", transport=httpx.MockTransport(lambda request: httpx.Response(200, json=completion("ok"))))
+    asyncio.run(client.complete("job"))
+    first = client._client
+
+    async def run():
+        await client.complete("job")
+        await asyncio.sleep(0)
+        await client.aclose()
+
+    asyncio.run(run())
+    assert first.is_closed
+
+
+def test_upstream_errors_raise_llm_error():
+    client = LLMClient(api_key="test", transport=httpx.MockTransport(lambda request: httpx.Response(500)))
+    with pytest.raises(LLMError):
+        asyncio.run(client.complete("job"))
+
+
+def test_calls_are_cut_off_at_the_request_deadline():
+    async def handler(request):
+        await asyncio.sleep(5)
+        return httpx.Response(200, json=completion("late"))
+
+    client = LLMClient(api_key="test", transport=httpx.MockTransport(handler))
+
+    async def run():
+        with request_deadline(0.05):
+            started = time.monotonic()
+            with pytest.raises(LLMTimeoutError):
+                await client.complete("job")
+            return time.monotonic() - started
+
+    assert asyncio.run(run()) < 1
+
+
+def test_slow_calls_are_hedged_and_the_first_reply_wins():
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        await asyncio.sleep(5 if len(calls) == 1 else 0)
+        return httpx.Response(200, json=completion(f"reply {len(calls)}"))
+
+    client = LLMClient(api_key="test", transport=httpx.MockTransport(handler))
+    client._latencies.extend([0.01] * 20)
+
+    started = time.monotonic()
+    assert asyncio.run(client.complete("job")) == "reply 2"
+    assert time.monotonic() - started < 1 and len(calls) == 2
+
+
+def test_circuit_breaker_fails_fast_then_lets_a_trial_call_through():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(500 if len(calls) <= 4 else 200, json=completion("ok"))
+
+    breaker = CircuitBreaker(window=4, error_rate=0.5, cooldown=60)
+    client = LLMClient(api_key="test", transport=httpx.MockTransport(handler), breaker=breaker)
+
+    async def run():
+        for i in range(4):
+            with pytest.raises(LLMError):
+                await client.complete(f"job {i}")
+        with pytest.raises(LLMUnavailableError):
+            await client.complete("rejected")
+        assert len(calls) == 4
+
+        breaker._opened_at -= 60  # Cooldown over: one trial call closes the breaker
+        assert await client.complete("trial") == "ok"
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    asyncio.run(run())
+
+
+def test_a_stream_rejected_while_queued_hands_back_the_trial():
+    breaker = CircuitBreaker(cooldown=60)
+    breaker._open()
+    breaker._opened_at -= 60
+    client = LLMClient(api_key="test", transport=httpx.MockTransport(lambda request: httpx.Response(200)),
+                       breaker=breaker, max_queue=0)
+
+    async def run():
+        with pytest.raises(LLMError):
+            async for _ in client.stream("job"):
+                pass
+
+    asyncio.run(run())
+    assert breaker.allow()  # Still half-open, not waiting forever on the rejected trial
+
+
+def test_only_the_trial_decides_a_half_open_breaker():
+    breaker = CircuitBreaker(window=2, error_rate=0.5, cooldown=60)
+    early = breaker.allow()  # Admitted while closed, still running when the breaker opens
+    breaker._open()
+    breaker._opened_at -= 60
+    trial = breaker.allow()
+    assert trial == CircuitBreaker.TRIAL and not breaker.allow()
+
+    breaker.record(True, early)  # A late success is not the trial's
+    assert breaker.state == CircuitBreaker.HALF_OPEN and not breaker.allow()
+    breaker.record(False, trial)
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_a_stream_cut_off_by_the_deadline_is_a_timeout():
+    def handler(request):
+        raise httpx.ReadTimeout("no data", request=request)
+
+    breaker = CircuitBreaker(window=1, error_rate=1)
+    client = LLMClient(api_key="test", transport=httpx.MockTransport(handler), breaker=breaker)
+
+    async def run():
+        with request_deadline(5), pytest.raises(LLMTimeoutError):
+            async for _ in client.stream("job"):
+                pass
+
+    asyncio.run(run())
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_match_degrades_to_fast_scores_while_the_breaker_is_open(monkeypatch):
+    breaker = CircuitBreaker(cooldown=60)
+    breaker._open()
+    client = LLMClient(api_key="test", transport=httpx.MockTransport(lambda request: httpx.Response(500)), breaker=breaker)
+    monkeypatch.setattr(services, "llm_client", client)
+    monkeypatch.setattr(services, "score_memo", ScoreMemo(":memory:"))
+    monkeypatch.setattr(services, "result_cache", ResultCache(db_path=None))
+    job = {
+        "cst_name": "Acme Inc", "client_problem_statement": "Need a data scientist.", "title": "Data Scientist",
+        "location": "Austin", "industry": "Healthcare", "required_skills": "Python", "years_experience": 5,
+    }
+
+    response = TestClient(app).post("/match", json={"job": job})
+    assert response.status_code == 200
+    assert response.headers["X-Match-Degraded"] == "circuit_open"
+    assert [match["tier"] for match in response.json()] == ["fast"] * 3
+
+    monkeypatch.setattr(main, "MATCH_LLM_FALLBACK", "error")
+    response = TestClient(app).post("/match", json={"job": job})
+    assert response.status_code == 503 and int(response.headers["Retry-After"]) > 0
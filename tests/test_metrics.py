@@ -0,0 +1,63 @@
+import json
+import re
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app import services
+from app.cache import ResultCache
+from app.llm import LLMClient
+from app.main import app
+from app.metrics import Histogram, STAGE_SECONDS
+from app.score_memo import ScoreMemo
+
+JOB = {
+    "cst_name": "Acme Inc",
+    "client_problem_statement": "Need a data scientist.",
+    "title": "Data Scientist",
+    "location": "Austin",
+    "industry": "Healthcare",
+    "required_skills": "Machine Learning, Python",
+    "years_experience": 5,
+}
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("demo_seconds", "Demo.", (0.1, 1.0), ("stage",))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        histogram.observe(value, stage="parse")
+    assert histogram.render()[2:] == [
+        'demo_seconds_bucket{stage="parse",le="0.1"} 1',
+        'demo_seconds_bucket{stage="parse",le="1"} 3',
+        'demo_seconds_bucket{stage="parse",le="+Inf"} 4',
+        'demo_seconds_sum{stage="parse"} 4.25',
+        'demo_seconds_count{stage="parse"} 4',
+    ]
+
+
+def test_match_stages_are_timed_and_exported(monkeypatch):
+    def reply(request):
+        prompt = json.loads(request.content)["messages"][1]["content"]
+        content = json.dumps([{"id": ref, "score": 7, "explanation": "fit"} for ref in re.findall(r"^(c\d+)\|", prompt, re.M)])
+        return httpx.Response(200, json={
+            "choices": [{"message": {"content": content}}],
+            "usage": {"prompt_tokens": 321, "completion_tokens": 123},
+        })
+
+    monkeypatch.setattr(services, "llm_client", LLMClient(api_key="test", transport=httpx.MockTransport(reply)))
+    monkeypatch.setattr(services, "score_memo", ScoreMemo(":memory:"))
+    monkeypatch.setattr(services, "result_cache", ResultCache(db_path=None))
+    llm_calls = STAGE_SECONDS.count(stage="llm_call")
+    client = TestClient(app)
+
+    response = client.post("/match", json={"job": JOB, "shortlist_size": 5})
+
+    assert response.status_code == 200
+    stages = [entry.split(";")[0] for entry in response.headers["server-timing"].split(", ")]
+    assert stages == ["candidate_load", "prompt_build", "llm_call", "parse", "rank"]
+    assert STAGE_SECONDS.count(stage="llm_call") == llm_calls + 1
+
+    exported = client.get("/metrics").text
+    assert 'match_cache_requests_total{cache="result",result="miss"}' in exported
+    assert 'llm_prompt_tokens_bucket{le="500"}' in exported
+    assert re.search(r'http_request_duration_seconds_count\{method="POST",path="/match",status="200"\} \d+', exported)
@@ -0,0 +1,52 @@
+import pytest
+
+from app.parsing import JSONObjectStream, ResponseParseError
+from app.services import parse_batch_response
+
+REPLY = '''```json
+[
+    {"full_name": "Ana Lee", "score": 9, "explanation": "Strong {Python} \\"backend\\" skills"},
+    {"full_name": "Bo Kim", "score": 6.5, "explanation": "Some
+overlap"},
+    {"full_name": "Cy Ray", "score": 7, "explanation": "Good data backgr'''
+
+
+def test_objects_are_emitted_as_they_close_across_chunks():
+    stream = JSONObjectStream()
+    emitted = []
+    for i in range(0, len(REPLY), 7):
+        emitted.extend(obj["full_name"] for obj in stream.feed(REPLY[i:i + 7]))
+    assert emitted == ["Ana Lee", "Bo Kim"]  # The third object never closes
+    assert stream.rejected == []
+
+
+def test_prose_and_fences_are_ignored():
+    stream = JSONObjectStream()
+    text = 'Here are the results:\n```json\n[{"full_name": "Ana", "score": 8, "explanation": "x"}]\n```\nThanks!'
+    assert stream.feed(text) == [{"full_name": "Ana", "score": 8, "explanation": "x"}]
+
+
+def test_parse_batch_response_recovers_truncated_and_malformed_replies():
+    reply = (
+        "[{'full_name': 'Randy Payne', 'score': '7/10', 'explanation': 'Agile experience',},\n"
+        ' {"full_name": "Paul Smith", "score": 9, "explanation": "Strong\nfit"},\n'
+        " {'full_name': 'Dan O'Brien', 'score': 5, 'explanation': 'Some overlap',},\n"
+        ' {"full_name": "Lisa Reid", "score": 8, "explanation": "cut off by max_tok'
+    )
+    results = parse_batch_response(reply, top_k=None)
+    assert [(m["full_name"], m["score"]) for m in results] == [("Paul Smith", 9.0), ("Randy Payne", 7.0), ("Dan O'Brien", 5.0)]
+    assert results[0]["explanation"] == "Strong\nfit"
+
+
+def test_parse_batch_response_plain_text_and_top_k():
+    reply = (
+        "1. Name: Ana Lee\nScore: 6/10\nExplanation: Some overlap.\n\n"
+        "2. Name: Bo Kim\nScore: 8/10\nExplanation: Strong Python.\nGood location fit.\n\n"
+        "3. Name: Cy Ray\nScore: 4\nExplanation: Junior."
+    )
+    results = parse_batch_response(reply, top_k=2)
+    assert [m["full_name"] for m in results] == ["Bo Kim", "Ana Lee"]
+    assert results[0]["explanation"] == "Strong Python.\nGood location fit."
+
+    with pytest.raises(ResponseParseError):
+        parse_batch_response("I'm sorry, I can't help with that.")
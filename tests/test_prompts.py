@@ -0,0 +1,48 @@
+from app.prompts import build_match_prompt, count_tokens, render_candidate_row
+from app.services import candidate_lookup, parse_batch_response
+
+JOB = {"title": "Backend Engineer", "required_skills": "Python, FastAPI", "years_experience": 5}
+
+CANDIDATES = [
+    {"id": i, "first_name": f"First{i}", "last_name": "Last", "title": "Engineer", "skills": "Python, SQL",
+     "years_experience": 4, "industry_experience": "Retail, Tech", "location": "Austin"}
+    for i in range(1, 41)
+]
+
+
+def test_rows_are_compact_and_anonymous():
+    row = render_candidate_row(3, CANDIDATES[0])
+    assert row == "c3|Engineer|Python, SQL|4|Retail, Tech|Austin"
+    assert "First1" not in build_match_prompt(JOB, CANDIDATES[:2]).text
+
+
+def test_prompt_respects_budget_and_sizes_max_tokens():
+    small = build_match_prompt(JOB, CANDIDATES[:2])
+    assert small.max_tokens < build_match_prompt(JOB, CANDIDATES[:10]).max_tokens
+
+    budget = count_tokens(build_match_prompt(JOB, []).text) + 50
+    limited = build_match_prompt(JOB, CANDIDATES, token_budget=budget)
+    assert 0 < len(limited.candidates) < len(CANDIDATES)
+    assert len(limited.candidates) + len(limited.overflow) == len(CANDIDATES)
+    assert limited.input_tokens <= budget
+
+
+def test_reply_ids_are_rejoined_with_names():
+    prompt = build_match_prompt(JOB, CANDIDATES[:3])
+    reply = '[{"id": "c2", "score": 8, "explanation": "ok"}, {"id": "c3", "score": 6, "explanation": "meh"}]'
+    matches = parse_batch_response(reply, top_k=None, candidates=candidate_lookup(prompt))
+    assert [(m["full_name"], m["candidate_id"]) for m in matches] == [("First2 Last", 2), ("First3 Last", 3)]
+
+    # Bare numbers for the short ids are mapped back too
+    reply = '[{"id": 2, "score": 8, "explanation": "ok"}, {"id": "3", "score": 6, "explanation": "meh"}]'
+    matches = parse_batch_response(reply, top_k=None, candidates=candidate_lookup(prompt))
+    assert [m["candidate_id"] for m in matches] == [2, 3]
+
+
+def test_candidates_the_model_invents_are_dropped():
+    prompt = build_match_prompt(JOB, CANDIDATES[:2])
+    reply = ('[{"full_name": "Ghost Person", "score": 10, "explanation": "perfect"},'
+             ' {"id": "c9", "score": 9, "explanation": "not in the prompt"},'
+             ' {"id": "c1", "score": 7, "explanation": "ok"}]')
+    matches = parse_batch_response(reply, top_k=None, candidates=candidate_lookup(prompt))
+    assert [(m["full_name"], m["candidate_id"]) for m in matches] == [("First1 Last", 1)]
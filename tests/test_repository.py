@@ -0,0 +1,67 @@
+import asyncio
+import os
+from datetime import date
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import repository as repository_module
+from app.candidate_store import CandidateSnapshot, normalize_candidate
+from app.db_models import Base, Candidate
+from app.repository import CandidateRepository, find_eligible, is_eligible
+
+ROWS = [
+    dict(first_name="Ana", last_name="Lee", title="Engineer", skills="Python", is_staffed=False,
+         staffing_end_date=None, years_experience=6, industry_experience="Tech", location="Austin"),
+    dict(first_name="Bo", last_name="Kim", title="Engineer", skills="Python", is_staffed=True,
+         staffing_end_date=date(2025, 9, 1), years_experience=8, industry_experience="Tech", location="Austin"),
+    dict(first_name="Cy", last_name="Ray", title="Engineer", skills="Python", is_staffed=True,
+         staffing_end_date=date(2026, 3, 1), years_experience=9, industry_experience="Tech", location="Boston"),
+    dict(first_name="Di", last_name="Poe", title="Engineer", skills="Python", is_staffed=False,
+         staffing_end_date=None, years_experience=2, industry_experience="Tech", location="austin"),
+]
+
+
+def make_repository():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as session:
+        session.add_all(Candidate(**row) for row in ROWS)
+        session.commit()
+    return engine, CandidateRepository(Session)
+
+
+def test_filters_are_pushed_down_and_indexed():
+    engine, repository = make_repository()
+    with engine.connect() as connection:
+        indexed = set(connection.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'index'").scalars())
+    assert {"ix_candidates_location_lower", "ix_candidates_is_staffed",
+            "ix_candidates_staffing_end_date", "ix_candidates_years_experience"} <= indexed
+
+    assert repository.find(min_years_experience=5, location="AUSTIN", available_by=date(2025, 10, 1)) == [1, 2]
+    assert repository.find() == [1, 2, 3, 4]
+
+
+def test_in_memory_filters_match_sql():
+    _, repository = make_repository()
+    filters = dict(min_years_experience=2, location="austin", available_by=date(2025, 8, 1))
+    in_memory = [normalize_candidate(row, i + 1) for i, row in enumerate(ROWS)]
+    assert [c["id"] for c in in_memory if is_eligible(c, **filters)] == repository.find(**filters)
+
+
+def test_database_results_are_pinned_to_the_snapshot(monkeypatch):
+    _, repository = make_repository()
+    monkeypatch.setattr(repository_module, "CANDIDATE_BACKEND", "database")
+    monkeypatch.setattr(repository_module, "candidate_repository", repository)
+    # The snapshot predates Di's row, and Ana's location was edited since
+    candidates = tuple(normalize_candidate({**row, "location": "Boston"} if i == 0 else row, i + 1)
+                       for i, row in enumerate(ROWS[:3]))
+    snapshot = CandidateSnapshot("v1", candidates, by_id={c["id"]: c for c in candidates})
+
+    found = asyncio.run(find_eligible(snapshot, {"location": "austin"}))
+    assert [c["first_name"] for c in found] == ["Bo"]
+    assert found[0] is snapshot.by_id[2]
@@ -0,0 +1,46 @@
+from app.candidate_store import CandidateSnapshot, normalize_candidate
+from app.retrieval import CandidateIndex, job_query, shortlist_candidates
+
+
+def make_snapshot(version, rows):
+    candidates = tuple(normalize_candidate(row, i + 1) for i, row in enumerate(rows))
+    return CandidateSnapshot(version=version, candidates=candidates, by_id={c["id"]: c for c in candidates})
+
+
+ROWS = [
+    {"first_name": "Ana", "title": "Backend Engineer", "skills": "Python, FastAPI, PostgreSQL",
+     "industry_experience": "Technology", "location": "New York", "years_experience": 5},
+    {"first_name": "Bo", "title": "UX Designer", "skills": "Figma, Wireframing",
+     "industry_experience": "Retail", "location": "Austin", "years_experience": 3},
+    {"first_name": "Cy", "title": "Data Engineer", "skills": "Python, Spark, Data Pipelines",
+     "industry_experience": "Healthcare", "location": "Boston", "years_experience": 7},
+]
+
+JOB = {"title": "Senior Backend Engineer", "required_skills": "Python, FastAPI, PostgreSQL",
+       "industry": "Tech", "location": "New York"}
+
+
+def test_search_ranks_relevant_candidates_first():
+    index = CandidateIndex()
+    index.sync(make_snapshot("v1", ROWS))
+    ranked = [candidate_id for candidate_id, _ in index.search(job_query(JOB), 3)]
+    assert ranked[0] == 1
+    assert 2 not in ranked
+
+
+def test_sync_only_reindexes_changed_candidates():
+    index = CandidateIndex()
+    assert index.sync(make_snapshot("v1", ROWS)) == 3
+
+    edited = [dict(row) for row in ROWS]
+    edited[1]["skills"] = "Python, FastAPI"
+    assert index.sync(make_snapshot("v2", edited[:2])) == 2  # one edit, one removal
+    assert len(index) == 2
+    assert {cid for cid, _ in index.search(job_query(JOB), 5)} == {1, 2}
+
+
+def test_shortlist_is_padded_to_k():
+    # A private index, so the shared one isn't left synced to these test rows
+    shortlist = shortlist_candidates(JOB, make_snapshot("v3", ROWS), k=3, index=CandidateIndex())
+    assert [c["id"] for c in shortlist][:1] == [1]
+    assert len(shortlist) == 3
@@ -0,0 +1,46 @@
+from app.candidate_store import normalize_candidate
+from app.score_memo import ScoreMemo
+
+CANDIDATES = [
+    normalize_candidate({"first_name": "Ana", "last_name": "Lee", "skills": "Python"}, 1),
+    normalize_candidate({"first_name": "Bo", "last_name": "Kim", "skills": "Figma"}, 2),
+]
+
+
+def test_only_changed_candidates_miss(tmp_path):
+    memo = ScoreMemo(str(tmp_path / "memo.sqlite3"))
+    matches = [
+        {"candidate_id": 1, "full_name": "Ana Lee", "score": 9.0, "explanation": "Strong Python"},
+        {"candidate_id": 2, "full_name": "Bo Kim", "score": 3.0, "explanation": "Design focus"},
+    ]
+    memo.store("job-a", {c["id"]: c for c in CANDIDATES}, matches)
+    assert set(memo.lookup("job-a", CANDIDATES)) == {1, 2}
+    assert memo.lookup("job-b", CANDIDATES) == {}
+
+    edited = [CANDIDATES[0], normalize_candidate({"first_name": "Bo", "last_name": "Kim", "skills": "Python"}, 2)]
+    hits = memo.lookup("job-a", edited)
+    assert set(hits) == {1}
+    assert hits[1]["explanation"] == "Strong Python"
+
+
+def test_old_and_surplus_scores_are_pruned(monkeypatch):
+    memo = ScoreMemo(":memory:", ttl=1000, max_rows=2)
+    candidates = {i: normalize_candidate({"first_name": f"C{i}", "last_name": "Lee"}, i) for i in range(1, 4)}
+    clock = [0.0]
+    monkeypatch.setattr("app.score_memo.time.time", lambda: clock[0])
+
+    def store_at(now, job_key, candidate_id):
+        clock[0] = now
+        memo.store(job_key, candidates, [{"candidate_id": candidate_id, "full_name": "C Lee", "score": 5.0}])
+
+    store_at(1000, "job-old", 1)
+    store_at(1500, "job-a", 2)
+    store_at(1600, "job-a", 3)
+    clock[0] = 2000
+    assert set(memo.lookup("job-a", candidates.values())) == {2, 3}
+    assert memo.lookup("job-old", candidates.values()) == {}  # Past the TTL
+
+    store_at(2100, "job-b", 1)  # Prunes: the expired score, then the oldest beyond max_rows
+    assert memo._db.execute("SELECT job_key, candidate_id FROM candidate_scores ORDER BY updated_at").fetchall() == [
+        ("job-a", 3), ("job-b", 1),
+    ]
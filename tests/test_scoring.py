@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+
+from app.retrieval import DEFAULT_SHORTLIST_SIZE
+from app.scoring import chunk_candidates, score_candidates
+from benchmarks.generate_roster import generate_candidates
+
+CANDIDATES = [
+    {"id": i, "first_name": f"Candidate{i}", "last_name": "Doe", "title": "Engineer",
+     "skills": "Python", "years_experience": i, "industry_experience": "Tech", "location": "Austin"}
+    for i in range(1, 11)
+]
+
+
+def test_chunks_respect_budget_and_size():
+    chunks = chunk_candidates(CANDIDATES, token_budget=10_000, max_chunk_size=4)
+    assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+    assert [c["id"] for chunk in chunks for c in chunk] == list(range(1, 11))
+
+
+def test_failed_chunks_do_not_hide_other_results():
+    calls = []
+
+    async def score_chunk(job, chunk):
+        calls.append(len(chunk))
+        if chunk[0]["id"] == 1:
+            raise ValueError("malformed reply")
+        return [{"full_name": c["first_name"], "score": c["years_experience"], "explanation": ""} for c in chunk]
+
+    top = asyncio.run(score_candidates({}, CANDIDATES, score_chunk, top_k=3, token_budget=60))
+    assert len(calls) > 1
+    assert [match["score"] for match in top] == [10, 9, 8]
+
+
+def test_all_chunks_failing_raises():
+    async def score_chunk(job, chunk):
+        raise ValueError("upstream down")
+
+    with pytest.raises(ValueError):
+        asyncio.run(score_candidates({}, CANDIDATES, score_chunk))
+
+
+def test_a_default_shortlist_fits_in_one_prompt():
+    job = {"cst_name": "Acme Inc", "client_problem_statement": "Need a data scientist.", "title": "Data Scientist",
+           "location": "Austin", "industry": "Healthcare", "required_skills": "Machine Learning, Python",
+           "years_experience": 5}
+    shortlist = [{**c, "id": i} for i, c in enumerate(generate_candidates(DEFAULT_SHORTLIST_SIZE), start=1)]
+    assert len(chunk_candidates(shortlist, job)) == 1
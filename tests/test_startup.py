@@ -0,0 +1,51 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+from fastapi.testclient import TestClient
+
+from app import main, warmup
+from app.warmup import WarmUp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_importing_the_app_needs_no_database_and_creates_no_engine():
+    env = {name: value for name, value in os.environ.items() if name != "DATABASE_URL"}
+    code = "import app.main, app.db_models as m; assert m.get_engine.cache_info().currsize == 0"
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, check=True)
+
+
+def test_readiness_waits_for_warm_up(monkeypatch):
+    state = WarmUp()
+    monkeypatch.setattr(main, "warm_up", state)
+    assert TestClient(main.app).get("/health/ready").status_code == 503
+
+    with TestClient(main.app) as client:
+        for _ in range(100):
+            response = client.get("/health/ready")
+            if response.status_code == 200:
+                break
+            time.sleep(0.05)
+        assert client.get("/health/live").status_code == 200
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+    assert "candidates" in response.json()["steps_ms"]
+
+
+def test_failed_warm_up_is_retried(monkeypatch):
+    class FlakyStore:
+        calls = 0
+
+        def snapshot(self):
+            self.calls += 1
+            if self.calls == 1:
+                raise ConnectionError("database not up yet")
+
+    monkeypatch.setattr(warmup, "candidate_store", FlakyStore())
+    state = WarmUp(retry_delay=0.01)
+    asyncio.run(state.run())
+    assert state.ready and state.attempts == 2 and state.error is None
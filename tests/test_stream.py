@@ -0,0 +1,63 @@
+import json
+import logging
+import re
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app import services
+from app.cache import ResultCache
+from app.llm import LLMClient
+from app.main import app
+from app.score_memo import ScoreMemo
+
+JOB = {
+    "cst_name": "Acme Inc",
+    "client_problem_statement": "Need a data scientist.",
+    "title": "Data Scientist",
+    "location": "Austin",
+    "industry": "Healthcare",
+    "required_skills": "Machine Learning, Python",
+    "years_experience": 5,
+}
+
+
+def sse_reply(handler_request):
+    body = json.loads(handler_request.content)
+    refs = [line.split("|")[0] for line in body["messages"][1]["content"].splitlines() if re.match(r"c\d+\|", line)]
+    reply = json.dumps([{"id": ref, "score": 10 - i, "explanation": "fit"} for i, ref in enumerate(refs)])
+    events = "".join(
+        f"data: {json.dumps({'choices': [{'delta': {'content': reply[i:i + 5]}}]})}\n\n"
+        for i in range(0, len(reply), 5)
+    )
+    return httpx.Response(200, text=events + "data: [DONE]\n\n", headers={"content-type": "text/event-stream"})
+
+
+def test_stream_emits_candidates_then_ranked_result(monkeypatch):
+    monkeypatch.setattr(services, "llm_client", LLMClient(api_key="test", transport=httpx.MockTransport(sse_reply)))
+    monkeypatch.setattr(services, "score_memo", ScoreMemo(":memory:"))
+    monkeypatch.setattr(services, "result_cache", ResultCache(db_path=None))
+
+    with TestClient(app).stream("POST", "/match/stream", json={"job": JOB, "shortlist_size": 5}) as response:
+        assert response.status_code == 200
+        events = [json.loads(line) for line in response.iter_lines() if line]
+
+    candidates = [e for e in events if e["event"] == "candidate"]
+    assert len(candidates) == 5
+    assert events[-1]["event"] == "result"
+    assert len(events[-1]["data"]) == 3
+    assert events[-1]["data"][0]["score"] == 10
+    assert all(" " in e["data"]["full_name"] for e in candidates)  # names rejoined from short ids
+
+
+def test_stream_timings_are_logged_once_the_stream_ends(monkeypatch, caplog):
+    monkeypatch.setattr(services, "llm_client", LLMClient(api_key="test", transport=httpx.MockTransport(sse_reply)))
+    monkeypatch.setattr(services, "score_memo", ScoreMemo(":memory:"))
+    monkeypatch.setattr(services, "result_cache", ResultCache(db_path=None))
+
+    with caplog.at_level(logging.INFO, logger="app.main"):
+        with TestClient(app).stream("POST", "/match/stream", json={"job": JOB, "shortlist_size": 5}) as response:
+            list(response.iter_lines())
+
+    [line] = [record.getMessage() for record in caplog.records if "/match/stream" in record.getMessage()]
+    assert "llm_call=" in line and "candidate_load=" in line